@@ -0,0 +1,254 @@
+from typing import Optional
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+import xxhash
+import zstandard
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_BLOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class BlobRef(BaseModel):
+    """
+    大块内容在状态与消息中的替身：只保留内容哈希、字节数和开头/结尾预览。
+    """
+
+    blob_id: str
+    size: int
+    # blob 中实际保存的字节数，超过 BLOB_MAX_BYTES 的部分不保存
+    stored: Optional[int] = None
+    head: str = ""
+    tail: str = ""
+
+    def render(self) -> str:
+        omitted = self.size - len(self.head.encode("utf-8")) - len(self.tail.encode("utf-8"))
+        return (
+            f"{self.head}\n"
+            f"...[省略约 {max(omitted, 0)} 字节；完整内容共 {self.size} 字节，"
+            f"{describe_blob(self.blob_id, self.stored, self.size)}]...\n"
+            f"{self.tail}"
+        )
+
+
+def describe_blob(blob_id: str, stored: Optional[int], size: int) -> str:
+    if stored is not None and stored < size:
+        return f"前 {stored} 字节已存为 blob {blob_id}，可用 read_blob 按偏移读取"
+    return f"已存为 blob {blob_id}，可用 read_blob 按偏移读取"
+
+
+def _preview(data: bytes, head: int, tail: int) -> tuple:
+    head_text = data[:head].decode("utf-8", errors="ignore")
+    tail_text = data[-tail:].decode("utf-8", errors="ignore") if tail > 0 else ""
+    return head_text, tail_text
+
+
+class BlobWriter:
+    """
+    增量写入一个 blob：边写边计算哈希并用 zstd 压缩到临时文件，内存占用与内容大小无关。
+    最多保存 store.max_bytes 字节，之后的写入被丢弃并置 truncated。
+    close() 后按内容哈希落盘，相同内容只保存一份。
+
+    write / close / abort 可以在不同线程中调用（例如协程被取消后仍在线程池中执行的写入），
+    内部加锁串行化，关闭之后的写入直接忽略。
+    """
+
+    def __init__(self, store: "BlobStore"):
+        self.store = store
+        self.size = 0
+        self.truncated = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._hasher = xxhash.xxh3_128()
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.root, suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+        self._writer = zstandard.ZstdCompressor(level=store.level).stream_writer(
+            self._file, closefd=False
+        )
+
+    def write(self, data: bytes) -> None:
+        with self._lock:
+            if self._closed or self.truncated:
+                return
+            room = self.store.max_bytes - self.size
+            if len(data) > room:
+                data = data[: max(room, 0)]
+                self.truncated = True
+            if data:
+                self._hasher.update(data)
+                self._writer.write(data)
+                self.size += len(data)
+
+    def close(self) -> str:
+        with self._lock:
+            if self._closed:
+                raise ValueError("blob 已关闭")
+            self._closed = True
+            self._writer.close()
+            self._file.close()
+            blob_id = self._hasher.hexdigest()
+            path = self.store.path(blob_id)
+            if os.path.exists(path):
+                os.remove(self._tmp_path)
+                # 刷新修改时间，重复写入的内容按最近一次使用计算保留期
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(self._tmp_path, path)
+            return blob_id
+
+    def abort(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._writer.close()
+            self._file.close()
+            os.remove(self._tmp_path)
+
+
+class BlobStore:
+    """
+    本地内容寻址存储，存放过大的工具输出。文件按 xxh3-128 哈希命名、zstd 压缩，
+    多个运行、多个进程共享同一目录；写入先落到临时文件再原子改名，并发写同一内容是安全的。
+
+    单个 blob 最多保存 max_bytes 字节。每隔 gc_interval 秒，下一次写入前会清理一次目录：
+    删除超过 retention 秒未使用的文件，总占用仍超过 max_total_bytes 时从最旧的开始删除。
+    所有方法都是同步的文件 I/O，应在线程池中调用。
+    """
+
+    def __init__(
+        self,
+        root: str,
+        level: int = 3,
+        max_bytes: int = 64 << 20,
+        retention: float = 7 * 86400,
+        max_total_bytes: int = 2 << 30,
+        gc_interval: float = 600,
+    ):
+        self.root = root
+        self.level = level
+        self.max_bytes = max_bytes
+        self.retention = retention
+        self.max_total_bytes = max_total_bytes
+        self.gc_interval = gc_interval
+        self._last_gc = float("-inf")
+        self._gc_lock = threading.Lock()
+
+    def path(self, blob_id: str) -> str:
+        if not _BLOB_ID.match(blob_id):
+            raise ValueError(f"无效的 blob id: {blob_id}")
+        return os.path.join(self.root, blob_id[:2], f"{blob_id}.zst")
+
+    def writer(self) -> BlobWriter:
+        # 第一次写入时才创建目录，导入模块没有副作用
+        os.makedirs(self.root, exist_ok=True)
+        self._maybe_gc()
+        return BlobWriter(self)
+
+    def _maybe_gc(self) -> None:
+        now = time.monotonic()
+        if now - self._last_gc < self.gc_interval or not self._gc_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_gc = now
+            removed = self.gc()
+            if removed:
+                logger.info(f"blob 存储清理了 {removed} 个文件")
+        except OSError as e:
+            logger.warning(f"blob 存储清理失败: {e}")
+        finally:
+            self._gc_lock.release()
+
+    def gc(self) -> int:
+        """
+        删除超过保留期的 blob 与遗留的临时文件；剩余 blob 的总大小仍超过上限时，
+        按修改时间从旧到新删除。其它进程可能同时清理，文件已不存在时忽略。返回删除的文件数。
+        """
+        now = time.time()
+        removed = 0
+        blobs = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime > self.retention:
+                    removed += _remove(path)
+                elif not name.endswith(".tmp"):
+                    blobs.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in blobs)
+        for _, size, path in sorted(blobs):
+            if total <= self.max_total_bytes:
+                break
+            removed += _remove(path)
+            total -= size
+        return removed
+
+    def put(self, data: bytes) -> str:
+        writer = self.writer()
+        try:
+            writer.write(data)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.close()
+
+    def put_with_preview(
+        self,
+        data: bytes,
+        head: Optional[int] = None,
+        tail: Optional[int] = None,
+    ) -> BlobRef:
+        head = settings.BLOB_PREVIEW_HEAD_BYTES if head is None else head
+        tail = settings.BLOB_PREVIEW_TAIL_BYTES if tail is None else tail
+        head_text, tail_text = _preview(data, head, tail)
+        return BlobRef(
+            blob_id=self.put(data),
+            size=len(data),
+            stored=min(len(data), self.max_bytes),
+            head=head_text,
+            tail=tail_text,
+        )
+
+    def exists(self, blob_id: str) -> bool:
+        return os.path.exists(self.path(blob_id))
+
+    def read(self, blob_id: str, offset: int = 0, length: int = 4096) -> bytes:
+        """
+        读取解压后内容中 [offset, offset + length) 的字节。流式解压，不会把整个 blob 读入内存。
+        """
+        with open(self.path(blob_id), "rb") as f:
+            reader = zstandard.ZstdDecompressor().stream_reader(f)
+            # 解压流只支持向前 seek，中间内容解压后直接丢弃
+            reader.seek(max(offset, 0))
+            return reader.read(max(length, 0))
+
+
+def _remove(path: str) -> int:
+    try:
+        os.remove(path)
+        return 1
+    except FileNotFoundError:
+        return 0
+
+
+blob_store = BlobStore(
+    settings.BLOB_STORE_ROOT,
+    level=settings.BLOB_ZSTD_LEVEL,
+    max_bytes=settings.BLOB_MAX_BYTES,
+    retention=settings.BLOB_RETENTION_SECONDS,
+    max_total_bytes=settings.BLOB_STORE_MAX_BYTES,
+    gc_interval=settings.BLOB_GC_INTERVAL,
+)
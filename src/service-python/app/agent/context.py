@@ -0,0 +1,135 @@
+from functools import lru_cache
+from typing import Awaitable, Callable, List, Sequence
+import json
+import logging
+
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# 每条消息除内容外的固定开销（角色、分隔符等），与 OpenAI 的计数方式保持一致
+MESSAGE_OVERHEAD_TOKENS = 4
+
+Summarizer = Callable[[str, List[BaseMessage]], Awaitable[str]]
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # 离线环境下无法下载编码表时退化为按字节估算
+        logger.warning("tiktoken 编码表不可用，改为按字节数估算 token")
+        return None
+
+
+@lru_cache(maxsize=8192)
+def count_text_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return len(text.encode("utf-8")) // 3 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        content += json.dumps(message.tool_calls, ensure_ascii=False, default=str)
+    return content
+
+
+def count_tokens(messages: Sequence[BaseMessage]) -> int:
+    return sum(
+        count_text_tokens(_message_text(m)) + MESSAGE_OVERHEAD_TOKENS
+        for m in messages
+    )
+
+
+def render_messages(messages: Sequence[BaseMessage]) -> str:
+    """
+    将消息渲染为纯文本，供摘要模型阅读。
+    """
+    return "\n".join(f"[{m.type}] {_message_text(m)}" for m in messages)
+
+
+def group_turns(messages: Sequence[BaseMessage]) -> List[List[int]]:
+    """
+    将消息按轮次分组，返回每组消息的下标。
+    带 tool_calls 的 AIMessage 与其后的 ToolMessage 属于同一组，裁剪时不会被拆开。
+    """
+    groups: List[List[int]] = []
+    for index, message in enumerate(messages):
+        if isinstance(message, ToolMessage) and groups:
+            groups[-1].append(index)
+        else:
+            groups.append([index])
+    return groups
+
+
+class ContextWindow(BaseModel):
+    messages: List[BaseMessage]
+    summary: str
+    summarized_upto: int
+    tokens_saved: int
+
+
+async def build_context(
+    history: Sequence[BaseMessage],
+    prompts: Sequence[BaseMessage],
+    *,
+    summary: str,
+    summarized_upto: int,
+    budget: int,
+    summary_reserve: int,
+    max_messages: int,
+    summarize: Summarizer,
+) -> ContextWindow:
+    """
+    在 token 预算内构建发送给模型的上下文：
+
+    - 最近的若干轮对话原样保留；
+    - 更早的对话增量折叠进滚动摘要（summary 覆盖 history[:summarized_upto]），
+      已折叠的部分不会重复摘要；
+    - prompts（系统提示和当前任务）始终保留在末尾。
+    """
+    available = budget - count_tokens(prompts) - summary_reserve
+
+    # 从最新一轮往前取，直到超出预算或消息条数上限，至少保留最新一轮
+    keep_from = len(history)
+    kept_tokens = 0
+    for group in reversed(group_turns(history)):
+        group_tokens = count_tokens([history[i] for i in group])
+        too_many = len(history) - group[0] > max_messages
+        if keep_from < len(history) and (
+            kept_tokens + group_tokens > available or too_many
+        ):
+            break
+        keep_from = group[0]
+        kept_tokens += group_tokens
+
+    # 预算足够时不必重复发送已经进入摘要的消息
+    keep_from = max(keep_from, summarized_upto)
+
+    if keep_from > summarized_upto:
+        summary = await summarize(summary, list(history[summarized_upto:keep_from]))
+        summarized_upto = keep_from
+
+    window: List[BaseMessage] = []
+    if summary:
+        window.append(SystemMessage(content=f"此前对话的摘要：\n{summary}"))
+    window.extend(history[keep_from:])
+
+    tokens_saved = max(0, count_tokens(history) - count_tokens(window))
+    window.extend(prompts)
+
+    return ContextWindow(
+        messages=window,
+        summary=summary,
+        summarized_upto=summarized_upto,
+        tokens_saved=tokens_saved,
+    )
@@ -1,5 +1,10 @@
-from .state import State
+from app.core.config import settings
+from .state import State, StepTask
 from langchain_core.messages import AIMessage
+from langgraph.types import Send
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def should_continue(state: State):
@@ -17,11 +22,27 @@ def should_continue(state: State):
             return "call_tool"
 
     # 情况二：如果没有工具调用，检查计划是否全部完成
-    # all() 函数在一个空列表上会返回 True，这是一个需要注意的边缘情况，但在这里是安全的
-    if all(step.status == "completed" for step in state.plan.steps):
+    # 游标已越过最后一个步骤即为全部完成（空计划同样视为完成），O(1)
+    if state.plan.is_complete():
         # 所有步骤都完成了，路由到报告节点
         return "generate_report"
     else:
         # 没有工具调用，但计划还没完成，说明当前步骤已通过思考完成。
         # 路由到标记节点，将其标记为 'completed'，然后继续循环。
         return "mark_complete"
+
+
+def dispatch_steps(state: State):
+    """
+    路由函数：把所有依赖已满足的步骤并行分发给单步执行子图（受并发上限约束），
+    没有可执行的步骤时进入报告节点。
+    """
+    ready = state.plan.ready_steps()
+    if not ready:
+        if not state.plan.is_complete():
+            logger.warning("剩余步骤的依赖无法满足，直接生成报告。")
+        return "reporter"
+
+    batch = ready[: settings.PLAN_MAX_PARALLEL_STEPS]
+    logger.info(f"本轮并行执行步骤: {[step.id for step in batch]}")
+    return [Send("step_runner", StepTask(step_id=step.id, state=state)) for step in batch]
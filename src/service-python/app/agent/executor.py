@@ -0,0 +1,134 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Sequence, Union
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import time
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+from app.agent.blob_store import blob_store
+from app.core.config import settings
+from app.core.metrics import tool_duration
+
+logger = logging.getLogger(__name__)
+
+# 同步工具在独立的有界线程池中执行，不占用事件循环，也不与默认线程池争抢
+_tool_thread_pool = ThreadPoolExecutor(
+    max_workers=settings.TOOL_THREAD_POOL_SIZE, thread_name_prefix="tool"
+)
+
+
+def _stringify(output: Any) -> str:
+    if isinstance(output, str):
+        return output
+    try:
+        return json.dumps(output, ensure_ascii=False)
+    except Exception:
+        return str(output)
+
+
+def _is_async_tool(tool: BaseTool) -> bool:
+    return getattr(tool, "coroutine", None) is not None
+
+
+async def _invoke_tool(tool: BaseTool, args: Dict[str, Any]) -> Any:
+    if _is_async_tool(tool):
+        return await tool.ainvoke(args)
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _tool_thread_pool, functools.partial(context.run, tool.invoke, args)
+    )
+
+
+# 自身已限定输出大小的工具，结果不再存入 blob：read_blob 返回的是 blob 的分段，
+# shell_exec 只保留输出首尾，完整输出已由它自己存为 blob
+_BOUNDED_OUTPUT_TOOLS = frozenset({"read_blob", "shell_exec"})
+
+
+async def _spill_to_blob(content: str) -> tuple:
+    """
+    过大的工具结果存入 blob，消息中只保留哈希与首尾预览，
+    避免在状态、检查点和后续每次模型调用的提示词中反复携带。
+    """
+    loop = asyncio.get_running_loop()
+    ref = await loop.run_in_executor(
+        _tool_thread_pool, blob_store.put_with_preview, content.encode("utf-8")
+    )
+    return ref.render(), ref.blob_id
+
+
+async def run_tool_call(tools_by_name: Dict[str, BaseTool], call: dict) -> ToolMessage:
+    """
+    执行单个工具调用并返回 ToolMessage。耗时与输出字节数只记录在日志和指标中：
+    消息会被序列化进模型缓存的键，不能携带每次都不同的值。
+    输出超过 BLOB_INLINE_MAX_BYTES 时存入 blob，消息内容替换为预览，blob id 记录在 response_metadata 中。
+    超时或异常会转成 status="error" 的 ToolMessage 返回给模型，而不是中断整个运行。
+    """
+    name = call["name"]
+    timeout = settings.TOOL_TIMEOUTS.get(name, settings.TOOL_TIMEOUT)
+    start = time.perf_counter()
+    status = "success"
+
+    tool = tools_by_name.get(name)
+    if tool is None:
+        content = f"Error: 工具 {name} 不存在，可用工具: {list(tools_by_name)}"
+        status = "error"
+    else:
+        try:
+            output = await asyncio.wait_for(_invoke_tool(tool, call["args"]), timeout)
+            content = _stringify(output)
+        except asyncio.TimeoutError:
+            # 线程池中的同步工具无法被强制中断，这里只是不再等待它的结果
+            content = f"Error: 工具 {name} 执行超时（{timeout}s）"
+            status = "error"
+        except Exception as e:
+            content = f"Error: {e!r}\n 请修正参数后重试。"
+            status = "error"
+
+    elapsed = time.perf_counter() - start
+    # 模型编造的工具名统一记为 unknown，避免标签无限增长
+    tool_duration.observe(
+        elapsed, tool=name if tool is not None else "unknown", status=status
+    )
+    latency_ms = int(elapsed * 1000)
+    output_bytes = len(content.encode("utf-8"))
+    logger.info(f"工具 {name} 执行完成: {status}, {latency_ms}ms, {output_bytes} bytes")
+
+    metadata: Dict[str, Any] = {}
+    if output_bytes > settings.BLOB_INLINE_MAX_BYTES and name not in _BOUNDED_OUTPUT_TOOLS:
+        try:
+            content, metadata["blob"] = await _spill_to_blob(content)
+        except OSError as e:
+            logger.warning(f"工具 {name} 的输出写入 blob 失败，按原样返回: {e}")
+
+    return ToolMessage(
+        content=content,
+        name=name,
+        tool_call_id=call["id"],
+        status=status,
+        response_metadata=metadata,
+    )
+
+
+async def execute_tool_calls(
+    tools: Union[Sequence[BaseTool], Mapping[str, BaseTool]], message: AIMessage
+) -> List[ToolMessage]:
+    """
+    并发执行一条 AIMessage 中的所有工具调用，结果顺序与 tool_calls 一致。
+    一轮的耗时取决于最慢的调用，而不是所有调用耗时之和。
+    tools 可以直接传入按名称索引好的映射，避免每轮重建。
+    """
+    if isinstance(tools, Mapping):
+        tools_by_name = tools
+    else:
+        tools_by_name = {tool.name: tool for tool in tools}
+    return list(
+        await asyncio.gather(
+            *(run_tool_call(tools_by_name, call) for call in message.tool_calls)
+        )
+    )
@@ -1,36 +1,107 @@
+from typing import Optional
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
-from .state import State
+from .state import Plan, State, StepPatch, StepTask
 from .nodes import *
-from .edges import should_continue
+from .edges import should_continue, dispatch_steps
+from .tool_registry import with_tool_set
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+# 单步执行子图：agent 与 tool_executor 循环，直到当前步骤完成后由 marker 标记
+# ------------------------------------------------------------------
+step_workflow = StateGraph(State)
+
+step_workflow.add_node("agent", agent_node)
+step_workflow.add_node("tool_executor", tool_executor_node)
+step_workflow.add_node("marker", marker_node)
+
+step_workflow.set_entry_point("agent")
+
+step_workflow.add_edge("tool_executor", "agent")
+step_workflow.add_edge("marker", END)
+
+step_workflow.add_conditional_edges(
+    "agent",
+    should_continue,
+    {
+        "call_tool": "tool_executor",
+        "generate_report": END,
+        "mark_complete": "marker",
+    },
+)
+
+step_graph = step_workflow.compile()
+
+
+async def step_runner_node(task: StepTask, config: RunnableConfig):
+    """
+    在独立的消息线程中执行一个步骤。子图只看到这一个步骤，
+    返回时只把新增的消息和该步骤的完成状态合并回全局状态。
+    """
+    parent = task.state
+    step = parent.plan.step(task.step_id)
+    logger.info(f"***开始执行步骤 {step.id}: {step.title}***")
+
+    # 子图只持有这一个步骤的副本，子图内的标记不会影响全局计划
+    sub_plan = Plan(
+        goal=parent.plan.goal,
+        thought=parent.plan.thought,
+        steps=[step.model_copy()],
+    )
+    sub_state = parent.model_copy(update={"plan": sub_plan})
+    result = await step_graph.ainvoke(sub_state, config=config)
+
+    return {
+        "plan": StepPatch(step_id=step.id),
+        "messages": result["messages"][len(parent.messages) :],
+        "tokens_saved": result["tokens_saved"] - parent.tokens_saved,
+    }
+
 
 # 1. 初始化一个状态图，并告诉它使用我们定义的 State 模型
 workflow = StateGraph(State)
 
 # 2. 将所有节点添加到图中，并为它们命名
 workflow.add_node("planner", planner_node)
-workflow.add_node("agent", agent_node)
-workflow.add_node("tool_executor", tool_node)
-workflow.add_node("marker", marker_node)
+workflow.add_node("step_runner", step_runner_node)
+workflow.add_node("join", join_node)
 workflow.add_node("reporter", report_node)
 
 # 3. 设置图的入口点
 workflow.set_entry_point("planner")
 
 # 4. 添加固定的边（Edges）
-workflow.add_edge("planner", "agent")
-workflow.add_edge("tool_executor", "agent")
-workflow.add_edge("marker", "agent")
+# 并行分发的所有 step_runner 执行完毕后在 join 汇合
+workflow.add_edge("step_runner", "join")
 workflow.add_edge("reporter", END)
 
 # 5. 添加条件边（Conditional Edges）
-workflow.add_conditional_edges(
-    "agent",
-    should_continue,
-    {
-        "call_tool": "tool_executor",
-        "generate_report": "reporter",
-        "mark_complete": "marker",
-    },
-)
+# dispatch_steps 返回一组 Send，把依赖已满足的步骤并行分发出去；全部完成后进入报告
+workflow.add_conditional_edges("planner", dispatch_steps, ["step_runner", "reporter"])
+workflow.add_conditional_edges("join", dispatch_steps, ["step_runner", "reporter"])
 
 agent = workflow.compile()
+
+
+async def run_agent(user_message: str, config: Optional[RunnableConfig] = None):
+    """
+    在当前事件循环中异步运行一次完整的智能体流程，返回最终状态。
+    所有节点都是异步的，多个运行可以与 HTTP 路由共享同一个事件循环。
+    """
+    config = await with_tool_set(config)
+    return await agent.ainvoke({"user_message": user_message}, config=config)
+
+
+async def stream_agent(user_message: str, config: Optional[RunnableConfig] = None):
+    """
+    异步运行智能体，并逐个产出每个节点的状态更新 (node_name, update)。
+    """
+    config = await with_tool_set(config)
+    async for chunk in agent.astream(
+        {"user_message": user_message}, config=config, stream_mode="updates"
+    ):
+        for node_name, update in chunk.items():
+            yield node_name, update
@@ -0,0 +1,82 @@
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.core.metrics import llm_request_duration, llm_tokens
+
+
+def _token_usage(response: LLMResult) -> Tuple[int, int]:
+    """
+    取出一次调用的 (prompt, completion) token 数：
+    优先使用消息上的 usage_metadata，否则退回 OpenAI 兼容接口返回的 token_usage。
+    """
+    prompt = completion = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                found = True
+                prompt += usage.get("input_tokens", 0)
+                completion += usage.get("output_tokens", 0)
+    if not found:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt = usage.get("prompt_tokens", 0)
+        completion = usage.get("completion_tokens", 0)
+    return prompt, completion
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    记录每次模型调用的耗时与 token 数，按 LangGraph 节点（metadata 中的 langgraph_node）区分。
+    不在图中的调用（如评论回复）记为 none。
+    """
+
+    # 在事件循环中直接调用，不转到线程池
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._started: Dict[UUID, Tuple[float, str]] = {}
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]]) -> None:
+        node = (metadata or {}).get("langgraph_node") or "none"
+        self._started[run_id] = (time.perf_counter(), node)
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs: Any
+    ) -> None:
+        self._start(run_id, metadata)
+
+    def on_llm_start(
+        self, serialized, prompts, *, run_id: UUID, metadata=None, **kwargs: Any
+    ) -> None:
+        self._start(run_id, metadata)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        start, node = started
+        llm_request_duration.observe(
+            time.perf_counter() - start, node=node, status="success"
+        )
+        prompt, completion = _token_usage(response)
+        if prompt:
+            llm_tokens.inc(prompt, node=node, kind="prompt")
+        if completion:
+            llm_tokens.inc(completion, node=node, kind="completion")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        start, node = started
+        llm_request_duration.observe(
+            time.perf_counter() - start, node=node, status="error"
+        )
+
+
+llm_metrics_handler = LLMMetricsHandler()
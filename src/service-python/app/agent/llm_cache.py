@@ -0,0 +1,218 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import xxhash
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from app.core.metrics import llm_cache_requests
+
+logger = logging.getLogger(__name__)
+
+
+class CacheMissError(RuntimeError):
+    """确定性回放模式下，请求没有对应的录制响应。"""
+
+
+def make_cache_key(prompt: str, llm_string: str) -> str:
+    """
+    基于内容计算缓存键。
+    prompt 是序列化后的消息列表；llm_string 由 LangChain 生成，
+    包含模型名、temperature 等参数以及本次调用绑定的 tools / response_format。
+    """
+    hasher = xxhash.xxh3_128()
+    hasher.update(llm_string.encode("utf-8"))
+    hasher.update(b"\x00")
+    hasher.update(prompt.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def _dumps_generations(generations: RETURN_VAL_TYPE) -> str:
+    return json.dumps([dumps(g) for g in generations])
+
+
+def _loads_generations(payload: str) -> RETURN_VAL_TYPE:
+    return [loads(g) for g in json.loads(payload)]
+
+
+class _StatsMixin:
+    replay: bool = False
+
+    def _init_stats(self, replay: bool) -> None:
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+
+    def _record(self, value: Optional[RETURN_VAL_TYPE], key: str):
+        if value is None:
+            self.misses += 1
+            llm_cache_requests.inc(result="miss")
+            if self.replay:
+                raise CacheMissError(f"回放模式下缺少录制的模型响应: {key}")
+        else:
+            self.hits += 1
+            llm_cache_requests.inc(result="hit")
+        return value
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+class MemoryLRUCache(_StatsMixin, BaseCache):
+    """
+    进程内 LRU 缓存，按条目数淘汰，支持 TTL（秒，0 表示不过期）。
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 0, replay: bool = False):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._init_stats(replay)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = make_cache_key(prompt, llm_string)
+        value = None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, generations = entry
+                if expires_at and expires_at < time.time():
+                    del self._data[key]
+                else:
+                    self._data.move_to_end(key)
+                    value = generations
+        return self._record(value, key)
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE
+    ) -> None:
+        key = make_cache_key(prompt, llm_string)
+        expires_at = time.time() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._data[key] = (expires_at, return_val)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteLLMCache(_StatsMixin, BaseCache):
+    """
+    基于 SQLite 的磁盘缓存，可跨进程、跨运行复用，也用作确定性回放的录制文件。
+    超出 max_entries 时按最近访问时间淘汰。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 100_000,
+        ttl: int = 0,
+        replay: bool = False,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    generations TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed_at "
+                "ON llm_cache(accessed_at)"
+            )
+        self._init_stats(replay)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = make_cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT generations, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] and row[1] < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            elif row is not None:
+                self._conn.execute(
+                    "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+        value = _loads_generations(row[0]) if row is not None else None
+        return self._record(value, key)
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE
+    ) -> None:
+        key = make_cache_key(prompt, llm_string)
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else 0
+        payload = _dumps_generations(return_val)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now),
+            )
+            self._conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+
+def create_llm_cache(
+    backend: str,
+    *,
+    path: str,
+    max_entries: int,
+    ttl: int,
+    replay: bool,
+) -> Optional[BaseCache]:
+    """
+    根据配置创建缓存；backend 为 "none" 时返回 None（不缓存）。
+    回放模式要求使用磁盘缓存，未命中时抛出 CacheMissError 而不是访问模型。
+    """
+    if replay and backend != "sqlite":
+        raise ValueError("LLM_CACHE_REPLAY 需要配合 LLM_CACHE_BACKEND=sqlite 使用")
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryLRUCache(max_entries=max_entries, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteLLMCache(path, max_entries=max_entries, ttl=ttl, replay=replay)
+    raise ValueError(f"未知的 LLM_CACHE_BACKEND: {backend}")
@@ -1,29 +1,102 @@
 from app.core.config import settings
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langgraph.prebuilt import ToolNode
+from langchain_core.runnables import RunnableConfig
 from typing import cast
 from .prompts import *
-from .tools import all_tools
-from .state import State, Plan
+from .tool_registry import get_tool_set
+from .state import State, Plan, StepPatch
+from .context import build_context, count_tokens, render_messages
+from .llm_cache import create_llm_cache
+from .executor import execute_tool_calls
+from .instrumentation import llm_metrics_handler
+from app.services.thought_sink import thought_sink
 import logging
-import copy
 
 logger = logging.getLogger(__name__)
 
+# 模型响应缓存，按 (模型参数, 绑定的工具, 消息内容) 哈希命中
+llm_cache = create_llm_cache(
+    settings.LLM_CACHE_BACKEND,
+    path=settings.LLM_CACHE_PATH,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl=settings.LLM_CACHE_TTL,
+    replay=settings.LLM_CACHE_REPLAY,
+)
+
 # 初始化模型
 llm = ChatOpenAI(
     model=settings.OPENAI_MODEL,
     base_url=settings.OPENAI_BASE_URL,
     temperature=0.7,
-    streaming=False,
+    # 不显式设置 streaming：普通调用走非流式接口，
+    # 只有通过 astream_events 订阅时才会按 token 流式返回
+    cache=llm_cache,
+    # 记录各节点的调用耗时与 token 数，见 /metrics
+    callbacks=[llm_metrics_handler],
 )
 
-# 工具调用节点
-tool_node = ToolNode(tools=all_tools)
+
+def _clip(text: str, limit: int = settings.THOUGHT_TOOL_OUTPUT_CHARS) -> str:
+    # 工具输出可能有数 MB，思考记录只保留开头
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}...[省略 {len(text) - limit} 字符]"
+
+
+async def tool_executor_node(state: State, config: RunnableConfig):
+    """
+    工具调用节点：并发执行最后一条 AIMessage 中的所有工具调用。
+    """
+    logger.info("***正在运行 Tool Executor node***")
+    last_message = cast(AIMessage, state.messages[-1])
+    tool_set = get_tool_set(config)
+    tool_messages = await execute_tool_calls(tool_set.by_name, last_message)
+    for message in tool_messages:
+        await thought_sink.emit(
+            "tool_executor",
+            f"工具 {message.name} ({message.status}): {_clip(str(message.content))}",
+        )
+    return {"messages": tool_messages}
+
+
+def _describe_response(step_title: str, response: AIMessage) -> str:
+    calls = ", ".join(call["name"] for call in response.tool_calls)
+    text = f"[{step_title}] {response.content}"
+    return f"{text}\n调用工具: {calls}" if calls else text
+
+
+async def summarize_history(summary: str, messages: list) -> str:
+    """
+    将较早的对话增量折叠进已有摘要，供上下文窗口使用。
+    """
+    response = await llm.ainvoke(
+        [
+            SystemMessage(content=SUMMARY_SYSTEM_PROMPT),
+            HumanMessage(
+                content=SUMMARY_PROMPT.format(
+                    summary=summary or "（无）", history=render_messages(messages)
+                )
+            ),
+        ]
+    )
+    return str(response.content)
+
+
+async def build_node_context(state: State, prompts: list, budget: int):
+    return await build_context(
+        state.messages,
+        prompts,
+        summary=state.context_summary,
+        summarized_upto=state.summarized_upto,
+        budget=budget,
+        summary_reserve=settings.CONTEXT_SUMMARY_TOKENS,
+        max_messages=settings.MAX_CONVERSATION_HISTORY,
+        summarize=summarize_history,
+    )
 
 
-def planner_node(state: State):
+async def planner_node(state: State):
     logger.info("***正在运行 Planner node***")
     messages = [
         SystemMessage(content=PLAN_SYSTEM_PROMPT),
@@ -34,38 +107,74 @@ def planner_node(state: State):
     # zhipu
     plan = cast(
         Plan,
-        llm.with_structured_output(Plan, method="json_mode")
+        await llm.with_structured_output(Plan, method="json_mode")
         .bind(response_format={"type": "json_object"})
-        .invoke(messages),
+        .ainvoke(messages),
     )
 
+    # 结构化输出解析为 Plan 时已补全缺失的步骤 id 并为重复的 id 加后缀
+    # （见 Plan._unique_step_ids），依赖关系通过唯一的 id 引用
+
     plan_json = plan.model_dump_json(indent=2, exclude_none=True)
     ai_message_content = (
         f"已为您生成了详细的执行计划。\n"
         f"思考过程: {plan.thought}\n"
         f"完整计划如下:\n```json\n{plan_json}\n```"
     )
+    await thought_sink.emit("planner", ai_message_content)
     return {"plan": plan, "messages": [AIMessage(content=ai_message_content)]}
 
 
-def marker_node(state: State):
+async def marker_node(state: State):
     logger.info("***正在运行 Marker node***")
-    plan = copy.deepcopy(state.plan)
+    step = state.plan.current_step()
+    if step is None:
+        return {}
 
-    for step in plan.steps:
-        if step.status == "pending":
-            step.status = "completed"
-            logger.info(f"步骤 '{step.title}' 已标记为完成。")
-            break
+    logger.info(f"步骤 '{step.title}' 已标记为完成。")
+    await thought_sink.emit("marker", f"步骤 '{step.title}' 已标记为完成。")
+    # 只返回这一步的状态变更，由 merge_plan 原地应用，不复制整个计划
+    return {"plan": StepPatch(step_id=step.id)}
 
-    return {"plan": plan}
+
+def _step_prompts(state: State, step) -> list:
+    return state.observations + [
+        SystemMessage(content=EXECUTE_SYSTEM_PROMPT),
+        HumanMessage(
+            content=EXECUTION_PROMPT.format(
+                user_message=state.user_message, step=step.description
+            )
+        ),
+    ]
 
 
-def agent_node(state: State):
+async def join_node(state: State):
+    """
+    汇合节点：等待本轮并行分发的所有步骤执行完毕，再由 dispatch_steps 决定下一轮。
+
+    各步骤子图中的摘要不会合并回全局状态（它们覆盖的消息下标彼此不一致），
+    因此在分发下一轮之前先把全局历史折叠一次：按本轮各步骤中最长的提示词计算预算，
+    子图中的 agent 节点拿到的历史已在预算内，不会各自重复摘要同一段历史。
+    """
+    logger.info("***正在运行 Join node***")
+    logger.info(f"计划进度: {state.plan.completed_count}/{len(state.plan.steps)}")
+    batch = state.plan.ready_steps()[: settings.PLAN_MAX_PARALLEL_STEPS]
+    if not batch:
+        return {}
+    prompts = max((_step_prompts(state, step) for step in batch), key=count_tokens)
+    context = await build_node_context(state, prompts, settings.AGENT_CONTEXT_TOKENS)
+    if context.summarized_upto == state.summarized_upto:
+        return {}
+    return {
+        "context_summary": context.summary,
+        "summarized_upto": context.summarized_upto,
+    }
+
+
+async def agent_node(state: State, config: RunnableConfig):
     logger.info("***正在运行 Agent 思考节点***")
 
-    plan = state.plan
-    current_step = next((step for step in plan.steps if step.status == "pending"), None)
+    current_step = state.plan.current_step()
 
     if not current_step:
         # 如果没有待处理的步骤，说明计划已完成
@@ -73,30 +182,31 @@ def agent_node(state: State):
 
     logger.info(f"当前执行STEP:{current_step.description}")
 
-    messages = (
-        state.messages
-        + state.observations
-        + [
-            SystemMessage(content=EXECUTE_SYSTEM_PROMPT),
-            HumanMessage(
-                content=EXECUTION_PROMPT.format(
-                    user_message=state.user_message, step=current_step.description
-                )
-            ),
-        ]
-    )
+    prompts = _step_prompts(state, current_step)
+    context = await build_node_context(state, prompts, settings.AGENT_CONTEXT_TOKENS)
 
-    response = llm.bind_tools(all_tools).invoke(messages)
+    response = await llm.bind_tools(get_tool_set(config).schemas).ainvoke(context.messages)
+    await thought_sink.emit("agent", _describe_response(current_step.title, response))
 
-    return {"messages": [response]}
+    return {
+        "messages": [response],
+        "context_summary": context.summary,
+        "summarized_upto": context.summarized_upto,
+        "tokens_saved": context.tokens_saved,
+    }
 
 
-def report_node(state: State):
+async def report_node(state: State, config: RunnableConfig):
     logger.info("***正在运行 Report 节点***")
-    messages = (
-        state.messages
-        + [SystemMessage(content=REPORT_SYSTEM_PROMPT)]
-        + [HumanMessage(content=REPORT_PROMPT)]
-    )
-    response = llm.bind_tools(all_tools).invoke(messages)
-    return {"final_report": response.content}
+    prompts = [
+        SystemMessage(content=REPORT_SYSTEM_PROMPT),
+        HumanMessage(content=REPORT_PROMPT),
+    ]
+    context = await build_node_context(state, prompts, settings.REPORT_CONTEXT_TOKENS)
+
+    response = await llm.bind_tools(get_tool_set(config).schemas).ainvoke(context.messages)
+
+    tokens_saved = state.tokens_saved + context.tokens_saved
+    logger.info(f"本次运行上下文裁剪共节省 {tokens_saved} tokens")
+    await thought_sink.emit("reporter", str(response.content))
+    return {"final_report": response.content, "tokens_saved": context.tokens_saved}
@@ -1,26 +1,214 @@
-from typing import List, Literal
+from typing import Dict, List, Literal, Optional, Union
+import bisect
 import operator
 from typing import Annotated
 from langchain_core.messages import BaseMessage
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, SkipValidation, model_validator
 
 
 class Step(BaseModel):
+    id: str = ""
     title: str = ""
     description: str = ""
     status: Literal["pending", "completed"] = "pending"
+    # 依赖的步骤 id；None 表示依赖上一个步骤（顺序执行），[] 表示可以立即执行
+    depends_on: Optional[List[str]] = None
+
+
+class StepPatch(BaseModel):
+    """
+    对单个步骤状态的增量更新，由 plan 的 reducer 原地应用，不复制整个计划。
+    """
+
+    step_id: str
+    status: Literal["pending", "completed"] = "completed"
+
+
+class _PlanIndex:
+    """
+    Plan 的增量索引：步骤 id 到下标、依赖关系、剩余依赖数和可执行步骤。
+    使用普通对象而不是多个 pydantic 私有属性，热路径上只访问一次私有属性。
+    """
+
+    __slots__ = ("positions", "dependents", "remaining", "ready", "completed")
+
+    def __init__(self, steps: List[Step]):
+        positions: Dict[str, int] = {}
+        for i, step in enumerate(steps):
+            # 重复的 id 会让 StepPatch 只作用于第一个同名步骤，其余步骤永远无法完成
+            if step.id in positions:
+                raise ValueError(f"计划中存在重复的步骤 id: {step.id!r}")
+            positions[step.id] = i
+        dependents: List[List[int]] = [[] for _ in steps]
+        remaining = [0] * len(steps)
+        for i, step in enumerate(steps):
+            if step.depends_on is None:
+                deps = {i - 1} if i > 0 else set()
+            else:
+                deps = {positions[dep] for dep in step.depends_on if dep in positions}
+            for dep in deps:
+                if steps[dep].status != "completed":
+                    dependents[dep].append(i)
+                    remaining[i] += 1
+        self.positions = positions
+        self.dependents = dependents
+        self.remaining = remaining
+        # 依赖均已完成的待处理步骤下标，保持升序
+        self.ready = [
+            i
+            for i, step in enumerate(steps)
+            if step.status == "pending" and remaining[i] == 0
+        ]
+        self.completed = sum(step.status == "completed" for step in steps)
 
 
 class Plan(BaseModel):
     goal: str = ""
     thought: str = ""
     steps: List[Step] = []
+    # 第一个未完成步骤的下标，等于 len(steps) 时计划已全部完成
+    cursor: int = 0
+
+    # 第一次访问时根据 steps 建立，之后随 StepPatch 增量维护
+    _progress: Optional[_PlanIndex] = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def _unique_step_ids(self) -> "Plan":
+        """
+        补全缺失的步骤 id，并为重复的 id 加后缀（s1、s1-2、...），保证 id 唯一。
+        depends_on 中引用重复 id 的依赖指向它之前最近的同名步骤，没有时指向第一个。
+        """
+        original = [step.id or f"s{i}" for i, step in enumerate(self.steps, start=1)]
+        if len(set(original)) == len(original) and all(step.id for step in self.steps):
+            return self
+
+        occurrences: Dict[str, List[int]] = {}
+        for i, step_id in enumerate(original):
+            occurrences.setdefault(step_id, []).append(i)
+        taken = set(original)
+        unique = list(original)
+        for positions in occurrences.values():
+            for i in positions[1:]:
+                suffix = 2
+                while f"{original[i]}-{suffix}" in taken:
+                    suffix += 1
+                unique[i] = f"{original[i]}-{suffix}"
+                taken.add(unique[i])
+
+        def resolve(dep: str, i: int) -> str:
+            positions = occurrences.get(dep)
+            if not positions:
+                return dep
+            earlier = [p for p in positions if p < i]
+            return unique[earlier[-1] if earlier else positions[0]]
+
+        for i, step in enumerate(self.steps):
+            step.id = unique[i]
+            if step.depends_on is not None:
+                step.depends_on = [resolve(dep, i) for dep in step.depends_on]
+        return self
+
+    def _index(self) -> _PlanIndex:
+        progress = self._progress
+        if progress is None:
+            progress = self._progress = _PlanIndex(self.steps)
+            # 游标以步骤状态为准，不信任模型输出中可能携带的值
+            self.cursor = 0
+            self._advance_cursor()
+        return progress
+
+    def _advance_cursor(self) -> None:
+        cursor = self.cursor
+        while cursor < len(self.steps) and self.steps[cursor].status == "completed":
+            cursor += 1
+        if cursor != self.cursor:
+            self.cursor = cursor
+
+    def step(self, step_id: str) -> Optional[Step]:
+        i = self._index().positions.get(step_id)
+        return None if i is None else self.steps[i]
+
+    def current_step(self) -> Optional[Step]:
+        """
+        第一个未完成的步骤（按计划顺序），没有时返回 None。
+        """
+        self._index()
+        return self.steps[self.cursor] if self.cursor < len(self.steps) else None
+
+    def is_complete(self) -> bool:
+        self._index()
+        return self.cursor >= len(self.steps)
+
+    @property
+    def completed_count(self) -> int:
+        return self._index().completed
+
+    def ready_steps(self) -> List[Step]:
+        """
+        返回所有依赖均已完成、可以立即执行的待处理步骤。
+        """
+        return [self.steps[i] for i in self._index().ready]
+
+    def apply(self, patch: StepPatch) -> None:
+        """
+        原地把一个步骤标记为完成，并更新游标与可执行步骤；重复应用没有副作用。
+        只支持 pending -> completed：已完成的步骤不会回退。
+        """
+        progress = self._index()
+        i = progress.positions.get(patch.step_id)
+        if i is None or patch.status != "completed":
+            return
+        step = self.steps[i]
+        if step.status == "completed":
+            return
+        step.status = "completed"
+        progress.completed += 1
+        ready = progress.ready
+        position = bisect.bisect_left(ready, i)
+        if position < len(ready) and ready[position] == i:
+            del ready[position]
+        for dependent in progress.dependents[i]:
+            progress.remaining[dependent] -= 1
+            if (
+                progress.remaining[dependent] == 0
+                and self.steps[dependent].status == "pending"
+            ):
+                bisect.insort(ready, dependent)
+        self._advance_cursor()
+
+
+def merge_plan(current: Plan, update: Union[Plan, StepPatch, List[StepPatch]]) -> Plan:
+    """
+    plan 的 reducer：
+    - 新的 Plan（planner 生成）直接替换当前计划；
+    - StepPatch（或一组 StepPatch，例如并行步骤各自完成）原地应用到当前计划，
+      标记、选取下一步和完成判断都是 O(1)，不复制整个计划。
+    """
+    if isinstance(update, Plan):
+        return update
+    for patch in update if isinstance(update, list) else [update]:
+        current.apply(patch)
+    return current
 
 
 class State(BaseModel):
     user_message: str
-    plan: Plan = Field(default_factory=Plan)
-    messages: Annotated[List[BaseMessage], operator.add] = []
+    plan: Annotated[Plan, merge_plan] = Field(default_factory=Plan)
+    messages: Annotated[List[BaseMessage], SkipValidation, operator.add] = []
     observations: Annotated[list, operator.add] = []
     final_report: str = ""
+    # 上下文窗口：messages[:summarized_upto] 已折叠进 context_summary
+    context_summary: str = ""
+    summarized_upto: int = 0
+    # 本次运行因上下文裁剪累计节省的 token 数
+    tokens_saved: Annotated[int, operator.add] = 0
+
+
+class StepTask(BaseModel):
+    """
+    分发给单步执行子图的任务：state 为分发时的全局状态，step_id 为要执行的步骤。
+    """
+
+    step_id: str
+    state: State
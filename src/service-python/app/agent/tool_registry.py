@@ -0,0 +1,370 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import asyncio
+import importlib
+import importlib.metadata
+import inspect
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import xxhash
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from sqlmodel import select
+
+from app.agent.tools import all_tools
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import tool_registry_bind_duration, tool_registry_load_duration
+from app.models import CacheVersion, Tool
+from app.services.snapshot_cache import SnapshotCache
+
+try:
+    import fcntl
+except ImportError:  # Windows：单机开发时不做跨进程加锁
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 运行配置中存放本次运行工具集的键
+CONFIG_KEY = "tool_set"
+
+
+class ToolSet:
+    """
+    一次运行可用的工具：内置工具加上 tools 表中的动态工具。
+    模型绑定用的 schema 在构建时就已转换好，每次模型调用不再重复转换。
+    """
+
+    __slots__ = ("version", "tools", "by_name", "schemas")
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        schemas: Optional[Sequence[dict]] = None,
+        version: Optional[int] = None,
+    ):
+        self.version = version
+        self.tools = list(tools)
+        self.by_name: Dict[str, BaseTool] = {tool.name: tool for tool in self.tools}
+        if schemas is None:
+            schemas = [convert_to_openai_tool(tool) for tool in self.tools]
+        self.schemas = list(schemas)
+
+
+def tool_hash(row: Tool) -> str:
+    # 名称、描述、代码和依赖任一变化都视为新工具，重新编译
+    payload = json.dumps(
+        [row.name, row.description, row.code, sorted(row.dependencies or [])],
+        ensure_ascii=False,
+    )
+    return xxhash.xxh3_128_hexdigest(payload.encode("utf-8"))
+
+
+def compile_tool(name: str, description: Optional[str], code: str) -> BaseTool:
+    """
+    执行工具代码并包装为 LangChain 工具。代码中需要定义与工具同名的函数（或名为 run 的函数），
+    参数的类型注解即工具的参数 schema；支持 async def。
+    """
+    namespace: Dict[str, Any] = {"__name__": f"dynamic_tools.{name}"}
+    exec(compile(code, f"<tool {name}>", "exec"), namespace)
+    func = namespace.get(name) or namespace.get("run")
+    if not callable(func):
+        raise ValueError(f"工具代码中没有定义函数 {name} 或 run")
+    description = description or inspect.getdoc(func) or name
+    if inspect.iscoroutinefunction(func):
+        return StructuredTool.from_function(
+            coroutine=func, name=name, description=description
+        )
+    return StructuredTool.from_function(func=func, name=name, description=description)
+
+
+class DependencyEnv:
+    """
+    所有动态工具共用的依赖目录：用 pip install --target 安装，追加到 sys.path 末尾。
+    已安装的依赖记录在目录下的 installed.json 中，多个工作进程通过文件锁串行安装，
+    同一依赖只会安装一次。所有工具共享一个环境，版本冲突时以先安装的为准。
+
+    安装时以服务自身已安装的包版本作为约束（pip -c），传递依赖不会装成与服务不同的版本；
+    目录排在 site-packages 之后，服务已导入或已安装的包始终优先，不会被工具依赖遮蔽。
+    """
+
+    def __init__(self, root: str, timeout: int):
+        self.root = os.path.abspath(root)
+        self.timeout = timeout
+        self._manifest = os.path.join(self.root, "installed.json")
+        self._installed: set = set()
+        self._lock = asyncio.Lock()
+
+    def _read_manifest(self) -> set:
+        try:
+            with open(self._manifest, encoding="utf-8") as f:
+                return set(json.load(f))
+        except (OSError, ValueError):
+            return set()
+
+    def activate(self) -> None:
+        if self.root not in sys.path:
+            sys.path.append(self.root)
+            importlib.invalidate_caches()
+
+    def satisfied(self, specs: Iterable[str]) -> bool:
+        """依赖是否都已安装（本进程或其它进程装过的都算）。"""
+        if not self._installed:
+            self._installed = self._read_manifest()
+        return all(spec in self._installed for spec in specs)
+
+    def _write_constraints(self) -> str:
+        # 服务环境中每个已安装的发行版固定为当前版本，不包括依赖目录自身中的包
+        pins = set()
+        for dist in importlib.metadata.distributions():
+            name = dist.metadata["Name"]
+            location = os.path.abspath(str(dist.locate_file("")))
+            if name and not location.startswith(self.root + os.sep):
+                pins.add(f"{name}=={dist.version}")
+        path = os.path.join(self.root, "constraints.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(sorted(pins)) + "\n")
+        return path
+
+    def _install_sync(self, specs: List[str]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # 等锁期间其他进程可能已经装好
+            installed = self._read_manifest()
+            missing = [spec for spec in specs if spec not in installed]
+            if missing:
+                logger.info(f"安装工具依赖: {missing}")
+                constraints = self._write_constraints()
+                subprocess.run(
+                    [sys.executable, "-m", "pip", "install", "--quiet",
+                     "--disable-pip-version-check", "--target", self.root,
+                     "-c", constraints, *missing],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                    timeout=self.timeout,
+                )
+                installed.update(missing)
+                tmp = self._manifest + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(sorted(installed), f)
+                os.replace(tmp, self._manifest)
+            self._installed = installed
+
+    async def ensure(self, specs: Iterable[str]) -> None:
+        specs = sorted(set(specs))
+        if not specs:
+            return
+        async with self._lock:
+            if self.satisfied(specs):
+                self.activate()
+                return
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._install_sync, specs)
+            self.activate()
+
+
+class ToolRegistry:
+    """
+    进程内的动态工具注册表。
+
+    - tools 表的版本号由触发器维护，按 TABLE_VERSION_CACHE_TTL 缓存并随失效通知提前过期；
+      版本未变时直接复用上一次构建的 ToolSet，运行开始时不访问数据库；
+    - 版本变化时重新读取工具行，只编译代码哈希未见过的工具，编译结果在进程内常驻；
+    - 依赖缺失的工具在后台安装依赖，本次刷新先发布不含这些工具的 ToolSet，
+      运行开始时不会等待 pip；安装完成后使缓存失效，下一次读取再编译并发布；
+    - 编译或安装失败的工具按哈希记录，不会每次刷新都重试。
+    """
+
+    def __init__(self, env: DependencyEnv, ttl: float):
+        self.env = env
+        # 代码哈希 -> (工具, 绑定 schema)
+        self._compiled: Dict[str, Tuple[BaseTool, dict]] = {}
+        self._failed: Dict[str, str] = {}
+        self._builtin = ToolSet(all_tools)
+        self._tool_set = self._builtin
+        self._version: Optional[int] = None
+        # 安装任务每完成一次加一；加载期间若有变化，说明结果可能是依赖就绪前构建的
+        self._reloads = 0
+        self._installing: Optional[asyncio.Task] = None
+        # 与 bump_cache_version 触发器发出的失效通知同名
+        self._cache = SnapshotCache("table_version:tools", self._load, ttl=ttl)
+
+    async def _fetch_version(self) -> Optional[int]:
+        async with AsyncSessionLocal() as session:
+            result = await session.exec(
+                select(CacheVersion.version).where(CacheVersion.name == "tools")
+            )
+            return result.first()
+
+    async def _fetch_rows(self) -> List[Tool]:
+        async with AsyncSessionLocal() as session:
+            result = await session.exec(select(Tool).order_by(Tool.name))
+            return list(result.all())
+
+    async def _load(self) -> ToolSet:
+        reloads = self._reloads
+        version = await self._fetch_version()
+        # 没有版本行（旧库结构）时每次过期都重新读取工具行
+        if version is not None and version == self._version and reloads == self._reloads:
+            return self._tool_set
+
+        start = time.perf_counter()
+        rows = await self._fetch_rows()
+        tool_registry_load_duration.observe(time.perf_counter() - start, phase="fetch")
+        tool_set = await self.build(rows, version)
+        # 加载期间安装任务已完成：结果只交给本次等待者，不发布也不记录版本，
+        # 否则失效后开始的那次重建会被这个旧结果覆盖，或被版本短路跳过
+        if reloads != self._reloads:
+            return tool_set
+        self._tool_set = tool_set
+        self._version = version
+        return tool_set
+
+    async def build(self, rows: Sequence[Tool], version: Optional[int] = None) -> ToolSet:
+        """
+        由工具行构建 ToolSet。已编译过的代码直接复用，只处理新增或修改过的行。
+        """
+        builtin = set(self._builtin.by_name)
+        live: Dict[str, Tool] = {}
+        for row in rows:
+            if row.name in builtin:
+                logger.warning(f"动态工具 {row.name} 与内置工具重名，已忽略")
+            elif row.code:
+                live[tool_hash(row)] = row
+        pending = []
+        waiting = []
+        for key, row in live.items():
+            if key in self._compiled or key in self._failed:
+                continue
+            if row.dependencies and not self.env.satisfied(row.dependencies):
+                waiting.append(row)
+            else:
+                pending.append((key, row))
+
+        if waiting:
+            self._install_in_background(waiting)
+        if pending:
+            if any(row.dependencies for _, row in pending):
+                self.env.activate()
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            # 工具代码的模块级语句可能导入较重的依赖，放到线程中执行
+            await loop.run_in_executor(None, self._compile_all, pending)
+            tool_registry_load_duration.observe(
+                time.perf_counter() - start, phase="compile"
+            )
+
+        # 已被修改或删除的工具不再保留；正在进行的运行仍持有旧 ToolSet 的引用
+        self._compiled = {k: v for k, v in self._compiled.items() if k in live}
+        self._failed = {k: v for k, v in self._failed.items() if k in live}
+        dynamic = [self._compiled[key] for key in live if key in self._compiled]
+        logger.info(
+            f"工具集已更新: 版本 {version}, 内置 {len(builtin)} 个, 动态 {len(dynamic)} 个, "
+            f"本次编译 {len(pending)} 个, 等待安装依赖 {len(waiting)} 个"
+        )
+        return ToolSet(
+            [*self._builtin.tools, *(tool for tool, _ in dynamic)],
+            [*self._builtin.schemas, *(schema for _, schema in dynamic)],
+            version=version,
+        )
+
+    def _install_in_background(self, rows: Sequence[Tool]) -> None:
+        # 同时只有一个安装任务；它结束后的那次重建会把仍缺依赖的工具交给下一个任务
+        if self._installing is not None and not self._installing.done():
+            return
+        self._installing = asyncio.ensure_future(self._install_then_reload(rows))
+
+    async def _install_then_reload(self, rows: Sequence[Tool]) -> None:
+        try:
+            await self._install(rows)
+        except Exception as e:
+            logger.exception("安装工具依赖失败")
+            # 未预期的错误同样按哈希记录，避免每次刷新都重新触发安装
+            for row in rows:
+                self._failed.setdefault(tool_hash(row), f"依赖安装失败: {e!r}")
+        finally:
+            # 依赖就绪（或已记录为失败）后重新构建，新工具在下一次读取时发布
+            self._reloads += 1
+            self._version = None
+            self._cache.invalidate()
+
+    async def _install(self, rows: Sequence[Tool]) -> None:
+        specs = {spec for row in rows for spec in row.dependencies or []}
+        if not specs:
+            return
+        start = time.perf_counter()
+        try:
+            await self.env.ensure(specs)
+        except (OSError, subprocess.SubprocessError) as e:
+            detail = getattr(e, "stderr", None) or repr(e)
+            # 整批安装失败时逐个工具重试，只跳过依赖确实装不上的工具
+            for row in rows:
+                if not row.dependencies:
+                    continue
+                try:
+                    await self.env.ensure(row.dependencies)
+                except (OSError, subprocess.SubprocessError):
+                    self._failed[tool_hash(row)] = f"依赖安装失败: {detail}"
+                    logger.warning(f"工具 {row.name} 的依赖 {row.dependencies} 安装失败: {detail}")
+        finally:
+            tool_registry_load_duration.observe(time.perf_counter() - start, phase="install")
+
+    def _compile_all(self, pending: Sequence[Tuple[str, Tool]]) -> None:
+        for key, row in pending:
+            if key in self._failed:
+                continue
+            try:
+                tool = compile_tool(row.name, row.description, row.code)
+                self._compiled[key] = (tool, convert_to_openai_tool(tool))
+            except Exception as e:
+                self._failed[key] = repr(e)
+                logger.warning(f"工具 {row.name} 编译失败: {e!r}")
+
+    @property
+    def current(self) -> ToolSet:
+        return self._tool_set
+
+    async def get(self) -> ToolSet:
+        """
+        当前可用的工具集。数据库不可用时沿用上一次成功加载的结果。
+        """
+        if not settings.TOOL_REGISTRY_ENABLED:
+            return self._tool_set
+        start = time.perf_counter()
+        try:
+            return await self._cache.get()
+        except Exception as e:
+            logger.warning(f"加载动态工具失败，沿用当前工具集: {e!r}")
+            return self._tool_set
+        finally:
+            tool_registry_bind_duration.observe(time.perf_counter() - start)
+
+
+tool_registry = ToolRegistry(
+    DependencyEnv(settings.TOOL_ENV_DIR, timeout=settings.TOOL_INSTALL_TIMEOUT),
+    ttl=settings.TABLE_VERSION_CACHE_TTL,
+)
+
+
+async def with_tool_set(config: Optional[RunnableConfig] = None) -> RunnableConfig:
+    """
+    在运行开始时解析工具集并放入运行配置，整个运行（包括各步骤子图）使用同一份工具。
+    """
+    config = dict(config or {})
+    configurable = dict(config.get("configurable") or {})
+    configurable.setdefault(CONFIG_KEY, await tool_registry.get())
+    config["configurable"] = configurable
+    return config  # type: ignore
+
+
+def get_tool_set(config: Optional[Mapping[str, Any]]) -> ToolSet:
+    tool_set = ((config or {}).get("configurable") or {}).get(CONFIG_KEY)
+    return tool_set if tool_set is not None else tool_registry.current
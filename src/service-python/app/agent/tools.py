@@ -1,8 +1,39 @@
+from app.core.config import settings
+from app.agent.blob_store import BlobWriter, blob_store, describe_blob
+from app.agent.executor import _tool_thread_pool
 from langchain_core.tools import tool
+from contextvars import ContextVar
+from typing import Optional
+import asyncio
+import locale
+import logging
 import os
-import subprocess
+import signal
+import time
 from pydantic import BaseModel, Field
 
+logger = logging.getLogger(__name__)
+
+# 当前运行的工作目录。后台工作进程为每个运行设置独立目录，
+# 未设置时退回到进程的当前目录，保持单机直接运行时的行为
+workspace_dir: ContextVar[Optional[str]] = ContextVar("workspace_dir", default=None)
+
+
+def get_workspace() -> str:
+    return workspace_dir.get() or os.getcwd()
+
+
+def resolve_in_workspace(file_name: str) -> str:
+    """
+    把模型给出的文件名解析为工作目录内的真实路径。绝对路径、.. 或指向目录外的符号链接
+    都会被拒绝，保证每个运行只能写自己的工作目录。
+    """
+    root = os.path.realpath(get_workspace())
+    path = os.path.realpath(os.path.join(root, file_name))
+    if os.path.commonpath([root, path]) != root or path == root:
+        raise ValueError(f"文件路径 {file_name!r} 不在工作目录内，请使用相对路径")
+    return path
+
 
 class File_Query(BaseModel):
     file_name: str = Field(description="文件名")
@@ -23,15 +54,145 @@ def create_file(file_name: str, content: str):
     - file_name: 文件名（包含扩展名）
     - content: 要写入的文件内容
 
-    注意：如果文件已存在，它将被覆盖。
+    注意：如果文件已存在，它将被覆盖；文件只能写在当前工作目录内。
     """
-    with open(file_name, "w", encoding="utf-8") as f:
+    # 路径越界时抛出异常，由工具执行器转换为 status="error" 的结果返回给模型
+    with open(resolve_in_workspace(file_name), "w", encoding="utf-8") as f:
         f.write(content)
     return f"文件 '{file_name}' 已成功创建并写入内容。"
 
 
-@tool
-def shell_exec(command: str) -> dict:
+class _OutputBuffer:
+    """
+    增量捕获子进程输出：保留开头 head_limit 字节和末尾 tail_limit 字节，
+    中间部分丢弃，内存占用与输出总量无关。
+    spill 为 True 时，输出一旦超出保留范围，完整内容会边读边压缩写入 blob 存储
+    （最多 BLOB_MAX_BYTES 字节，之后只保留首尾），模型可以用 read_blob 按偏移读取被省略的部分。
+    压缩和写文件都在工具线程池中执行，不阻塞事件循环；写入变慢时管道读取随之变慢。
+    """
+
+    def __init__(self, head_limit: int, tail_limit: int, spill: bool = False):
+        self.head_limit = head_limit
+        self.tail_limit = tail_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self.spill = spill
+        self.blob_id: Optional[str] = None
+        self.blob_size = 0
+        self._blob: Optional[BlobWriter] = None
+
+    async def _spill(self, chunk: bytes) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            if self._blob is None:
+                # 在 tail 被裁剪之前，head + tail 恰好是此前的全部输出
+                chunk = bytes(self.head) + bytes(self.tail) + chunk
+                self._blob = await loop.run_in_executor(_tool_thread_pool, blob_store.writer)
+            if not self._blob.truncated:
+                await loop.run_in_executor(_tool_thread_pool, self._blob.write, chunk)
+        except OSError as e:
+            logger.warning(f"输出写入 blob 失败，退回为只保留首尾: {e}")
+            await self.abort()
+
+    async def write(self, chunk: bytes) -> None:
+        if self.spill and (
+            self._blob is not None
+            or self.total + len(chunk) > self.head_limit + self.tail_limit
+        ):
+            await self._spill(chunk)
+        self.total += len(chunk)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk:
+            self.tail += chunk
+            if len(self.tail) > self.tail_limit:
+                del self.tail[: len(self.tail) - self.tail_limit]
+
+    async def finish(self) -> Optional[str]:
+        """结束写入，返回输出的 blob id；输出没有超出保留范围时为 None。"""
+        blob, self._blob = self._blob, None
+        if blob is not None:
+            try:
+                self.blob_id = await asyncio.get_running_loop().run_in_executor(
+                    _tool_thread_pool, blob.close
+                )
+                self.blob_size = blob.size
+            except (OSError, ValueError) as e:
+                logger.warning(f"输出写入 blob 失败: {e}")
+        return self.blob_id
+
+    async def abort(self) -> None:
+        self.spill = False
+        blob, self._blob = self._blob, None
+        if blob is not None:
+            try:
+                await asyncio.get_running_loop().run_in_executor(_tool_thread_pool, blob.abort)
+            except OSError:
+                pass
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + len(self.tail)
+
+    def render(self) -> str:
+        encoding = locale.getpreferredencoding(False)
+        head = self.head.decode(encoding, errors="replace")
+        tail = self.tail.decode(encoding, errors="replace")
+        if self.truncated:
+            omitted = self.total - len(self.head) - len(self.tail)
+            if self.blob_id:
+                return (
+                    f"{head}\n...[省略 {omitted} 字节；完整输出共 {self.total} 字节，"
+                    f"{describe_blob(self.blob_id, self.blob_size, self.total)}]...\n{tail}"
+                )
+            return f"{head}\n...[省略 {omitted} 字节]...\n{tail}"
+        return head + tail
+
+
+async def _pump(stream: Optional[asyncio.StreamReader], buffer: _OutputBuffer) -> None:
+    if stream is None:
+        return
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        await buffer.write(chunk)
+
+
+def _kill_process_tree(proc: asyncio.subprocess.Process) -> None:
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+_shell_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_shell_semaphore() -> asyncio.Semaphore:
+    # 所有并发运行共享同一个信号量，限制同时存在的子进程数
+    global _shell_semaphore
+    if _shell_semaphore is None:
+        _shell_semaphore = asyncio.Semaphore(settings.SHELL_MAX_CONCURRENCY)
+    return _shell_semaphore
+
+
+class Shell_Query(BaseModel):
+    command: str = Field(description="要执行的shell命令")
+    timeout: int = Field(
+        default=settings.SHELL_TIMEOUT,
+        description=f"超时时间（秒），超时后命令会被强制终止，最大 {settings.SHELL_MAX_TIMEOUT}",
+    )
+
+
+@tool(args_schema=Shell_Query)
+async def shell_exec(command: str, timeout: int = settings.SHELL_TIMEOUT) -> dict:
     """
     在shell中执行命令，用于运行代码、安装包、执行脚本等。
 
@@ -43,35 +204,128 @@ def shell_exec(command: str) -> dict:
 
     参数:
         command (str): 要执行的shell命令
+        timeout (int): 超时时间（秒），超时后命令及其子进程会被终止
 
     返回:
         dict: 包含执行结果
-            - stdout: 命令的标准输出
-            - stderr: 命令的标准错误
+            - exit_code: 退出码（超时被终止时为 None）
+            - stdout: 命令的标准输出（过长时只保留开头和结尾）
+            - stderr: 命令的标准错误（过长时只保留开头和结尾）
+            - timed_out: 是否超时
+            - stdout_truncated / stderr_truncated: 输出是否被截断
+            - stdout_blob / stderr_blob: 被截断时完整输出的 blob id，可用 read_blob 读取
 
     重要：代码必须先用create_file保存，再用此工具执行！
     """
+    timeout = max(1, min(timeout, settings.SHELL_MAX_TIMEOUT))
+    stdout = _OutputBuffer(
+        settings.SHELL_OUTPUT_HEAD_BYTES, settings.SHELL_OUTPUT_TAIL_BYTES, spill=True
+    )
+    stderr = _OutputBuffer(
+        settings.SHELL_OUTPUT_HEAD_BYTES, settings.SHELL_OUTPUT_TAIL_BYTES, spill=True
+    )
 
-    try:
-        # 执行命令
-        result = subprocess.run(
-            command,
-            shell=True,
-            cwd=os.getcwd(),
-            capture_output=True,
-            text=True,
-            check=False,
+    async with _get_shell_semaphore():
+        start = time.perf_counter()
+        try:
+            proc = await asyncio.create_subprocess_shell(
+                command,
+                cwd=get_workspace(),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                # 新建进程组，超时时连同子进程一起终止
+                start_new_session=True,
+            )
+        except Exception as e:
+            return {"error": {"stderr": str(e)}}
+
+        pumps = asyncio.gather(_pump(proc.stdout, stdout), _pump(proc.stderr, stderr))
+        timed_out = False
+        cancelled = False
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            _kill_process_tree(proc)
+            await proc.wait()
+        except asyncio.CancelledError:
+            cancelled = True
+            _kill_process_tree(proc)
+            raise
+        finally:
+            # 进程被杀后，孙进程可能仍持有管道，限定排空时间
+            try:
+                await asyncio.wait_for(pumps, timeout=5)
+            except asyncio.TimeoutError:
+                pass
+            # 排空之后再收尾，避免与仍在进行的写入交错
+            if cancelled:
+                await asyncio.gather(stdout.abort(), stderr.abort())
+        await asyncio.gather(stdout.finish(), stderr.finish())
+        # 耗时只记录在日志中（执行器另有 tool_duration 指标）：工具结果会进入后续提示词
+        # 和模型缓存的键，不能携带每次都不同的值
+        logger.info(
+            f"shell_exec 结束: exit_code={proc.returncode}, timed_out={timed_out}, "
+            f"耗时 {time.perf_counter() - start:.3f}s"
         )
 
-        # 返回结果
-        return {"message": {"stdout": result.stdout, "stderr": result.stderr}}
+    return {
+        "exit_code": None if timed_out else proc.returncode,
+        "stdout": stdout.render(),
+        "stderr": stderr.render(),
+        "timed_out": timed_out,
+        "stdout_truncated": stdout.truncated,
+        "stderr_truncated": stderr.truncated,
+        "stdout_blob": stdout.blob_id,
+        "stderr_blob": stderr.blob_id,
+    }
+
 
-    except Exception as e:
-        return {"error": {"stderr": str(e)}}
+class Blob_Query(BaseModel):
+    blob_id: str = Field(description="blob id（32 位十六进制），来自被省略输出中的提示")
+    offset: int = Field(default=0, description="起始字节偏移")
+    length: int = Field(
+        default=4096, description=f"读取的字节数，最大 {settings.BLOB_READ_MAX_BYTES}"
+    )
+
+
+@tool(args_schema=Blob_Query)
+def read_blob(blob_id: str, offset: int = 0, length: int = 4096) -> dict:
+    """
+    按字节偏移读取被存为 blob 的大块工具输出。
+
+    当工具结果中出现"已存为 blob ...，可用 read_blob 按偏移读取"的提示时，
+    用此工具查看被省略的部分，可从 next_offset 继续分段读取。
+
+    参数:
+        blob_id (str): blob id
+        offset (int): 起始字节偏移
+        length (int): 读取的字节数
+
+    返回:
+        dict: blob_id、offset、content、next_offset，以及是否已读到末尾 eof
+    """
+    offset = max(0, offset)
+    length = max(1, min(length, settings.BLOB_READ_MAX_BYTES))
+    try:
+        # 多读一个字节判断是否已到末尾
+        data = blob_store.read(blob_id, offset, length + 1)
+    except (ValueError, FileNotFoundError):
+        return {"error": f"blob {blob_id} 不存在"}
+    content = data[:length]
+    return {
+        "blob_id": blob_id,
+        "offset": offset,
+        "content": content.decode("utf-8", errors="replace"),
+        "next_offset": offset + len(content),
+        "eof": len(data) <= length,
+    }
 
 
 # 将所有工具放入一个列表
 all_tools = [
     create_file,
     shell_exec,
+    read_blob,
 ]
@@ -0,0 +1,147 @@
+# File: app/api/conditional.py
+
+import logging
+import re
+from typing import Any, Awaitable, Callable, List, Optional, Pattern, Tuple
+
+import xxhash
+from sqlmodel import select
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import CacheVersion
+from app.services.life_status import life_status_cache
+from app.services.snapshot_cache import SnapshotCache, caches
+
+logger = logging.getLogger(__name__)
+
+# 返回资源当前版本标记的函数；返回 None 表示无法判断，按普通请求处理
+VersionProvider = Callable[[], Awaitable[Optional[Any]]]
+
+
+def make_etag(*parts: Any) -> str:
+    digest = xxhash.xxh3_64_hexdigest(repr(parts).encode("utf-8"))
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    按弱比较规则判断 If-None-Match 是否包含 etag（忽略 W/ 前缀）。
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def table_version(name: str) -> VersionProvider:
+    """
+    读取 cache_versions 中由触发器维护的表版本号。
+
+    版本号缓存在进程内：触发器在写入提交时通过缓存失效通道通知各工作进程，
+    因此空闲轮询时 304 响应不需要访问数据库。
+    """
+
+    async def load() -> Optional[int]:
+        async with AsyncSessionLocal() as session:
+            result = await session.exec(
+                select(CacheVersion.version).where(CacheVersion.name == name)
+            )
+            return result.first()
+
+    key = f"table_version:{name}"
+    cache = caches.get(key) or SnapshotCache(
+        key, load, ttl=settings.TABLE_VERSION_CACHE_TTL
+    )
+    return cache.get
+
+
+async def life_status_version() -> Optional[str]:
+    # 状态来自进程内快照缓存，直接以快照内容作为版本标记，不查询数据库
+    snapshot = await life_status_cache.get()
+    return None if snapshot is None else snapshot.model_dump_json()
+
+
+# 支持条件请求的只读接口：路径 -> 版本标记
+CONDITIONAL_ROUTES: List[Tuple[Pattern[str], VersionProvider]] = [
+    (re.compile(r"^/api/life/status$"), life_status_version),
+    (re.compile(r"^/api/life/comments$"), table_version("comments")),
+    (re.compile(r"^/api/thoughts$"), table_version("thoughts")),
+    (re.compile(r"^/api/creations/?$"), table_version("creations")),
+    (re.compile(r"^/api/creations/\d+/comments$"), table_version("comments")),
+]
+
+
+class ConditionalGetMiddleware:
+    """
+    为轮询频繁的只读接口提供 ETag / 304：
+
+    先用廉价的版本标记（表版本号或缓存快照）和请求路径、查询参数计算弱 ETag，
+    与 If-None-Match 相同时直接返回 304，不再执行完整的列表查询；
+    否则正常处理请求，并在 200 响应上附加 ETag 与 Cache-Control。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: List[Tuple[Pattern[str], VersionProvider]],
+        cache_control: str,
+    ):
+        self.app = app
+        self.routes = routes
+        self.cache_control = cache_control
+
+    def _match(self, path: str) -> Optional[VersionProvider]:
+        for pattern, provider in self.routes:
+            if pattern.match(path):
+                return provider
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        provider = self._match(scope["path"])
+        if provider is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            version = await provider()
+        except Exception as e:
+            logger.warning(f"读取 {scope['path']} 的版本标记失败: {e!r}")
+            version = None
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = make_etag(version, scope["path"], scope.get("query_string", b""))
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [
+                        (b"etag", etag.encode("latin-1")),
+                        (b"cache-control", self.cache_control.encode("latin-1")),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                headers["ETag"] = etag
+                headers["Cache-Control"] = self.cache_control
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
@@ -0,0 +1,78 @@
+# File: app/api/metrics.py
+
+import time
+from typing import FrozenSet, List
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    QueryStats,
+    current_query_stats,
+    http_request_db_duration,
+    http_request_db_queries,
+    http_request_duration,
+)
+
+# 方法名由客户端决定，未知方法统一记为 other，避免任意方法名产生新的时间序列
+KNOWN_METHODS: FrozenSet[str] = frozenset(
+    {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+)
+
+
+def method_label(method: str) -> str:
+    return method if method in KNOWN_METHODS else "other"
+
+
+def route_template(scope: Scope, routes: List[BaseRoute]) -> str:
+    """
+    以路由模板（如 /api/creations/{creation_id}/comments）作为标签，避免路径参数导致标签爆炸。
+    路由匹配后 FastAPI 会把路由写入 scope；被外层中间件提前返回（如 304）的请求在这里补做匹配。
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    for candidate in routes:
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return getattr(candidate, "path", "unmatched")
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    记录每个 HTTP 请求的耗时，以及请求内执行的 SQL 条数与总耗时。
+    应放在最外层，使其他中间件（条件请求、CORS 等）的耗时也计入。
+    """
+
+    def __init__(self, app: ASGIApp, routes: List[BaseRoute]):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_query_stats.reset(token)
+            route = route_template(scope, self.routes)
+            http_request_duration.observe(
+                elapsed, method=method_label(scope["method"]), route=route, status=str(status)
+            )
+            http_request_db_queries.observe(stats.queries, route=route)
+            http_request_db_duration.observe(stats.seconds, route=route)
@@ -0,0 +1,51 @@
+# File: app/api/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+
+T = TypeVar("T")
+
+
+def encode_cursor(*keys: Any) -> str:
+    """
+    将排序键（如 (created_at, id) 或 id）编码为不透明的游标字符串。
+    """
+    payload = [k.isoformat() if isinstance(k, datetime) else k for k in keys]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> Tuple[Any, ...]:
+    """
+    解析游标字符串，按 types 还原每个排序键。游标非法时返回 400。
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("cursor arity mismatch")
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v)
+            for t, v in zip(types, payload)
+        )
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
+
+
+def split_page(
+    rows: Sequence[T], page_size: int, key: Callable[[T], Tuple[Any, ...]]
+) -> Tuple[list, Optional[str]]:
+    """
+    查询时多取一行 (limit page_size + 1) 用于判断是否还有下一页。
+    返回当前页数据以及下一页的游标（没有下一页时为 None）。
+    """
+    if len(rows) <= page_size:
+        return list(rows), None
+    page_rows = list(rows[:page_size])
+    return page_rows, encode_cursor(*key(page_rows[-1]))
@@ -0,0 +1,22 @@
+# File: app/api/projection.py
+
+from typing import Any, List, Sequence, Type, TypeVar
+
+from sqlmodel import SQLModel
+
+S = TypeVar("S", bound=SQLModel)
+
+
+def schema_columns(model: Type[SQLModel], schema: Type[SQLModel]) -> List[Any]:
+    """
+    按响应 schema 的字段取出表模型中对应的列，查询时只读取接口真正返回的列，
+    避免把 content 之类的大字段从数据库搬到应用里再丢掉。
+    """
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_to(schema: Type[S], rows: Sequence[Any]) -> List[S]:
+    """
+    将按列查询得到的 Row 转换为响应 schema。
+    """
+    return [schema.model_validate(row._mapping) for row in rows]
@@ -0,0 +1,32 @@
+# File: app/api/responses.py
+
+from typing import Any, Union
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    全局默认的响应类：用 orjson 序列化。
+    OPT_UTC_Z 让 UTC 时间输出为 "Z" 结尾，与 Pydantic 的格式保持一致。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json(response: BaseModel) -> Union[BaseModel, FastJSONResponse]:
+    """
+    快速响应路径：路由中已经构建并校验过的响应模型直接交给 orjson 序列化。
+    返回 Response 对象时 FastAPI 不再按 response_model 二次校验和序列化，
+    response_model 仍用于生成 OpenAPI 文档。
+
+    FAST_JSON_RESPONSE 关闭时原样返回模型，走 FastAPI 的默认流程。
+    """
+    if not settings.FAST_JSON_RESPONSE:
+        return response
+    return FastJSONResponse(response.model_dump())
@@ -1,9 +1,21 @@
 from fastapi import APIRouter
 
-from app.api.routes import creation_route, life_route, thought_route
+from app.api.routes import (
+    agent_route,
+    cache_route,
+    comment_route,
+    creation_route,
+    life_route,
+    run_route,
+    thought_route,
+)
 
 api_router = APIRouter(prefix="/api")
 
 api_router.include_router(life_route.router)
 api_router.include_router(creation_route.router)
+api_router.include_router(comment_route.router)
 api_router.include_router(thought_route.router)
+api_router.include_router(run_route.router)
+api_router.include_router(agent_route.router)
+api_router.include_router(cache_route.router)
@@ -0,0 +1,33 @@
+# File: app/api/routes/agent_route.py
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.services.agent_events import StreamBusyError, open_agent_stream
+
+router = APIRouter(prefix="/agent", tags=["Agent"])
+
+
+@router.get("/stream", summary="流式运行智能体（SSE）")
+async def stream_agent(
+    user_message: str = Query(..., min_length=1, description="用户消息"),
+) -> StreamingResponse:
+    """
+    在 API 进程中运行一次智能体，并通过 Server-Sent Events 推送进度：
+    start / node / plan / step / tool / token / report / error / done。
+    同时进行的流式运行数受 SSE_MAX_CONCURRENT_RUNS 限制，超出时返回 429；
+    不需要逐 token 推送的调用方应使用 /api/runs 队列。
+    """
+    try:
+        events = await open_agent_stream(user_message)
+    except StreamBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many concurrent agent streams",
+            headers={"Retry-After": "5"},
+        )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
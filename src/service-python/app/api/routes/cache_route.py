@@ -0,0 +1,17 @@
+# File: app/api/routes/cache_route.py
+
+from fastapi import APIRouter
+
+from app.schemas.cache import CacheStatsRead, CacheStatsResponse
+from app.services.snapshot_cache import caches
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+@router.get("/stats", response_model=CacheStatsResponse, summary="获取缓存统计")
+async def get_cache_stats() -> CacheStatsResponse:
+    """
+    Returns hit ratio and refresh latency for every in-process snapshot cache.
+    """
+    data = [CacheStatsRead.model_validate(cache.stats) for cache in caches.values()]
+    return CacheStatsResponse(data=data)
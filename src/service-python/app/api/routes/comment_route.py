@@ -0,0 +1,45 @@
+# File: app/api/routes/comment_route.py
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_session
+from app.schemas.comment import (
+    Comment,
+    CommentBulkCreate,
+    CommentBulkCreateResponse,
+)
+from app.services.comments import add_comments_bulk
+from app.services.invalidation import publish_invalidation
+from app.services.life_status import life_status_cache
+
+router = APIRouter(prefix="/comments", tags=["Comments"])
+
+
+@router.post(
+    "/bulk",
+    response_model=CommentBulkCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="批量发表评论",
+)
+async def create_comments_bulk(
+    bulk_in: CommentBulkCreate, db: AsyncSession = Depends(get_session)
+) -> CommentBulkCreateResponse:
+    """
+    Creates many comments (on creations or on the digital life) in one transaction.
+    If any referenced creation does not exist, nothing is written.
+    """
+    items = [(c.content, c.creation_id) for c in bulk_in.comments]
+    if any(creation_id is None for _, creation_id in items):
+        await publish_invalidation(db, life_status_cache.name)
+
+    rows, missing = await add_comments_bulk(db, items)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Creations not found: {missing}",
+        )
+
+    return CommentBulkCreateResponse(
+        data=[Comment.model_validate(row._mapping) for row in rows]
+    )
@@ -1,10 +1,14 @@
 # File: app/api/routes/creation.py
 
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import true
 from sqlmodel import select, desc
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.api.pagination import decode_cursor, split_page
+from app.api.projection import rows_to, schema_columns
+from app.api.responses import fast_json
 from app.core.database import get_session
 from app.models import Creation, Comment  # 假设这些模型已在 app/models.py 中定义
 from app.schemas.creation import (
@@ -19,6 +23,8 @@ from app.schemas.creation import (
     CommentCreateResponse,
     CommentCreate,
 )
+from app.services.comments import add_creation_comment
+from app.services.like_counter import increment_likes, like_aggregator
 
 router = APIRouter(prefix="/creations", tags=["Creations"])
 
@@ -28,22 +34,35 @@ async def get_creation_list(
     *,
     db: AsyncSession = Depends(get_session),
     page: int = Query(1, ge=1, description="页码，从1开始"),
-    page_size: int = Query(10, ge=1, le=100, description="每页数量")
+    page_size: int = Query(10, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(
+        None, description="游标，取自上一页的 next_cursor；传入后忽略 page"
+    ),
 ) -> CreationListResponse:
     """
     Asynchronously retrieves a paginated list of creations.
     """
-    offset = (page - 1) * page_size
+    # 只查询列表需要的列，不读取 content
     statement = (
-        select(Creation).offset(offset).limit(page_size).order_by(desc(Creation.id))
+        select(*schema_columns(Creation, CreationReadList))
+        .order_by(desc(Creation.id))
+        .limit(page_size + 1)
     )
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        statement = statement.where(Creation.id < last_id)
+    else:
+        statement = statement.offset((page - 1) * page_size)
+
     result = await db.exec(statement)
-    creations_db = result.all()
+    creations_db, next_cursor = split_page(result.all(), page_size, lambda c: (c.id,))
 
-    # 将数据库模型转换为Pydantic响应模型
-    creations_data = [CreationReadList.model_validate(c) for c in creations_db]
+    # 将查询结果转换为Pydantic响应模型
+    creations_data = rows_to(CreationReadList, creations_db)
 
-    return CreationListResponse(data=creations_data)
+    return fast_json(
+        CreationListResponse(data=creations_data, next_cursor=next_cursor)
+    )
 
 
 @router.get(
@@ -55,13 +74,17 @@ async def get_creation_detail(
     """
     Asynchronously retrieves the detailed information for a single creation by its ID.
     """
-    creation_db = await db.get(Creation, creation_id)
+    statement = select(*schema_columns(Creation, CreationReadDetail)).where(
+        Creation.id == creation_id
+    )
+    result = await db.exec(statement)
+    creation_db = result.first()
     if not creation_db:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Creation not found"
         )
 
-    creation_data = CreationReadDetail.model_validate(creation_db)
+    creation_data = CreationReadDetail.model_validate(creation_db._mapping)
     return CreationDetailResponse(data=creation_data)
 
 
@@ -75,31 +98,52 @@ async def get_creation_comments(
     *,
     db: AsyncSession = Depends(get_session),
     page: int = Query(1, ge=1, description="页码，从1开始"),
-    page_size: int = Query(10, ge=1, le=100, description="每页数量")
+    page_size: int = Query(10, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(
+        None, description="游标，取自上一页的 next_cursor；传入后忽略 page"
+    ),
 ) -> CommentListResponse:
     """
     Asynchronously retrieves a paginated list of comments for a specific creation.
     """
-    # 首先验证作品是否存在
-    creation_db = await db.get(Creation, creation_id)
-    if not creation_db:
+    # 评论分页作为 LATERAL 子查询，使用 (creation_id, id DESC) 复合索引
+    page_query = (
+        select(*schema_columns(Comment, CommentRead))
+        .where(Comment.creation_id == Creation.id)
+        .order_by(desc(Comment.id))
+        .limit(page_size + 1)
+    )
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        page_query = page_query.where(Comment.id < last_id)
+    else:
+        page_query = page_query.offset((page - 1) * page_size)
+    comments_page = page_query.lateral("comments_page")
+
+    # 与作品做 LEFT JOIN，一次查询同时完成存在性校验：
+    # 作品不存在时没有任何行；作品存在但本页没有评论时只有一行全为 NULL 的记录
+    # 逐列选出：只传一个子查询时 select() 返回标量（第一列），而不是整行
+    statement = (
+        select(*comments_page.c)
+        .select_from(Creation)
+        .outerjoin(comments_page, true())
+        .where(Creation.id == creation_id)
+        .order_by(desc(comments_page.c.id))
+    )
+    result = await db.exec(statement)
+    rows = result.all()
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Creation not found"
         )
 
-    offset = (page - 1) * page_size
-    statement = (
-        select(Comment)
-        .where(Comment.creation_id == creation_id)
-        .offset(offset)
-        .limit(page_size)
-        .order_by(desc(Comment.id))
-    )
-    result = await db.exec(statement)
-    comments_db = result.all()
+    rows = [row for row in rows if row.id is not None]
+    comments_db, next_cursor = split_page(rows, page_size, lambda c: (c.id,))
 
-    comments_data = [CommentRead.model_validate(c) for c in comments_db]
-    return CommentListResponse(data=comments_data)
+    comments_data = rows_to(CommentRead, comments_db)
+    return fast_json(
+        CommentListResponse(data=comments_data, next_cursor=next_cursor)
+    )
 
 
 @router.post(
@@ -111,18 +155,18 @@ async def like_creation(
     """
     Asynchronously increments the like count for a specific creation.
     """
-    creation_db = await db.get(Creation, creation_id)
-    if not creation_db:
+    # 启用聚合器时只在内存中累加，由后台任务批量写回；否则单条 UPDATE ... RETURNING
+    if like_aggregator.enabled:
+        likes = await like_aggregator.add(db, creation_id)
+    else:
+        likes = await increment_likes(db, creation_id)
+
+    if likes is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Creation not found"
         )
 
-    creation_db.likes += 1
-    db.add(creation_db)
-    await db.commit()
-    await db.refresh(creation_db)
-
-    like_data = CreationLikeUpdate(likes=creation_db.likes)
+    like_data = CreationLikeUpdate(likes=likes)
     return CreationLikeResponse(data=like_data)
 
 
@@ -138,29 +182,13 @@ async def create_creation_comment(
     """
     Asynchronously adds a new comment to a specific creation.
     """
-    # 开启事务，确保作品评论数和评论记录的一致性
-    creation_db = await db.get(Creation, creation_id)
-    if not creation_db:
+    # 评论数递增与评论写入在同一条语句中完成，作品不存在时什么都不写入
+    new_comment_db = await add_creation_comment(db, creation_id, comment_in.content)
+    if new_comment_db is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Creation to comment on not found",
         )
 
-    # 创建新的评论对象
-    new_comment_db = Comment.model_validate(
-        comment_in, update={"creation_id": creation_id}
-    )
-
-    # 更新作品的评论数
-    creation_db.comments += 1
-
-    db.add(new_comment_db)
-    db.add(creation_db)
-
-    await db.commit()
-
-    # 刷新以获取数据库生成的ID和默认值
-    await db.refresh(new_comment_db)
-
-    comment_data = CommentRead.model_validate(new_comment_db)
+    comment_data = CommentRead.model_validate(new_comment_db._mapping)
     return CommentCreateResponse(data=comment_data)
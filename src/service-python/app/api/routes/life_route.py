@@ -1,21 +1,28 @@
 # File: app/api/routes/life.py
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import tuple_
 from sqlmodel import select, desc
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.api.pagination import decode_cursor, split_page
+from app.api.projection import rows_to, schema_columns
+from app.api.responses import fast_json
 from app.core.database import get_session
-from app.models import DigitalLife, Comment
+from app.models import Comment
 from app.schemas.digital_life import (
     CommentCreate,
     CommentCreateResponse,
     CommentListResponse,
     CommentRead,
-    LifeStatusRead,
     LifeStatusResponse,
 )
+from app.services.comments import add_life_comment
+from app.services.invalidation import publish_invalidation
+from app.services.life_status import life_status_cache
 
 router = APIRouter(prefix="/life")
 
@@ -25,26 +32,22 @@ router = APIRouter(prefix="/life")
     response_model=LifeStatusResponse,
     summary="获取数字生活状态",
 )
-async def get_life_status(
-    db: AsyncSession = Depends(get_session),
-) -> LifeStatusResponse:
+async def get_life_status() -> LifeStatusResponse:
     """
     获取当前数字生活的核心状态信息。
 
     我们假设系统中只有一个或一个主“数字生活”实体，因此总是查询第一个。
+    状态读取自进程内快照缓存，过期后由单个请求负责刷新。
     """
-    statement = select(DigitalLife)
-    result = await db.exec(statement)
-    life_status_db = result.first()
+    life_status_data = await life_status_cache.get()
 
-    if not life_status_db:
+    if not life_status_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Digital life status not found.",
         )
 
-    life_status_data = LifeStatusRead.model_validate(life_status_db)
-    return LifeStatusResponse(data=life_status_data)
+    return fast_json(LifeStatusResponse(data=life_status_data))
 
 
 @router.get(
@@ -55,24 +58,36 @@ async def get_life_status(
 async def get_life_comments(
     page: int = Query(1, ge=1, description="页码，从1开始"),
     page_size: int = Query(10, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(
+        None, description="游标，取自上一页的 next_cursor；传入后忽略 page"
+    ),
     db: AsyncSession = Depends(get_session),
 ) -> CommentListResponse:
     """
     分页获取与数字生活相关的评论列表，按创建时间降序排列。
     """
-    offset = (page - 1) * page_size
     statement = (
-        select(Comment)
-        .offset(offset)
-        .limit(page_size)
-        .order_by(desc(Comment.created_at))
+        select(*schema_columns(Comment, CommentRead))
+        .order_by(desc(Comment.created_at), desc(Comment.id))
+        .limit(page_size + 1)
     )
+    if cursor:
+        created_at, comment_id = decode_cursor(cursor, datetime, int)
+        statement = statement.where(
+            tuple_(Comment.created_at, Comment.id) < tuple_(created_at, comment_id)
+        )
+    else:
+        statement = statement.offset((page - 1) * page_size)
 
     result = await db.exec(statement)
-    comments_db = result.all()
+    comments_db, next_cursor = split_page(
+        result.all(), page_size, lambda c: (c.created_at, c.id)
+    )
 
-    comments_data = [CommentRead.model_validate(c) for c in comments_db]
-    return CommentListResponse(data=comments_data)
+    comments_data = rows_to(CommentRead, comments_db)
+    return fast_json(
+        CommentListResponse(data=comments_data, next_cursor=next_cursor)
+    )
 
 
 @router.post(
@@ -88,13 +103,11 @@ async def create_life_comment(
     """
     为当前数字生活添加一条新的评论。
     """
-    # 将输入的Schema转换为数据库模型实例
-    new_comment_db = Comment.model_validate(comment_in)
-
-    db.add(new_comment_db)
-    await db.commit()
-    await db.refresh(new_comment_db)
+    # 评论数是状态快照的一部分，提交后通知所有工作进程失效缓存
+    await publish_invalidation(db, life_status_cache.name)
+    # 写入评论并递增数字生命的评论数，一次往返
+    new_comment_db = await add_life_comment(db, comment_in.content)
 
-    # 将新创建的数据库对象转换为响应Schema
-    created_comment_data = CommentRead.model_validate(new_comment_db)
+    # 将新创建的评论转换为响应Schema
+    created_comment_data = CommentRead.model_validate(new_comment_db._mapping)
     return CommentCreateResponse(data=created_comment_data)
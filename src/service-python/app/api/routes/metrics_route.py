@@ -0,0 +1,17 @@
+# File: app/api/routes/metrics_route.py
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core.metrics import CONTENT_TYPE, registry
+
+# 不挂在 /api 下，与 Prometheus 的默认抓取路径一致
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """
+    Exposes request, database, LLM and tool metrics of this process in Prometheus text format.
+    """
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
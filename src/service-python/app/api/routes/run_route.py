@@ -0,0 +1,53 @@
+# File: app/api/routes/run_route.py
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_session
+from app.models import AgentRun
+from app.schemas.run import RunCreate, RunRead, RunResponse
+from app.services.run_queue import enqueue_run, request_cancel
+
+router = APIRouter(prefix="/runs", tags=["Runs"])
+
+
+@router.post(
+    "/",
+    response_model=RunResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="提交智能体运行",
+)
+async def create_run(
+    run_in: RunCreate, db: AsyncSession = Depends(get_session)
+) -> RunResponse:
+    """
+    将一次智能体运行放入队列，由后台工作进程异步执行。
+    """
+    run_db = await enqueue_run(db, run_in.user_message, run_in.priority)
+    return RunResponse(data=RunRead.model_validate(run_db))
+
+
+@router.get("/{run_id}", response_model=RunResponse, summary="获取运行状态")
+async def get_run(run_id: int, db: AsyncSession = Depends(get_session)) -> RunResponse:
+    """
+    查询运行的状态、最终报告或错误信息。
+    """
+    run_db = await db.get(AgentRun, run_id)
+    if not run_db:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+
+    return RunResponse(data=RunRead.model_validate(run_db))
+
+
+@router.post("/{run_id}/cancel", response_model=RunResponse, summary="取消运行")
+async def cancel_run(
+    run_id: int, db: AsyncSession = Depends(get_session)
+) -> RunResponse:
+    """
+    取消排队中或运行中的任务；运行中的任务会在工作进程下一次心跳时被中断。
+    """
+    run_db = await request_cancel(db, run_id)
+    if not run_db:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+
+    return RunResponse(data=RunRead.model_validate(run_db))
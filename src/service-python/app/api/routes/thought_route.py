@@ -1,11 +1,16 @@
 # File: app/api/routes/thought_router.py
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy import tuple_
 from sqlmodel import select, desc
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.api.pagination import decode_cursor, split_page
+from app.api.projection import rows_to, schema_columns
+from app.api.responses import fast_json
 from app.core.database import get_session
 from app.models import Thought  # 假设 Thought 模型定义在 app/models.py
 from app.schemas.thought import ThoughtRead, ThoughtListResponse
@@ -17,7 +22,7 @@ router = APIRouter(tags=["Thoughts"])
     "/thoughts",
     response_model=ThoughtListResponse,
     summary="获取思考列表",
-    description="分页获取所有的思考记录，默认按创建时间倒序排列。",
+    description="分页获取所有的思考记录，默认按创建时间倒序排列。传入 cursor 时使用游标分页。",
 )
 async def get_thoughts_list(
     db: AsyncSession = Depends(get_session),
@@ -25,29 +30,41 @@ async def get_thoughts_list(
     page_size: int = Query(
         10, ge=1, le=100, description="每页数量，默认为10，最大为100"
     ),
+    cursor: Optional[str] = Query(
+        None, description="游标，取自上一页的 next_cursor；传入后忽略 page"
+    ),
 ) -> ThoughtListResponse:
     """
     Asynchronously retrieves a paginated list of thought records from the database.
     """
-    # 1. 计算分页偏移量
-    offset = (page - 1) * page_size
-
-    # 2. 构建异步数据库查询语句
-    # 按创建时间倒序获取最新的记录
+    # 1. 构建异步数据库查询语句
+    # 按 (created_at, id) 倒序获取最新的记录，多取一行用于判断是否有下一页
     statement = (
-        select(Thought)
-        .order_by(desc(Thought.created_at))
-        .offset(offset)
-        .limit(page_size)
+        select(*schema_columns(Thought, ThoughtRead))
+        .order_by(desc(Thought.created_at), desc(Thought.id))
+        .limit(page_size + 1)
     )
 
+    # 2. 游标分页走 (created_at, id) 索引直接定位，避免 OFFSET 扫描丢弃前面的行
+    if cursor:
+        created_at, thought_id = decode_cursor(cursor, datetime, int)
+        statement = statement.where(
+            tuple_(Thought.created_at, Thought.id) < tuple_(created_at, thought_id)
+        )
+    else:
+        statement = statement.offset((page - 1) * page_size)
+
     # 3. 异步执行查询
     results = await db.exec(statement)
-    db_thoughts = results.all()
+    db_thoughts, next_cursor = split_page(
+        results.all(), page_size, lambda t: (t.created_at, t.id)
+    )
 
     # 4. 将数据库模型转换为Pydantic响应模型
     # 这是关键要求，确保输出格式与API定义一致，并剥离不必要的字段
-    thoughts_data = [ThoughtRead.model_validate(t) for t in db_thoughts]
+    thoughts_data = rows_to(ThoughtRead, db_thoughts)
 
     # 5. 使用专用的响应模型封装并返回结果
-    return ThoughtListResponse(data=thoughts_data)
+    return fast_json(
+        ThoughtListResponse(data=thoughts_data, next_cursor=next_cursor)
+    )
@@ -0,0 +1,35 @@
+# File: app/api/visitor_tracking.py
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.visitors import VisitorCounter
+
+
+def client_fingerprint(scope: Scope) -> str:
+    """
+    以客户端 IP 与 User-Agent 区分访客。
+
+    不直接读取 X-Forwarded-For（任何客户端都能伪造）：只有来自 FORWARDED_ALLOW_IPS
+    中可信代理的请求，uvicorn 才会用该头改写 scope["client"]。
+    """
+    headers = Headers(scope=scope)
+    client = scope.get("client")
+    ip = client[0] if client else ""
+    return f"{ip}|{headers.get('user-agent', '')}"
+
+
+class VisitorTrackingMiddleware:
+    """
+    把每个 HTTP 请求的客户端指纹计入访客草图，只涉及内存操作。
+    """
+
+    def __init__(self, app: ASGIApp, counter: VisitorCounter):
+        self.app = app
+        self.counter = counter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # CORS 预检由浏览器自动发出，不代表一次访问
+        if scope["type"] == "http" and scope["method"] != "OPTIONS":
+            self.counter.add(client_fingerprint(scope))
+        await self.app(scope, receive, send)
@@ -1,9 +1,86 @@
 from typing import AsyncGenerator
+import logging
+import random
+import time
+
+import orjson
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
 from .config import settings
+from .metrics import current_query_stats, db_pool_checkout_wait, db_query_duration
+
+# SQL 日志单独使用一个 logger，便于按需调整级别或输出位置
+sql_logger = logging.getLogger("app.sql")
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY"}
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    记录每次从连接池取得连接的等待时间，包括池满时的排队和新建连接的耗时。
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - start)
+
+
+# 不使用 echo=True：逐条打印 SQL 本身就会拖慢吞吐，改为下面的采样结构化日志
+engine = create_async_engine(settings.DATABASE_URL, poolclass=TimedQueuePool)
+
+
+def _operation(statement: str) -> str:
+    words = statement.lstrip()[:8].split()
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in _OPERATIONS else "OTHER"
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    operation = _operation(statement)
+    db_query_duration.observe(elapsed, operation=operation)
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+    elapsed_ms = elapsed * 1000
+    slow = settings.SQL_SLOW_QUERY_MS > 0 and elapsed_ms >= settings.SQL_SLOW_QUERY_MS
+    if slow or random.random() < settings.SQL_LOG_SAMPLE_RATE:
+        # 只记录语句本身，不记录参数（其中可能包含评论等用户内容）
+        record = {
+            "operation": operation,
+            "duration_ms": round(elapsed_ms, 3),
+            "rowcount": cursor.rowcount,
+            "executemany": executemany,
+            "slow": slow,
+            "statement": statement[: settings.SQL_LOG_MAX_CHARS],
+        }
+        sql_logger.log(
+            logging.WARNING if slow else logging.INFO, orjson.dumps(record).decode()
+        )
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _handle_error(context):
+    # 执行失败时不会触发 after_cursor_execute，丢弃对应的开始时间
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -0,0 +1,275 @@
+# File: app/core/metrics.py
+
+import asyncio
+import logging
+import math
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 秒级耗时的默认分桶：覆盖从亚毫秒级查询到分钟级的模型调用
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+# 每个请求执行的 SQL 条数
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # 工具可能在线程池中执行，记录指标时加锁
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self._samples(),
+        ]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # 每组标签：[各分桶计数（非累计）..., sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class Registry:
+    """
+    进程内的指标注册表，按 Prometheus 文本格式（0.0.4）输出。
+    指标只在本进程内累计；多个工作进程时每个进程各自暴露、各自被抓取。
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return registry.register(Counter(name, documentation, labelnames))  # type: ignore
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return registry.register(  # type: ignore
+        Histogram(name, documentation, labelnames, buckets)
+    )
+
+
+# HTTP
+http_request_duration = histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+http_request_db_queries = histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ["route"],
+    buckets=COUNT_BUCKETS,
+)
+http_request_db_duration = histogram(
+    "http_request_db_duration_seconds",
+    "Total SQL execution time per HTTP request.",
+    ["route"],
+)
+
+# 数据库
+db_query_duration = histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time.",
+    ["operation"],
+)
+db_pool_checkout_wait = histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+)
+
+# 模型与工具
+llm_request_duration = histogram(
+    "llm_request_duration_seconds",
+    "LLM call latency by graph node.",
+    ["node", "status"],
+)
+llm_tokens = counter(
+    "llm_tokens_total",
+    "LLM tokens by graph node and kind (prompt / completion).",
+    ["node", "kind"],
+)
+llm_cache_requests = counter(
+    "llm_cache_requests_total",
+    "LLM response cache lookups by result (hit / miss).",
+    ["result"],
+)
+tool_duration = histogram(
+    "tool_duration_seconds",
+    "Tool call duration.",
+    ["tool", "status"],
+)
+tool_registry_load_duration = histogram(
+    "tool_registry_load_duration_seconds",
+    "Tool registry refresh time by phase (fetch / install / compile).",
+    ["phase"],
+)
+tool_registry_bind_duration = histogram(
+    "tool_registry_bind_duration_seconds",
+    "Time to resolve the tool set at run start.",
+)
+
+
+class QueryStats:
+    """单个 HTTP 请求内执行的 SQL 条数与总耗时。"""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# 由请求计时中间件设置，数据库事件把查询计入当前请求
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+async def _handle_scrape(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        # 只读取请求头，不区分路径：这个端口只提供指标
+        await reader.readuntil(b"\r\n\r\n")
+        body = registry.render().encode("utf-8")
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            + f"Content-Type: {CONTENT_TYPE}\r\n".encode()
+            + f"Content-Length: {len(body)}\r\n".encode()
+            + b"Connection: close\r\n\r\n"
+            + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str, port: int) -> asyncio.AbstractServer:
+    """
+    为没有 HTTP 服务的进程（后台工作进程）提供一个只返回指标的最小 HTTP 端口。
+    """
+    server = await asyncio.start_server(_handle_scrape, host, port)
+    logger.info(f"指标端口已启动: http://{host}:{port}/metrics")
+    return server
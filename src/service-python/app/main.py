@@ -1,13 +1,56 @@
 from dotenv import load_dotenv
 
 load_dotenv()
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.api.conditional import CONDITIONAL_ROUTES, ConditionalGetMiddleware
+from app.api.metrics import MetricsMiddleware
+from app.api.responses import FastJSONResponse
 from app.api.router import api_router
+from app.api.routes import metrics_route
+from app.api.visitor_tracking import VisitorTrackingMiddleware
 from app.core.config import settings
+from app.services.invalidation import invalidation_listener
+from app.services.like_counter import like_aggregator
+from app.services.thought_sink import thought_sink
+from app.services.visitors import visitor_counter
 import uvicorn
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 启动后台任务
+    like_aggregator.start()
+    thought_sink.start()
+    invalidation_listener.start()
+    visitor_counter.start()
+    yield
+    # 关闭前把内存中尚未写回的数据刷入数据库
+    await like_aggregator.stop()
+    await thought_sink.stop()
+    await visitor_counter.stop()
+    await invalidation_listener.stop()
+
+
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+
+# 中间件后添加的在外层：除指标统计外 CORS 在最外层，保证 304 响应也带 CORS 头；
+# 访客统计在条件请求之外，304 的轮询请求同样计入
+
+# 轮询接口的 ETag / 304 支持
+app.add_middleware(
+    ConditionalGetMiddleware,
+    routes=CONDITIONAL_ROUTES,
+    cache_control=settings.HTTP_CACHE_CONTROL,
+)
+
+# 独立访客统计（只写内存，定期合并写回）
+app.add_middleware(VisitorTrackingMiddleware, counter=visitor_counter)
 
 # 配置CORS中间件
 app.add_middleware(
@@ -16,9 +59,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods="*",
     allow_headers="*",
+    # 浏览器只有在 ETag 被暴露时才能读取它，并在下次请求中带上 If-None-Match
+    expose_headers=["ETag"],
 )
 
+# 请求耗时与每请求 SQL 统计，放在最外层以计入所有中间件的耗时
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+
 app.include_router(api_router)
+app.include_router(metrics_route.router)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    # 多个工作进程之间的缓存一致性由 invalidation_listener 保证
+    uvicorn.run(
+        "app.main:app",
+        host="127.0.0.1",
+        port=8000,
+        workers=settings.API_WORKERS,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+    )
@@ -25,6 +25,8 @@ class DigitalLife(SQLModel, table=True):
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
     tools: int = Field(default=0)
     creations: int = Field(default=0)
+    # 独立访客的 HyperLogLog 草图，由各工作进程合并写回
+    visitor_sketch: Optional[bytes] = Field(default=None)
 
 
 # ------------------------------------------------------------------
@@ -60,6 +62,42 @@ class Thought(SQLModel, table=True):
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
 
 
+# ------------------------------------------------------------------
+# Model for: agent_runs
+# 智能体运行任务队列，由后台工作进程认领执行
+# ------------------------------------------------------------------
+class AgentRun(SQLModel, table=True):
+
+    __tablename__ = "agent_runs"  # type: ignore
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_message: str
+    # queued / running / succeeded / failed / cancelled
+    status: str = Field(default="queued")
+    priority: int = Field(default=0)
+    cancel_requested: bool = Field(default=False)
+    worker: Optional[str] = Field(default=None)
+    attempts: int = Field(default=0)
+    final_report: Optional[str] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    started_at: Optional[datetime.datetime] = Field(default=None)
+    heartbeat_at: Optional[datetime.datetime] = Field(default=None)
+    finished_at: Optional[datetime.datetime] = Field(default=None)
+
+
+# ------------------------------------------------------------------
+# Model for: cache_versions
+# 各表内容的版本号，由数据库触发器维护，用于计算 HTTP ETag
+# ------------------------------------------------------------------
+class CacheVersion(SQLModel, table=True):
+
+    __tablename__ = "cache_versions"  # type: ignore
+
+    name: str = Field(primary_key=True)
+    version: int = Field(default=0)
+
+
 # ------------------------------------------------------------------
 # Models with Relationships: creations and comments
 # ------------------------------------------------------------------
@@ -95,6 +133,9 @@ class Comment(SQLModel, table=True):
     # 对应 reply_content TEXT
     reply_content: Optional[str] = Field(default=None)
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    # 回复工作进程的认领状态，见 app/services/comment_replies.py
+    reply_attempts: int = Field(default=0)
+    reply_claimed_until: Optional[datetime.datetime] = Field(default=None)
 
     # --- Foreign Key and Relationship ---
     # 对应 creation_id BIGINT, 关联到 creations 表的 id
@@ -0,0 +1,94 @@
+"""
+评论回复工作进程：认领尚未回复的评论，按批调用模型生成回复并批量写回。
+
+用法（在 src/service-python 目录下）：
+
+    python -m app.reply_worker --concurrency 2 --batch-size 20 --max-per-minute 120
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+import argparse
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.services.comment_replies import RateLimiter, ReplyStats, reply_batch
+
+logger = logging.getLogger(__name__)
+
+
+async def reply_slot(
+    stop: asyncio.Event, batch_size: int, limiter: RateLimiter, stats: ReplyStats
+) -> None:
+    """
+    一个处理槽：循环认领并回复一批评论。没有待回复评论、模型一条也没有回复
+    或出错时按轮询间隔等待，避免对同一批评论连续发起模型调用。
+    """
+    while not stop.is_set():
+        try:
+            async with AsyncSessionLocal() as session:
+                replied = await reply_batch(session, batch_size, limiter, stats)
+        except Exception:
+            logger.exception("回复评论失败")
+            replied = 0
+
+        if replied == 0:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.REPLY_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def report_stats(stop: asyncio.Event, stats: ReplyStats) -> None:
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.REPLY_STATS_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        logger.info(stats.summary())
+
+
+async def reply_main(
+    concurrency: int,
+    batch_size: int,
+    max_per_minute: int,
+    stop: asyncio.Event,
+    stats: ReplyStats,
+) -> None:
+    limiter = RateLimiter(max_per_minute, burst=max(batch_size, max_per_minute // 6))
+    tasks = [
+        asyncio.create_task(reply_slot(stop, batch_size, limiter, stats))
+        for _ in range(concurrency)
+    ]
+    tasks.append(asyncio.create_task(report_stats(stop, stats)))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        stop.set()
+
+
+async def main(concurrency: int, batch_size: int, max_per_minute: int) -> None:
+    try:
+        await reply_main(
+            concurrency, batch_size, max_per_minute, asyncio.Event(), ReplyStats()
+        )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="启动评论回复工作进程")
+    parser.add_argument("--concurrency", type=int, default=settings.REPLY_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=settings.REPLY_BATCH_SIZE)
+    parser.add_argument(
+        "--max-per-minute", type=int, default=settings.REPLY_MAX_PER_MINUTE
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main(args.concurrency, args.batch_size, args.max_per_minute))
+    except KeyboardInterrupt:
+        pass
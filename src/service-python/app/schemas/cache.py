@@ -0,0 +1,37 @@
+# File: app/schemas/cache.py
+
+from typing import List
+
+from sqlmodel import SQLModel
+from app.schemas.common import BaseResponse
+
+
+# -------------------------------------------------------------
+# 1. 核心业务数据结构 (Core Business Schemas)
+# -------------------------------------------------------------
+
+
+class CacheStatsRead(SQLModel):
+    """Schema for reading the statistics of an in-process cache."""
+
+    name: str
+    ttl: float
+    hits: int
+    misses: int
+    hit_ratio: float
+    coalesced: int
+    refreshes: int
+    invalidations: int
+    last_refresh_ms: float
+    avg_refresh_ms: float
+
+
+# -------------------------------------------------------------
+# 2. 专用API响应模型 (Dedicated API Response Models)
+# -------------------------------------------------------------
+
+
+class CacheStatsResponse(BaseResponse):
+    """Dedicated response for fetching cache statistics."""
+
+    data: List[CacheStatsRead]
@@ -1,7 +1,9 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.common import BaseResponse
 
 
 # 共享的基本字段
@@ -30,3 +32,17 @@ class Comment(CommentBase):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# 批量写入评论时的单条评论，creation_id 为空表示对数字生命的评论
+class CommentBulkItem(BaseModel):
+    content: str = Field(..., min_length=1, max_length=500)
+    creation_id: Optional[int] = None
+
+
+class CommentBulkCreate(BaseModel):
+    comments: List[CommentBulkItem] = Field(..., min_length=1, max_length=1000)
+
+
+class CommentBulkCreateResponse(BaseResponse):
+    data: List[Comment]
@@ -71,6 +71,7 @@ class CreationListResponse(BaseResponse):
     """Dedicated response for fetching a list of creations."""
 
     data: List[CreationReadList]
+    next_cursor: Optional[str] = None
 
 
 class CreationDetailResponse(BaseResponse):
@@ -92,6 +93,7 @@ class CommentListResponse(BaseResponse):
     """Dedicated response for fetching a list of comments for a creation."""
 
     data: List[CommentRead]
+    next_cursor: Optional[str] = None
 
 
 class CommentCreateResponse(BaseResponse):
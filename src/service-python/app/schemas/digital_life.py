@@ -56,6 +56,7 @@ class CommentListResponse(BaseResponse):
     """Dedicated response for fetching a list of comments."""
 
     data: List[CommentRead]
+    next_cursor: Optional[str] = None
 
 
 class CommentCreateResponse(BaseResponse):
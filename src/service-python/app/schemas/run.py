@@ -0,0 +1,46 @@
+# File: app/schemas/run.py
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+from app.schemas.common import BaseResponse
+
+
+# -------------------------------------------------------------
+# 1. 核心业务数据结构 (Core Business Schemas)
+# -------------------------------------------------------------
+
+
+class RunCreate(SQLModel):
+    """Schema for enqueuing a new agent run (request body)."""
+
+    user_message: str = Field(..., min_length=1)
+    priority: int = Field(default=0, description="数值越大越先执行")
+
+
+class RunRead(SQLModel):
+    """Schema for reading the status of an agent run."""
+
+    id: int
+    user_message: str
+    status: str
+    priority: int
+    cancel_requested: bool
+    attempts: int
+    final_report: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+# -------------------------------------------------------------
+# 2. 专用API响应模型 (Dedicated API Response Models)
+# -------------------------------------------------------------
+
+
+class RunResponse(BaseResponse):
+    """Dedicated response for creating, fetching or cancelling a run."""
+
+    data: RunRead
@@ -1,7 +1,7 @@
 # File: app/schemas/thought_schema.py
 
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from sqlmodel import SQLModel
 from app.schemas.common import BaseResponse
@@ -16,7 +16,7 @@ class ThoughtRead(SQLModel):
     """Schema for reading a single thought record."""
 
     id: int
-    cycle_id: int
+    cycle_id: Optional[int] = None
     agent_name: str
     content: str
     created_at: datetime
@@ -31,3 +31,4 @@ class ThoughtListResponse(BaseResponse):
     """Dedicated response for fetching a list of thoughts."""
 
     data: List[ThoughtRead]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,255 @@
+# File: app/services/agent_events.py
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from app.agent.graph import agent
+from app.agent.state import StepTask
+from app.agent.tool_registry import with_tool_set
+from app.agent.tools import workspace_dir
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 需要向前端报告进出的图节点（含单步执行子图中的节点）
+NODE_NAMES = {
+    "planner",
+    "step_runner",
+    "join",
+    "reporter",
+    "agent",
+    "tool_executor",
+    "marker",
+}
+
+
+def _preview(value: Any, limit: int = 200) -> str:
+    text = value if isinstance(value, str) else str(getattr(value, "content", value))
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def translate_event(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    将 LangGraph astream_events (v2) 的原始事件转换为推送给前端的精简事件，
+    不关心的事件返回 None。
+    """
+    kind = event["event"]
+    name = event.get("name")
+    data = event.get("data", {})
+    node = event.get("metadata", {}).get("langgraph_node")
+
+    if kind == "on_chat_model_stream":
+        content = data["chunk"].content
+        if isinstance(content, str) and content:
+            # run_id 区分并行步骤中同名节点各自的模型调用
+            return {
+                "event": "token",
+                "data": {"node": node, "run_id": event["run_id"], "text": content},
+            }
+        return None
+
+    if kind == "on_tool_start":
+        return {
+            "event": "tool",
+            "data": {"name": name, "phase": "start", "input": data.get("input")},
+        }
+
+    if kind == "on_tool_end":
+        return {
+            "event": "tool",
+            "data": {
+                "name": name,
+                "phase": "end",
+                "output": _preview(data.get("output", "")),
+            },
+        }
+
+    if name not in NODE_NAMES or node != name:
+        return None
+
+    if name == "step_runner" and kind in ("on_chain_start", "on_chain_end"):
+        task = data.get("input")
+        step = task.state.plan.step(task.step_id) if isinstance(task, StepTask) else None
+        if step is None:
+            return None
+        status = "running" if kind == "on_chain_start" else "completed"
+        return {
+            "event": "step",
+            "data": {"id": step.id, "title": step.title, "status": status},
+        }
+
+    if kind == "on_chain_start":
+        return {"event": "node", "data": {"node": name, "phase": "start"}}
+
+    if kind == "on_chain_end":
+        output = data.get("output")
+        if name == "planner" and isinstance(output, dict) and "plan" in output:
+            return {"event": "plan", "data": output["plan"].model_dump()}
+        if name == "reporter" and isinstance(output, dict):
+            return {
+                "event": "report",
+                "data": {"final_report": output.get("final_report", "")},
+            }
+        return {"event": "node", "data": {"node": name, "phase": "end"}}
+
+    return None
+
+
+class EventBuffer:
+    """
+    生产者（智能体）与 SSE 消费者之间的缓冲区，不会阻塞智能体：
+
+    - 连续的 token 事件如果来自同一次模型调用，会合并为一个事件；
+    - 缓冲区超过 max_size 时丢弃无法合并的 token 事件，其它事件始终保留。
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.dropped = 0
+        self._items: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def put(self, item: Dict[str, Any]) -> None:
+        if item["event"] == "token" and self._items:
+            last = self._items[-1]
+            if (
+                last["event"] == "token"
+                and last["data"]["run_id"] == item["data"]["run_id"]
+            ):
+                last["data"]["text"] += item["data"]["text"]
+                return
+            if len(self._items) >= self.max_size:
+                self.dropped += 1
+                return
+        self._items.append(item)
+        self._ready.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+
+    @property
+    def exhausted(self) -> bool:
+        return self._closed and not self._items
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        取出下一个事件；超时或缓冲区已耗尽时返回 None。
+        """
+        if not self._items and not self._closed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._items.popleft() if self._items else None
+
+
+class StreamBusyError(Exception):
+    """API 进程内同时进行的流式运行已达 SSE_MAX_CONCURRENT_RUNS。"""
+
+
+_stream_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_stream_semaphore() -> asyncio.Semaphore:
+    # 流式运行在 API 进程内执行智能体（包括 shell_exec），与队列工作进程不同，需单独限流
+    global _stream_semaphore
+    if _stream_semaphore is None:
+        _stream_semaphore = asyncio.Semaphore(settings.SSE_MAX_CONCURRENT_RUNS)
+    return _stream_semaphore
+
+
+def format_sse(event: str, data: Any) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def stream_agent_events(user_message: str) -> AsyncIterator[str]:
+    """
+    在当前进程中运行智能体，并以 SSE 文本帧的形式产出进度事件。
+    消费者断开（生成器被关闭）时会取消正在运行的智能体。
+    开始时不等待地占用一个流式运行名额，名额已满时抛出 StreamBusyError；名额在生成器结束时释放。
+    """
+    semaphore = _get_stream_semaphore()
+    if semaphore.locked():
+        raise StreamBusyError()
+    await semaphore.acquire()
+    buffer = EventBuffer(settings.SSE_BUFFER_SIZE)
+
+    async def produce() -> None:
+        # 与后台工作进程一样，每个流使用独立的临时工作目录，create_file / shell_exec
+        # 不会作用于 API 进程的当前目录；contextvar 只在本任务内生效
+        os.makedirs(settings.RUN_WORKSPACE_ROOT, exist_ok=True)
+        workspace = tempfile.mkdtemp(prefix="stream-", dir=settings.RUN_WORKSPACE_ROOT)
+        workspace_dir.set(os.path.abspath(workspace))
+        try:
+            config = await with_tool_set({"recursion_limit": settings.RUN_RECURSION_LIMIT})
+            async for event in agent.astream_events(
+                {"user_message": user_message},
+                config=config,
+                version="v2",
+            ):
+                try:
+                    item = translate_event(event)
+                except Exception:
+                    # 单个无法识别的事件不应中断整个推送
+                    logger.exception(f"无法转换事件 {event.get('event')} ({event.get('name')})")
+                    continue
+                if item is not None:
+                    buffer.put(item)
+        except Exception as e:
+            logger.exception("智能体流式运行失败")
+            buffer.put({"event": "error", "data": {"message": repr(e)}})
+        finally:
+            # 流结束后没有途径取回目录中的文件，直接删除；先于 done 事件完成，
+            # 消费者收到 done 后关闭生成器时不会取消清理
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(shutil.rmtree, workspace, ignore_errors=True)
+            )
+            buffer.put({"event": "done", "data": {"dropped_tokens": buffer.dropped}})
+            buffer.close()
+
+    producer = asyncio.create_task(produce())
+    try:
+        # 立即发送首帧，客户端无需等待第一个节点完成
+        yield format_sse("start", {"user_message": user_message})
+        while True:
+            item = await buffer.get(timeout=settings.SSE_KEEPALIVE_INTERVAL)
+            if item is None:
+                if buffer.exhausted:
+                    break
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(item["event"], item["data"])
+    finally:
+        producer.cancel()
+        semaphore.release()
+
+
+async def open_agent_stream(user_message: str) -> AsyncIterator[str]:
+    """
+    启动一次流式运行并返回 SSE 帧迭代器，名额已满时直接抛出 StreamBusyError，
+    路由可以在响应开始前返回 429。迭代器已产出首帧：即使响应没有开始发送就被丢弃，
+    生成器也会在回收时关闭，释放名额并取消智能体。
+    """
+    events = stream_agent_events(user_message)
+    first = await events.__anext__()
+
+    async def frames() -> AsyncIterator[str]:
+        try:
+            yield first
+            async for frame in events:
+                yield frame
+        finally:
+            await events.aclose()
+
+    return frames()
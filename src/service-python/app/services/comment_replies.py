@@ -0,0 +1,231 @@
+# File: app/services/comment_replies.py
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, Text, bindparam, func, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.agent import nodes
+from app.agent.prompts import REPLY_PROMPT, REPLY_SYSTEM_PROMPT
+from app.core.config import settings
+from app.models import Creation
+
+logger = logging.getLogger(__name__)
+
+
+class CommentReply(BaseModel):
+    comment_id: int
+    reply: str
+
+
+class CommentReplies(BaseModel):
+    replies: List[CommentReply] = []
+
+
+# 认领一批评论：尝试次数加一并设置租约，提交后即释放行锁；
+# 租约到期前其它工作进程不会重复认领，尝试次数达到上限的评论不再认领
+_CLAIM_STATEMENT = text(
+    """
+    UPDATE comments AS c
+    SET reply_attempts = c.reply_attempts + 1,
+        reply_claimed_until = now() + make_interval(secs => :lease)
+    FROM (
+        SELECT id FROM comments
+        WHERE reply_content IS NULL
+          AND reply_attempts < :max_attempts
+          AND (reply_claimed_until IS NULL OR reply_claimed_until < now())
+        ORDER BY creation_id, id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ) AS claimed
+    WHERE c.id = claimed.id
+    RETURNING c.id, c.content, c.creation_id
+    """
+)
+
+# 一条语句写回整批回复；只更新仍未回复的评论
+_WRITE_STATEMENT = text(
+    """
+    UPDATE comments AS c
+    SET reply_content = v.reply, reply_claimed_until = NULL
+    FROM unnest(:ids, :replies) AS v(id, reply)
+    WHERE c.id = v.id AND c.reply_content IS NULL
+    """
+).bindparams(
+    bindparam("ids", type_=ARRAY(BigInteger)),
+    bindparam("replies", type_=ARRAY(Text)),
+)
+
+
+class RateLimiter:
+    """
+    按「每分钟条数」限速的令牌桶。令牌可以透支：调用方先预留，再等待透支部分补足，
+    并发调用之间不需要加锁。rate_per_minute 为 0 时不限速。
+    """
+
+    def __init__(self, rate_per_minute: int, burst: int):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self, count: int) -> None:
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= count
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+    def release(self, count: int) -> None:
+        """归还预留后没有用掉的令牌。"""
+        if self.rate <= 0:
+            return
+        self._tokens = min(self.burst, self._tokens + count)
+
+
+class ReplyStats:
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.batches = 0
+        self.claimed = 0
+        self.replied = 0
+        self.llm_seconds = 0.0
+
+    def record(self, claimed: int, replied: int, llm_seconds: float) -> None:
+        self.batches += 1
+        self.claimed += claimed
+        self.replied += replied
+        self.llm_seconds += llm_seconds
+
+    def summary(self) -> str:
+        minutes = max(time.monotonic() - self.started, 1e-9) / 60
+        avg_llm = self.llm_seconds / self.batches if self.batches else 0.0
+        return (
+            f"批次 {self.batches}，认领 {self.claimed}，回复 {self.replied}，"
+            f"{self.replied / minutes:.1f} 条/分钟，模型调用平均 {avg_llm:.2f}s"
+        )
+
+
+async def claim_unreplied(db: AsyncSession, limit: int) -> Sequence:
+    """
+    认领一批尚未回复的评论并立即提交，按作品聚在一起返回。
+    认领靠租约而不是行锁保持：模型调用期间不持有事务和连接，
+    FOR UPDATE SKIP LOCKED 只保证并发认领时不会拿到同一条评论。
+    """
+    result = await db.exec(
+        _CLAIM_STATEMENT,  # type: ignore
+        params={
+            "lease": settings.REPLY_CLAIM_LEASE,
+            "max_attempts": settings.REPLY_MAX_ATTEMPTS,
+            "limit": limit,
+        },
+    )
+    rows = result.all()
+    await db.commit()
+    # RETURNING 不保证顺序，与 ORDER BY creation_id, id 一致（NULL 排在最后）
+    return sorted(rows, key=lambda row: (row[2] is None, row[2] or 0, row[0]))
+
+
+async def load_creation_context(
+    db: AsyncSession, creation_ids: Sequence[int]
+) -> Dict[int, Tuple[str, str]]:
+    """
+    一次查询取回每个作品的标题和内容摘要：(title, excerpt)。
+    """
+    if not creation_ids:
+        return {}
+    statement = select(
+        Creation.id,
+        Creation.title,
+        func.left(Creation.content, settings.REPLY_CONTEXT_CHARS),
+    ).where(Creation.id.in_(creation_ids))  # type: ignore
+    result = await db.exec(statement)
+    return {row[0]: (row[1], row[2] or "") for row in result.all()}
+
+
+def render_comments(
+    groups: Dict[Optional[int], List[Tuple[int, str]]],
+    context: Dict[int, Tuple[str, str]],
+) -> str:
+    sections = []
+    for creation_id, comments in groups.items():
+        if creation_id is None:
+            header = "对数字生命本人的评论："
+        else:
+            title, excerpt = context.get(creation_id, ("（已删除的作品）", ""))
+            header = f"作品 #{creation_id}《{title}》\n内容摘要：{excerpt}\n评论："
+        lines = [f"- [{comment_id}] {content}" for comment_id, content in comments]
+        sections.append("\n".join([header, *lines]))
+    return "\n\n".join(sections)
+
+
+async def generate_replies(prompt: str) -> CommentReplies:
+    messages = [
+        SystemMessage(content=REPLY_SYSTEM_PROMPT),
+        HumanMessage(content=REPLY_PROMPT.format(comments=prompt)),
+    ]
+    # 与 planner 相同，使用 json_mode 获取结构化输出
+    return await (
+        nodes.llm.with_structured_output(CommentReplies, method="json_mode")
+        .bind(response_format={"type": "json_object"})
+        .ainvoke(messages)
+    )
+
+
+async def reply_batch(
+    db: AsyncSession, batch_size: int, limiter: RateLimiter, stats: ReplyStats
+) -> int:
+    """
+    认领最多 batch_size 条未回复评论，用一次模型调用生成全部回复并批量写回。
+    返回写回的回复数，0 表示没有待回复的评论或模型一条也没有回复，调用方应等待后再试。
+    模型漏掉的评论保持未回复状态，租约到期后重新认领，直到达到 REPLY_MAX_ATTEMPTS。
+
+    认领、读取作品摘要、写回各自是一个短事务，限速等待和模型调用期间不占用连接。
+    """
+    # 先限速再认领，等待期间不持有任何评论
+    await limiter.acquire(batch_size)
+    claimed = await claim_unreplied(db, batch_size)
+    limiter.release(batch_size - len(claimed))
+    if not claimed:
+        return 0
+
+    groups: Dict[Optional[int], List[Tuple[int, str]]] = defaultdict(list)
+    for comment_id, content, creation_id in claimed:
+        groups[creation_id].append((comment_id, content))
+    context = await load_creation_context(
+        db, [creation_id for creation_id in groups if creation_id is not None]
+    )
+    await db.commit()
+
+    start = time.perf_counter()
+    result = await generate_replies(render_comments(groups, context))
+    llm_seconds = time.perf_counter() - start
+
+    claimed_ids = {row[0] for row in claimed}
+    replies = {
+        r.comment_id: r.reply.strip()
+        for r in result.replies
+        if r.comment_id in claimed_ids and r.reply.strip()
+    }
+    if replies:
+        await db.exec(
+            _WRITE_STATEMENT,  # type: ignore
+            params={"ids": list(replies), "replies": list(replies.values())},
+        )
+        await db.commit()
+
+    stats.record(len(claimed), len(replies), llm_seconds)
+    if len(replies) < len(claimed):
+        logger.warning(f"模型只回复了 {len(replies)}/{len(claimed)} 条评论")
+    return len(replies)
@@ -0,0 +1,138 @@
+# File: app/services/comments.py
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import BigInteger, Text, bindparam, func, literal, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import insert, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.projection import schema_columns
+from app.models import Comment, Creation, DigitalLife
+from app.schemas.creation import CommentRead
+
+# 评论接口返回的列
+_RETURNING = schema_columns(Comment, CommentRead)
+
+# 一条语句批量写入评论，并按作品 / 数字生命累加评论数：
+# 先按 id 顺序锁定涉及的作品，避免并发批量写入时以不同顺序加锁导致死锁；
+# 作品不存在的评论不会写入，调用方根据返回行数判断并回滚
+_BULK_STATEMENT = text(
+    """
+    WITH input AS (
+        SELECT *
+        FROM unnest(:contents, :creation_ids) WITH ORDINALITY AS t(content, creation_id, ord)
+    ),
+    locked AS (
+        SELECT id FROM creations
+        WHERE id IN (SELECT creation_id FROM input)
+        ORDER BY id
+        FOR UPDATE
+    ),
+    inserted AS (
+        INSERT INTO comments (content, creation_id)
+        SELECT i.content, i.creation_id
+        FROM input AS i
+        WHERE i.creation_id IS NULL
+           OR EXISTS (SELECT 1 FROM locked WHERE locked.id = i.creation_id)
+        ORDER BY i.ord
+        RETURNING id, content, creation_id, reply_content, created_at
+    ),
+    creation_counts AS (
+        UPDATE creations AS c
+        SET comments = c.comments + n.added
+        FROM (
+            SELECT creation_id, count(*) AS added
+            FROM inserted
+            WHERE creation_id IS NOT NULL
+            GROUP BY creation_id
+        ) AS n
+        WHERE c.id = n.creation_id
+    ),
+    life_count AS (
+        UPDATE digital_life AS d
+        SET comments = d.comments + n.added
+        FROM (SELECT count(*) AS added FROM inserted WHERE creation_id IS NULL) AS n
+        WHERE n.added > 0 AND d.id = (SELECT min(id) FROM digital_life)
+    )
+    SELECT * FROM inserted ORDER BY id
+    """
+).bindparams(
+    bindparam("contents", type_=ARRAY(Text)),
+    bindparam("creation_ids", type_=ARRAY(BigInteger)),
+)
+
+
+def _first_life_id() -> Any:
+    # 系统中只有一个主数字生命实体，总是取第一个
+    return select(func.min(DigitalLife.id)).scalar_subquery()
+
+
+async def add_creation_comment(
+    db: AsyncSession, creation_id: int, content: str
+) -> Optional[Any]:
+    """
+    一次往返完成「作品评论数加一 + 写入评论」：UPDATE ... RETURNING 作为 CTE，
+    INSERT 从它选择 creation_id。作品不存在时不写入任何数据并返回 None。
+    评论数由数据库原子递增，并发评论时计数保持准确。
+    """
+    bumped = (
+        update(Creation)
+        .where(Creation.id == creation_id)  # type: ignore
+        .values(comments=Creation.comments + 1)
+        .returning(Creation.id)
+        .cte("bumped")
+    )
+    statement = (
+        insert(Comment)
+        .from_select(["content", "creation_id"], select(literal(content), bumped.c.id))
+        .returning(*_RETURNING)
+    )
+    result = await db.exec(statement)  # type: ignore
+    row = result.first()
+    await db.commit()
+    return row
+
+
+async def add_life_comment(db: AsyncSession, content: str) -> Any:
+    """
+    一次往返完成「写入对数字生命的评论 + 数字生命评论数加一」。
+    """
+    inserted = (
+        insert(Comment).values(content=content).returning(*_RETURNING).cte("inserted")
+    )
+    bumped = (
+        update(DigitalLife)
+        .where(DigitalLife.id == _first_life_id())  # type: ignore
+        .values(comments=DigitalLife.comments + 1)
+        .cte("bumped")
+    )
+    result = await db.exec(select(inserted).add_cte(bumped))  # type: ignore
+    row = result.one()
+    await db.commit()
+    return row
+
+
+async def add_comments_bulk(
+    db: AsyncSession, items: Sequence[Tuple[str, Optional[int]]]
+) -> Tuple[List[Any], List[int]]:
+    """
+    在一个事务、一条语句中写入多条 (content, creation_id) 评论并更新评论数。
+    返回 (写入的评论行, 不存在的作品 id)；有作品不存在时整体回滚，不写入任何评论。
+    """
+    contents = [content for content, _ in items]
+    creation_ids = [creation_id for _, creation_id in items]
+    result = await db.exec(
+        _BULK_STATEMENT,  # type: ignore
+        params={"contents": contents, "creation_ids": creation_ids},
+    )
+    rows = list(result.all())
+
+    if len(rows) != len(items):
+        await db.rollback()
+        found = {row.creation_id for row in rows}
+        missing = sorted({c for c in creation_ids if c is not None} - found)
+        return [], missing
+
+    await db.commit()
+    return rows, []
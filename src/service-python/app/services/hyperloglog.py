@@ -0,0 +1,97 @@
+# File: app/services/hyperloglog.py
+
+import math
+
+import numpy as np
+import xxhash
+
+
+class HyperLogLog:
+    """
+    HyperLogLog 基数估计，寄存器使用 NumPy uint8 数组，占用 2**precision 字节，
+    与写入的元素数量无关（precision=12 时为 4 KB）。
+
+    标准误差约为 1.04 / sqrt(2**precision)：
+    precision=12 时约 1.6%，即约 95% 的估计落在真实值 ±3.3% 以内。
+    小基数时使用线性计数修正；哈希为 64 位，不需要大基数修正。
+
+    两个精度相同的草图可以逐寄存器取最大值合并，结果等价于对两个集合的并集计数，
+    因此各工作进程可以各自计数，写回数据库时再合并。
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+        self._value_bits = 64 - precision
+        self._value_mask = (1 << self._value_bits) - 1
+
+    @property
+    def _alpha(self) -> float:
+        if self.m == 16:
+            return 0.673
+        if self.m == 32:
+            return 0.697
+        if self.m == 64:
+            return 0.709
+        return 0.7213 / (1 + 1.079 / self.m)
+
+    def add(self, item: str) -> bool:
+        """
+        加入一个元素，返回寄存器是否发生变化（未变化说明估计值不会改变）。
+        """
+        h = xxhash.xxh3_64_intdigest(item.encode("utf-8"))
+        index = h >> self._value_bits
+        # 剩余位中从高位开始第一个 1 的位置
+        rank = self._value_bits - (h & self._value_mask).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def fold(self, precision: int) -> "HyperLogLog":
+        """
+        折叠为更低精度的草图，结果与直接以该精度计数完全相同。
+        原下标的低位并入取值部分：这些位不全为 0 时由它们决定新的秩，否则在原秩上加位数。
+        """
+        if precision > self.precision:
+            raise ValueError("can only fold to a lower precision")
+        shift = self.precision - precision
+        folded = HyperLogLog(precision)
+        if shift == 0:
+            folded.registers = self.registers.copy()
+            return folded
+        low = np.arange(self.m) & ((1 << shift) - 1)
+        low_rank = shift - np.floor(np.log2(np.maximum(low, 1))).astype(np.int64)
+        ranks = np.where(low > 0, low_rank, shift + self.registers.astype(np.int64))
+        ranks = np.where(self.registers == 0, 0, ranks)
+        folded.registers = ranks.reshape(folded.m, -1).max(axis=1).astype(np.uint8)
+        return folded
+
+    def estimate(self) -> int:
+        registers = self.registers.astype(np.float64)
+        raw = self._alpha * self.m * self.m / float(np.sum(np.exp2(-registers)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            # 小基数时使用线性计数
+            return int(round(self.m * math.log(self.m / zeros)))
+        return int(round(raw))
+
+    def to_bytes(self) -> bytes:
+        return self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        precision = int(math.log2(len(data)))
+        if 1 << precision != len(data):
+            raise ValueError("invalid sketch size")
+        sketch = cls(precision)
+        sketch.registers = np.frombuffer(data, dtype=np.uint8).copy()
+        return sketch
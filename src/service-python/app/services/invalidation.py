@@ -0,0 +1,143 @@
+# File: app/services/invalidation.py
+
+import asyncio
+import logging
+from typing import Optional, Set
+
+import asyncpg
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine
+from app.services.snapshot_cache import caches
+
+logger = logging.getLogger(__name__)
+
+# 通知内容为缓存名称；ALL 表示清空全部缓存
+ALL = "*"
+
+_PENDING_KEY = "pending_cache_invalidations"
+
+
+def invalidate_local(key: str) -> None:
+    """
+    失效本进程中名称为 key 的缓存，key 为 ALL 时清空全部缓存。
+    """
+    if key == ALL:
+        for cache in caches.values():
+            cache.invalidate()
+    elif key in caches:
+        caches[key].invalidate()
+
+
+async def publish_invalidation(db: AsyncSession, *keys: str) -> None:
+    """
+    在当前事务中发布缓存失效通知。
+
+    pg_notify 随事务提交才会送达，所有工作进程的监听连接（包括本进程）都会收到；
+    本进程的缓存还会在 commit 之后立即失效，不依赖监听连接是否在线。
+    事务回滚时通知和本地失效都不会发生。
+    """
+    for key in keys:
+        await db.exec(select(func.pg_notify(settings.CACHE_INVALIDATION_CHANNEL, key)))
+    pending: Set[str] = db.sync_session.info.setdefault(_PENDING_KEY, set())
+    pending.update(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for key in session.info.pop(_PENDING_KEY, ()):
+        invalidate_local(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _listen_dsn() -> str:
+    # 监听连接直接使用 asyncpg，不经过 SQLAlchemy 连接池
+    url = engine.url.set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class InvalidationListener:
+    """
+    每个工作进程持有一条专用的 asyncpg LISTEN 连接，收到通知后失效本地缓存。
+
+    连接断开（数据库重启、网络中断）后按指数退避重连；断线期间的通知可能丢失，
+    因此每次（重新）建立监听后都会清空本进程的全部缓存。
+    """
+
+    def __init__(self, channel: str, keepalive: float, max_backoff: float):
+        self.channel = channel
+        self.keepalive = keepalive
+        self.max_backoff = max_backoff
+        self.connected = False
+        self.notifications = 0
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self.notifications += 1
+        invalidate_local(payload)
+
+    async def _listen_once(self) -> None:
+        conn = await asyncpg.connect(_listen_dsn())
+        lost = asyncio.Event()
+        conn.add_termination_listener(lambda _: lost.set())
+        try:
+            await conn.add_listener(self.channel, self._on_notify)
+            invalidate_local(ALL)
+            self.connected = True
+            logger.info(f"已监听缓存失效通道 {self.channel}")
+            while True:
+                try:
+                    await asyncio.wait_for(lost.wait(), timeout=self.keepalive)
+                    return
+                except asyncio.TimeoutError:
+                    # 定期探活，及时发现半开连接
+                    await conn.execute("SELECT 1")
+        finally:
+            self.connected = False
+            if not conn.is_closed():
+                conn.terminate()
+
+    async def _run(self) -> None:
+        backoff = 0.5
+        while True:
+            try:
+                await self._listen_once()
+                backoff = 0.5
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"缓存失效监听连接异常: {e!r}，{backoff:.1f}s 后重连")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            self.reconnects += 1
+            # 断线期间本进程缓存可能已经过期，在重新监听之前就不再使用
+            invalidate_local(ALL)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+invalidation_listener = InvalidationListener(
+    channel=settings.CACHE_INVALIDATION_CHANNEL,
+    keepalive=settings.CACHE_INVALIDATION_KEEPALIVE,
+    max_backoff=settings.CACHE_INVALIDATION_MAX_BACKOFF,
+)
@@ -0,0 +1,30 @@
+# File: app/services/life_status.py
+
+from typing import Optional
+
+from sqlmodel import select
+
+from app.api.projection import schema_columns
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import DigitalLife
+from app.schemas.digital_life import LifeStatusRead
+from app.services.snapshot_cache import SnapshotCache
+
+
+async def load_life_status() -> Optional[LifeStatusRead]:
+    """
+    从数据库读取数字生命状态。系统中只有一个主数字生命实体，总是取第一个。
+    """
+    async with AsyncSessionLocal() as session:
+        statement = select(*schema_columns(DigitalLife, LifeStatusRead)).limit(1)
+        result = await session.exec(statement)
+        row = result.first()
+    return None if row is None else LifeStatusRead.model_validate(row._mapping)
+
+
+# /life/status 的快照缓存；修改点赞、评论、作品、工具计数的写操作需要在事务中
+# 调用 publish_invalidation(db, life_status_cache.name)
+life_status_cache: SnapshotCache[Optional[LifeStatusRead]] = SnapshotCache(
+    "life_status", load_life_status, ttl=settings.LIFE_STATUS_CACHE_TTL
+)
@@ -0,0 +1,142 @@
+# File: app/services/like_counter.py
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+
+from sqlalchemy import BigInteger, Integer, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import Creation
+
+logger = logging.getLogger(__name__)
+
+# 一条语句批量写回多个作品的点赞增量
+_FLUSH_STATEMENT = text(
+    """
+    UPDATE creations AS c
+    SET likes = c.likes + v.delta
+    FROM unnest(:ids, :deltas) AS v(id, delta)
+    WHERE c.id = v.id
+    RETURNING c.id, c.likes
+    """
+).bindparams(
+    bindparam("ids", type_=ARRAY(BigInteger)),
+    bindparam("deltas", type_=ARRAY(Integer)),
+)
+
+
+async def increment_likes(db: AsyncSession, creation_id: int) -> Optional[int]:
+    """
+    单条 UPDATE ... RETURNING 原子地加一，返回最新点赞数；作品不存在时返回 None。
+    """
+    statement = (
+        update(Creation)
+        .where(Creation.id == creation_id)  # type: ignore
+        .values(likes=Creation.likes + 1)
+        .returning(Creation.likes)
+    )
+    result = await db.exec(statement)
+    likes = result.scalar_one_or_none()
+    await db.commit()
+    return likes
+
+
+class LikeAggregator:
+    """
+    进程内点赞聚合器：在一个时间窗口内累加每个作品的点赞增量，
+    到期后用一条批量 UPDATE 写回数据库。
+
+    返回给客户端的点赞数 = 最近一次写回的值 + 正在写回的增量 + 尚未写回的增量。
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._flushed: Dict[int, int] = {}
+        self._inflight: Dict[int, int] = {}
+        self._pending: Dict[int, int] = defaultdict(int)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def current(self, creation_id: int) -> int:
+        return (
+            self._flushed.get(creation_id, 0)
+            + self._inflight.get(creation_id, 0)
+            + self._pending.get(creation_id, 0)
+        )
+
+    async def add(self, db: AsyncSession, creation_id: int) -> Optional[int]:
+        """
+        记录一次点赞并返回当前点赞数；作品不存在时返回 None。
+        只有窗口内第一次见到的作品才需要查询一次数据库。
+        """
+        if creation_id not in self._flushed:
+            result = await db.exec(
+                select(Creation.likes).where(Creation.id == creation_id)
+            )
+            likes = result.first()
+            if likes is None:
+                return None
+            self._flushed.setdefault(creation_id, likes)
+
+        self._pending[creation_id] += 1
+        return self.current(creation_id)
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+
+        self._inflight, self._pending = dict(self._pending), defaultdict(int)
+        ids, deltas = list(self._inflight), list(self._inflight.values())
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.exec(
+                    _FLUSH_STATEMENT, params={"ids": ids, "deltas": deltas}
+                )
+                rows = result.all()
+                await session.commit()
+        except Exception:
+            logger.exception("点赞增量写回失败，将在下一个窗口重试")
+            for creation_id, delta in self._inflight.items():
+                self._pending[creation_id] += delta
+            self._inflight = {}
+            return
+
+        # 只保留本轮有写入或仍有待写入增量的作品，冷数据下次点赞时重新读取，避免缓存无限增长
+        flushed = {k: v for k, v in self._flushed.items() if k in self._pending}
+        flushed.update((creation_id, likes) for creation_id, likes in rows)
+        self._flushed = flushed
+        self._inflight = {}
+
+    async def _run(self) -> None:
+        # 不直接 cancel 写回任务，避免在提交途中被打断导致增量丢失
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+like_aggregator = LikeAggregator(settings.LIKE_FLUSH_INTERVAL_MS / 1000)
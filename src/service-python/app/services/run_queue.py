@@ -0,0 +1,165 @@
+# File: app/services/run_queue.py
+
+import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import desc, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models import AgentRun
+
+# 终态：进入这些状态后不再变化
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+async def enqueue_run(
+    db: AsyncSession, user_message: str, priority: int = 0
+) -> AgentRun:
+    run = AgentRun(user_message=user_message, priority=priority)
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+    return run
+
+
+async def claim_next_run(
+    db: AsyncSession, worker: str
+) -> Optional[Tuple[int, int, str]]:
+    """
+    认领一个排队中的运行：按优先级和创建顺序取第一条，返回 (run_id, attempt, user_message)。
+    子查询使用 FOR UPDATE SKIP LOCKED，多个工作进程并发认领时互不阻塞、不会重复认领。
+    attempt 是本次认领后的 attempts，每次认领都不同，之后的心跳和结束都以它确认归属。
+    """
+    candidate = (
+        select(AgentRun.id)
+        .where(AgentRun.status == "queued")
+        .order_by(desc(AgentRun.priority), AgentRun.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    statement = (
+        update(AgentRun)
+        .where(AgentRun.id == candidate)  # type: ignore
+        .values(
+            status="running",
+            worker=worker,
+            attempts=AgentRun.attempts + 1,
+            cancel_requested=False,
+            started_at=func.now(),
+            heartbeat_at=func.now(),
+        )
+        .returning(AgentRun.id, AgentRun.attempts, AgentRun.user_message)
+    )
+    result = await db.exec(statement)
+    row = result.first()
+    await db.commit()
+    return None if row is None else (row[0], row[1], row[2])
+
+
+def _owned(run_id: int, worker: str, attempt: int) -> tuple:
+    # 运行被回收重新排队、再被认领后 attempts 会变化，原工作进程的更新不再匹配
+    return (
+        AgentRun.id == run_id,
+        AgentRun.worker == worker,
+        AgentRun.attempts == attempt,
+        AgentRun.status == "running",
+    )
+
+
+async def heartbeat(
+    db: AsyncSession, run_id: int, worker: str, attempt: int
+) -> Optional[bool]:
+    """
+    更新运行心跳，并返回是否已被请求取消。
+    运行已不属于本次认领（被回收、被重新认领或已结束）时返回 None，调用方应停止执行。
+    """
+    statement = (
+        update(AgentRun)
+        .where(*_owned(run_id, worker, attempt))  # type: ignore
+        .values(heartbeat_at=func.now())
+        .returning(AgentRun.cancel_requested)
+    )
+    result = await db.exec(statement)
+    row = result.first()
+    await db.commit()
+    return None if row is None else bool(row[0])
+
+
+async def finish_run(
+    db: AsyncSession,
+    run_id: int,
+    worker: str,
+    attempt: int,
+    status: str,
+    final_report: Optional[str] = None,
+    error: Optional[str] = None,
+) -> bool:
+    """
+    写入运行结果。只有仍持有该运行的认领才能写入，返回是否写入成功；
+    已被回收或已结束（包括已取消）的运行保持不变。
+    """
+    statement = (
+        update(AgentRun)
+        .where(*_owned(run_id, worker, attempt))  # type: ignore
+        .values(
+            status=status,
+            final_report=final_report,
+            error=error,
+            finished_at=func.now(),
+        )
+    )
+    result = await db.exec(statement)
+    await db.commit()
+    return result.rowcount > 0
+
+
+async def request_cancel(db: AsyncSession, run_id: int) -> Optional[AgentRun]:
+    """
+    取消运行：排队中的直接标记为 cancelled；运行中的设置 cancel_requested，
+    由执行它的工作进程在下一次心跳时中断。已结束的运行保持不变。
+    """
+    run = await db.get(AgentRun, run_id, with_for_update=True)
+    if run is None:
+        return None
+
+    if run.status == "queued":
+        run.status = "cancelled"
+        run.finished_at = func.now()
+    elif run.status == "running":
+        run.cancel_requested = True
+
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+    return run
+
+
+async def requeue_stale_runs(db: AsyncSession) -> Tuple[int, int]:
+    """
+    把心跳超时（工作进程崩溃或被杀）的运行重新放回队列；已认领 RUN_MAX_ATTEMPTS 次的运行
+    标记为 failed，不再重试（每次执行都会拖垮工作进程的运行不会无限循环）。
+    返回 (重新排队的数量, 标记为失败的数量)。
+    """
+    cutoff = func.now() - datetime.timedelta(seconds=settings.RUN_STALE_AFTER)
+    stale = (
+        AgentRun.status == "running",
+        AgentRun.heartbeat_at < cutoff,  # type: ignore
+    )
+    failed = await db.exec(
+        update(AgentRun)
+        .where(*stale)  # type: ignore
+        .where(AgentRun.attempts >= settings.RUN_MAX_ATTEMPTS)  # type: ignore
+        .values(
+            status="failed",
+            error=f"心跳超时，已尝试 {settings.RUN_MAX_ATTEMPTS} 次",
+            finished_at=func.now(),
+        )
+    )
+    requeued = await db.exec(
+        update(AgentRun).where(*stale).values(status="queued", worker=None)  # type: ignore
+    )
+    await db.commit()
+    return requeued.rowcount, failed.rowcount
@@ -0,0 +1,97 @@
+# File: app/services/snapshot_cache.py
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 进程内所有快照缓存，按名称索引，供统计接口与失效通知使用
+caches: Dict[str, "SnapshotCache"] = {}
+
+
+class SnapshotCache(Generic[T]):
+    """
+    进程内的单值快照缓存：
+
+    - 命中且未过期时直接返回内存中的值；
+    - 过期或被失效后，同一时刻只有一个刷新任务执行 loader，
+      其余请求等待并共享它的结果（single-flight），避免过期瞬间的惊群查询；
+    - invalidate() 会让正在进行的刷新结果不再写入缓存，下一次读取重新加载。
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Awaitable[T]], ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self._loader = loader
+        self._value: Optional[T] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._refresh: Optional[asyncio.Future] = None
+        self._refresh_generation = -1
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # 未命中但合并进已有刷新任务的请求数
+        self.refreshes = 0
+        self.invalidations = 0
+        self.last_refresh_ms = 0.0
+        self._total_refresh_ms = 0.0
+        caches[name] = self
+
+    async def get(self) -> T:
+        if time.monotonic() < self._expires_at:
+            self.hits += 1
+            return self._value  # type: ignore
+        self.misses += 1
+
+        if self._refresh is None or self._refresh_generation != self._generation:
+            self._refresh_generation = self._generation
+            self._refresh = asyncio.ensure_future(self._load(self._generation))
+        else:
+            self.coalesced += 1
+        # shield：某个等待者被取消（如客户端断开）时不影响共享的刷新任务
+        return await asyncio.shield(self._refresh)
+
+    async def _load(self, generation: int) -> T:
+        start = time.perf_counter()
+        try:
+            value = await self._loader()
+        finally:
+            if self._refresh_generation == generation:
+                self._refresh = None
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.refreshes += 1
+        self.last_refresh_ms = elapsed_ms
+        self._total_refresh_ms += elapsed_ms
+
+        # 加载期间发生过失效的结果只返回给本次等待者，不写入缓存
+        if generation == self._generation:
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._expires_at = 0.0
+        self._value = None
+        self.invalidations += 1
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "invalidations": self.invalidations,
+            "last_refresh_ms": self.last_refresh_ms,
+            "avg_refresh_ms": (
+                self._total_refresh_ms / self.refreshes if self.refreshes else 0.0
+            ),
+        }
@@ -0,0 +1,148 @@
+# File: app/services/thought_sink.py
+
+import asyncio
+import datetime
+import logging
+import time
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlmodel import insert
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Thought
+
+logger = logging.getLogger(__name__)
+
+# 当前运行（思考周期）的 id，由执行运行的一方设置，节点写入思考时自动带上
+current_cycle_id: ContextVar[Optional[int]] = ContextVar(
+    "current_cycle_id", default=None
+)
+
+ThoughtRecord = Tuple[Optional[int], str, str, datetime.datetime]
+
+_COLUMNS = ["cycle_id", "agent_name", "content", "created_at"]
+
+# 放入队列通知后台任务写完手上的批次后退出；排在它之前的记录都会被写入
+_STOP = object()
+
+
+class ThoughtSink:
+    """
+    异步思考写入器：节点把思考事件放入内存队列，后台任务攒够 batch_size 条
+    或等待 flush_interval 秒后，用一次 COPY（或多行 INSERT）批量写入 thoughts 表。
+
+    队列有上限：数据库跟不上时 emit 会等待，对生产者形成背压，而不是无限占用内存。
+    未启动时 emit 直接丢弃事件，便于在没有数据库的环境中运行智能体。
+    """
+
+    def __init__(
+        self, batch_size: int, flush_interval: float, max_pending: int, method: str
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.method = method
+        self.written = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def emit(
+        self, agent_name: str, content: str, cycle_id: Optional[int] = None
+    ) -> None:
+        if self._queue is None:
+            return
+        if cycle_id is None:
+            cycle_id = current_cycle_id.get()
+        await self._queue.put(
+            (cycle_id, agent_name, content, datetime.datetime.now())
+        )
+
+    async def _write(self, records: List[ThoughtRecord]) -> None:
+        async with engine.connect() as conn:
+            if self.method == "copy":
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(  # type: ignore
+                    Thought.__tablename__, records=records, columns=_COLUMNS
+                )
+            else:
+                await conn.execute(
+                    insert(Thought).values([dict(zip(_COLUMNS, r)) for r in records])
+                )
+                await conn.commit()
+        self.written += len(records)
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            # 等待第一条记录，然后在 flush_interval 内尽量攒满一批
+            first = await self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                return
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[ThoughtRecord]) -> None:
+        try:
+            await self._write(batch)
+        except Exception:
+            logger.exception(f"写入 {len(batch)} 条思考记录失败，已丢弃")
+        finally:
+            for _ in batch:
+                self._queue.task_done()  # type: ignore
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        停止后台任务，并把队列中剩余的记录全部写入。
+
+        不直接取消任务：后台任务可能正持有已出队、尚未写入的批次。放入停止标记后，
+        它会写完标记之前的所有记录再退出；之后才到达的记录在这里补写。
+        """
+        if self._task is None or self._queue is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        for start in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[start : start + self.batch_size])
+        self._queue = None
+
+
+thought_sink = ThoughtSink(
+    batch_size=settings.THOUGHT_BATCH_SIZE,
+    flush_interval=settings.THOUGHT_FLUSH_INTERVAL,
+    max_pending=settings.THOUGHT_MAX_PENDING,
+    method=settings.THOUGHT_WRITE_METHOD,
+)
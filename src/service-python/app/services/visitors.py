@@ -0,0 +1,107 @@
+# File: app/services/visitors.py
+
+import asyncio
+import logging
+from typing import Optional
+
+from sqlmodel import select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import DigitalLife
+from app.services.hyperloglog import HyperLogLog
+from app.services.invalidation import publish_invalidation
+from app.services.life_status import life_status_cache
+
+logger = logging.getLogger(__name__)
+
+
+class VisitorCounter:
+    """
+    独立访客计数：请求只更新进程内的 HyperLogLog 草图，不访问数据库。
+
+    后台任务定期在一个事务中锁定数字生命记录，把本进程草图与库中保存的草图
+    （digital_life.visitor_sketch）合并，写回合并后的草图与估计值（digital_life.visitors）。
+    合并是逐寄存器取最大值，多个工作进程重复写回不会重复计数。
+    """
+
+    def __init__(self, precision: int, interval: float):
+        self.interval = interval
+        self.sketch = HyperLogLog(precision)
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def add(self, fingerprint: str) -> None:
+        if self.sketch.add(fingerprint):
+            self._dirty = True
+
+    async def flush(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.exec(
+                    select(DigitalLife.id, DigitalLife.visitor_sketch)
+                    .order_by(DigitalLife.id)
+                    .limit(1)
+                    .with_for_update()
+                )
+                row = result.first()
+                if row is None:
+                    return
+                life_id, stored = row
+                if stored:
+                    stored_sketch = HyperLogLog.from_bytes(stored)
+                    if stored_sketch.precision != self.sketch.precision:
+                        # 调整过 VISITOR_HLL_PRECISION：统一折叠到较低的精度再合并，
+                        # 否则每个周期都会合并失败
+                        precision = min(stored_sketch.precision, self.sketch.precision)
+                        logger.warning(
+                            f"库中访客草图精度 {stored_sketch.precision} 与配置 "
+                            f"{self.sketch.precision} 不一致，折叠为 {precision}"
+                        )
+                        self.sketch = self.sketch.fold(precision)
+                        stored_sketch = stored_sketch.fold(precision)
+                    self.sketch.merge(stored_sketch)
+
+                await session.exec(
+                    update(DigitalLife)
+                    .where(DigitalLife.id == life_id)  # type: ignore
+                    .values(
+                        visitor_sketch=self.sketch.to_bytes(),
+                        visitors=self.sketch.estimate(),
+                    )
+                )
+                await publish_invalidation(session, life_status_cache.name)
+                await session.commit()
+        except Exception:
+            logger.exception("访客草图写回失败，将在下一个周期重试")
+            self._dirty = True
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+visitor_counter = VisitorCounter(
+    precision=settings.VISITOR_HLL_PRECISION,
+    interval=settings.VISITOR_FLUSH_INTERVAL,
+)
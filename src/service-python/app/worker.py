@@ -0,0 +1,217 @@
+"""
+后台运行工作进程：从 agent_runs 队列认领任务并执行智能体流程。
+
+用法（在 src/service-python 目录下）：
+
+    python -m app.worker --workers 4 --concurrency 2
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import traceback
+from typing import Callable, List, Optional
+
+from app.agent.graph import run_agent
+from app.agent.tools import workspace_dir
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import start_metrics_server
+from app.services.run_queue import (
+    claim_next_run,
+    finish_run,
+    heartbeat,
+    requeue_stale_runs,
+)
+from app.services.thought_sink import current_cycle_id, thought_sink
+
+logger = logging.getLogger(__name__)
+
+
+async def execute_run(run_id: int, user_message: str) -> dict:
+    """
+    在该运行独立的工作目录中执行智能体，create_file / shell_exec 都只作用于这个目录。
+    """
+    workspace = os.path.abspath(
+        os.path.join(settings.RUN_WORKSPACE_ROOT, f"run-{run_id}")
+    )
+    os.makedirs(workspace, exist_ok=True)
+    workspace_dir.set(workspace)
+    # 本次运行产生的思考记录以 run_id 作为 cycle_id
+    current_cycle_id.set(run_id)
+    return await run_agent(
+        user_message,
+        config={
+            "recursion_limit": settings.RUN_RECURSION_LIMIT,
+            "metadata": {"run_id": run_id},
+        },
+    )
+
+
+async def supervise_run(run_id: int, attempt: int, worker: str, user_message: str) -> None:
+    """
+    执行一个运行并定期发送心跳；发现 cancel_requested 时中断执行。
+    心跳发现运行已不属于本次认领（被回收后由其它工作进程认领，或已结束）时同样中断，
+    且不写入结果，避免两个工作进程同时执行同一个运行、互相覆盖结果。
+    """
+    # 以独立任务运行，contextvar 中的工作目录只对这个运行可见
+    task = asyncio.create_task(execute_run(run_id, user_message))
+    cancelled = False
+    lost = False
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=settings.RUN_HEARTBEAT_INTERVAL)
+        if done:
+            break
+        try:
+            async with AsyncSessionLocal() as session:
+                cancel_requested = await heartbeat(session, run_id, worker, attempt)
+        except Exception:
+            logger.exception(f"运行 {run_id} 心跳失败")
+            continue
+        if cancel_requested is None and not lost:
+            logger.warning(f"运行 {run_id} 已不属于 {worker}（第 {attempt} 次认领），停止执行")
+            lost = True
+            task.cancel()
+        elif cancel_requested and not cancelled:
+            logger.info(f"运行 {run_id} 已被请求取消")
+            cancelled = True
+            task.cancel()
+
+    if lost:
+        return
+    async with AsyncSessionLocal() as session:
+        if task.cancelled():
+            written = await finish_run(session, run_id, worker, attempt, "cancelled")
+        elif task.exception() is not None:
+            error = "".join(traceback.format_exception(task.exception()))
+            logger.error(f"运行 {run_id} 失败: {task.exception()!r}")
+            written = await finish_run(
+                session, run_id, worker, attempt, "failed", error=error
+            )
+        else:
+            report = task.result().get("final_report", "")
+            written = await finish_run(
+                session, run_id, worker, attempt, "succeeded", final_report=str(report)
+            )
+    if not written:
+        logger.warning(f"运行 {run_id} 已不属于 {worker}（第 {attempt} 次认领），结果未写入")
+
+
+async def worker_slot(worker: str, stop: asyncio.Event) -> None:
+    """
+    一个执行槽：循环认领并执行运行，队列为空时按轮询间隔等待。
+    """
+    while not stop.is_set():
+        try:
+            async with AsyncSessionLocal() as session:
+                claimed = await claim_next_run(session, worker)
+        except Exception:
+            logger.exception("认领运行失败")
+            claimed = None
+
+        if claimed is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.RUN_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        run_id, attempt, user_message = claimed
+        logger.info(f"{worker} 认领运行 {run_id}（第 {attempt} 次）")
+        await supervise_run(run_id, attempt, worker, user_message)
+
+
+async def reaper(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            async with AsyncSessionLocal() as session:
+                requeued, failed = await requeue_stale_runs(session)
+            if requeued:
+                logger.warning(f"{requeued} 个心跳超时的运行已重新排队")
+            if failed:
+                logger.error(f"{failed} 个心跳超时的运行已达到最大尝试次数，标记为失败")
+        except Exception:
+            logger.exception("回收超时运行失败")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.RUN_STALE_AFTER / 2)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def worker_main(index: int, concurrency: int) -> None:
+    worker = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    stop = asyncio.Event()
+    metrics_server = None
+    if settings.WORKER_METRICS_PORT > 0:
+        # 每个工作进程一个端口：WORKER_METRICS_PORT + index
+        metrics_server = await start_metrics_server(
+            settings.METRICS_HOST, settings.WORKER_METRICS_PORT + index
+        )
+    thought_sink.start()
+    tasks = [asyncio.create_task(worker_slot(worker, stop)) for _ in range(concurrency)]
+    tasks.append(asyncio.create_task(reaper(stop)))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        stop.set()
+        if metrics_server is not None:
+            metrics_server.close()
+        await thought_sink.stop()
+        await engine.dispose()
+
+
+def _worker_process(
+    index: int, concurrency: int, setup: Optional[Callable[[], None]]
+) -> None:
+    logging.basicConfig(level=logging.INFO)
+    if setup is not None:
+        setup()
+    try:
+        asyncio.run(worker_main(index, concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+def start_workers(
+    workers: int, concurrency: int, setup: Optional[Callable[[], None]] = None
+) -> List[multiprocessing.process.BaseProcess]:
+    """
+    启动 workers 个工作进程，每个进程同时执行 concurrency 个运行。
+    setup 会在每个子进程启动时调用（需可被 pickle），例如用于替换模型。
+    """
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(target=_worker_process, args=(i, concurrency, setup))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def run_workers(workers: int, concurrency: int) -> None:
+    processes = start_workers(workers, concurrency)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="启动后台运行工作进程")
+    parser.add_argument("--workers", type=int, default=settings.RUN_WORKERS)
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.RUN_CONCURRENCY_PER_WORKER
+    )
+    args = parser.parse_args()
+    run_workers(args.workers, args.concurrency)
@@ -0,0 +1,73 @@
+"""
+智能体并发压测：用假模型替换 nodes.llm，在同一个事件循环里同时运行多个智能体流程，
+并在此期间持续请求 HTTP 接口，统计运行吞吐和接口 p99 延迟。
+
+接口请求走 /openapi.json，不依赖数据库，只反映事件循环是否被阻塞。
+
+用法（在 src/service-python 目录下）：
+
+    python -m bench.bench_agent_concurrency --runs 50 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.agent import nodes
+from app.agent.graph import run_agent
+from app.main import app
+from bench.fake_llm import FakeChatModel
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=50, help="同时运行的智能体数")
+    parser.add_argument("--steps", type=int, default=5, help="每个计划的步骤数")
+    parser.add_argument("--latency", type=float, default=0.2, help="每次模型调用延迟（秒）")
+    args = parser.parse_args()
+
+    nodes.llm = FakeChatModel(latency=args.latency, plan_steps=args.steps)
+
+    latencies: list = []
+    done = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+
+    async def poll_api(client: httpx.AsyncClient) -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            (await client.get("/openapi.json")).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        poller = asyncio.create_task(poll_api(c))
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(run_agent(f"bench run {i}") for i in range(args.runs))
+        )
+        elapsed = time.perf_counter() - start
+        done.set()
+        await poller
+
+    # 规划 + 每步一次执行 + 报告
+    serial = args.latency * (args.steps + 2) * args.runs
+    print(f"runs={args.runs} steps={args.steps} llm_latency={args.latency}s")
+    print(f"wall={elapsed:.2f}s serial_estimate={serial:.2f}s runs/sec={args.runs / elapsed:.2f}")
+    print(
+        f"api requests={len(latencies)} "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,311 @@
+"""
+智能体图开销压测：用脚本化的假模型替换 nodes.llm，离线端到端运行 graph.py 编译的 agent，
+计划长度从 3 步增长到 200 步，统计：
+
+- 每个节点的墙钟时间（其中模型调用耗时单独列出）
+- 框架开销：节点之外的时间，以及其中的状态合并（reducer：messages 列表拼接、plan 合并，
+  plan 合并中单独列出 Plan.apply 原地应用 StepPatch 的耗时）、构造节点输入的 State（pydantic 校验）
+- 每步的非模型耗时（总耗时减去模型与工具耗时，再除以步骤数），计划越长越应保持平稳
+- 单次运行的 Python 堆峰值（tracemalloc）与进程 RSS 峰值
+- 并发运行时的 runs/sec
+
+用法（在 src/service-python 目录下，不需要数据库和网络）：
+
+    python -m bench.bench_agent_graph --steps 3 10 50 100 200
+    python -m bench.bench_agent_graph --steps 200 --latency 0.01 --tool-rounds 2 --json graph.json
+
+默认模型延迟为 0，测得的时间几乎全部是框架与节点自身的开销。
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from bench.fake_llm import FakeChatModel
+
+# 叶子节点：其余时间都算作框架开销（step_runner 只是调用子图）
+LEAF_NODES = ("planner", "join", "reporter", "agent", "tool_executor", "marker")
+
+
+class Probe:
+    """累计各探针的耗时（秒）与调用次数。"""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+
+    def add(self, name: str, elapsed: float) -> None:
+        self.seconds[name] += elapsed
+        self.calls[name] += 1
+
+    def reset(self) -> None:
+        self.seconds.clear()
+        self.calls.clear()
+
+
+probe = Probe()
+
+
+def install_probes() -> None:
+    """
+    给 LangGraph 的状态合并、State 构造与 Plan.apply 加计时。必须在导入 app.agent.graph（编译图）之前调用：
+    节点输入的构造函数在编译时就已绑定。
+    """
+    import langgraph.graph.state as graph_state
+    from langgraph.channels.binop import BinaryOperatorAggregate
+
+    from app.agent.state import Plan
+
+    coerce_state = graph_state._coerce_state
+
+    def timed_coerce_state(schema: Any, input: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return coerce_state(schema, input)
+        finally:
+            probe.add("state_coerce", time.perf_counter() - start)
+
+    graph_state._coerce_state = timed_coerce_state
+
+    update = BinaryOperatorAggregate.update
+
+    def timed_update(self: BinaryOperatorAggregate, values: Any) -> bool:
+        start = time.perf_counter()
+        try:
+            return update(self, values)
+        finally:
+            probe.add(f"reduce:{self.key}", time.perf_counter() - start)
+
+    BinaryOperatorAggregate.update = timed_update  # type: ignore
+
+    # merge_plan 在编译时经 Annotated 绑定到通道，其耗时已计入 reduce:plan；
+    # Plan.apply 在调用时才查找，可以单独计时
+    apply = Plan.apply
+
+    def timed_apply(self: Plan, patch: Any) -> None:
+        start = time.perf_counter()
+        try:
+            apply(self, patch)
+        finally:
+            probe.add("plan_apply", time.perf_counter() - start)
+
+    Plan.apply = timed_apply  # type: ignore
+
+
+class NodeTimer(BaseCallbackHandler):
+    """
+    按 langgraph_node 记录节点与模型调用的墙钟时间。只在剖析运行中挂载，
+    回调本身的开销不计入吞吐测试。
+    """
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._started: Dict[UUID, Tuple[float, str]] = {}
+
+    def on_chain_start(
+        self, serialized, inputs, *, run_id: UUID, metadata=None, **kwargs: Any
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._started[run_id] = (time.perf_counter(), f"node:{node}")
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs: Any
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node") or "none"
+        self._started[run_id] = (time.perf_counter(), f"llm:{node}")
+
+    def _end(self, run_id: UUID) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            probe.add(started[1], time.perf_counter() - started[0])
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+
+def make_model(args: argparse.Namespace, steps: int) -> FakeChatModel:
+    return FakeChatModel(
+        latency=args.latency,
+        plan_steps=steps,
+        independent=args.independent,
+        tool_rounds=args.tool_rounds,
+        completion_tokens=args.completion_tokens,
+        token_latency=args.token_latency,
+    )
+
+
+async def run_once(callbacks: Optional[list] = None) -> float:
+    from app.agent.graph import run_agent
+
+    config: Dict[str, Any] = {"recursion_limit": 100_000}
+    if callbacks:
+        config["callbacks"] = callbacks
+    start = time.perf_counter()
+    await run_agent("bench agent graph", config=config)
+    return time.perf_counter() - start
+
+
+def profile_summary(wall: float, steps: int) -> Dict[str, Any]:
+    seconds, calls = probe.seconds, probe.calls
+    llm = sum(v for k, v in seconds.items() if k.startswith("llm:"))
+    leaf = sum(seconds.get(f"node:{n}", 0.0) for n in LEAF_NODES)
+    tools = seconds.get("node:tool_executor", 0.0)
+    nodes = {
+        name[len("node:") :]: {
+            "calls": calls[name],
+            "total_ms": round(value * 1000, 3),
+            "per_call_ms": round(value * 1000 / calls[name], 4),
+            "llm_ms": round(seconds.get("llm:" + name[len("node:") :], 0.0) * 1000, 3),
+        }
+        for name, value in sorted(seconds.items())
+        if name.startswith("node:")
+    }
+    overhead = {
+        name: {"calls": calls[name], "total_ms": round(value * 1000, 3)}
+        for name, value in sorted(seconds.items())
+        if name in ("state_coerce", "plan_apply") or name.startswith("reduce:")
+    }
+    return {
+        "wall_ms": round(wall * 1000, 3),
+        "llm_ms": round(llm * 1000, 3),
+        "framework_ms": round((wall - leaf) * 1000, 3),
+        "non_llm_ms_per_step": round((wall - llm - tools) * 1000 / steps, 4),
+        "nodes": nodes,
+        "overhead": overhead,
+    }
+
+
+async def measure(args: argparse.Namespace, steps: int) -> Dict[str, Any]:
+    from app.agent import nodes
+
+    nodes.llm = make_model(args, steps)
+
+    # 预热：首次运行包含导入与编译缓存的开销
+    await run_once()
+
+    # 剖析：节点耗时与框架开销
+    probe.reset()
+    wall = await run_once(callbacks=[NodeTimer()])
+    result = {"steps": steps, "profile": profile_summary(wall, steps)}
+
+    # 内存：单次运行的 Python 堆峰值
+    tracemalloc.start()
+    try:
+        await run_once()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result["peak_heap_mb"] = round(peak / 1024 / 1024, 2)
+
+    # 吞吐：concurrency 个运行同时进行
+    start = time.perf_counter()
+    remaining = args.runs
+
+    async def runner() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await run_once()
+
+    await asyncio.gather(*(runner() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    result["runs"] = args.runs
+    result["runs_per_sec"] = round(args.runs / elapsed, 3)
+    # Linux 上 ru_maxrss 单位为 KB；进程级峰值，随计划长度递增测量
+    result["max_rss_mb"] = round(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+    )
+    return result
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'steps':>6} {'wall ms':>10} {'framework':>10} {'non-llm/step':>13} "
+        f"{'coerce':>9} {'msg concat':>11} {'plan merge':>11} {'plan apply':>11} "
+        f"{'heap MB':>8} {'rss MB':>7} {'runs/s':>8}"
+    )
+    for r in results:
+        p = r["profile"]
+        o = p["overhead"]
+
+        def ms(name: str) -> float:
+            return o.get(name, {}).get("total_ms", 0.0)
+
+        print(
+            f"{r['steps']:>6} {p['wall_ms']:>10.1f} {p['framework_ms']:>10.1f} "
+            f"{p['non_llm_ms_per_step']:>13.3f} {ms('state_coerce'):>9.1f} "
+            f"{ms('reduce:messages'):>11.1f} {ms('reduce:plan'):>11.1f} "
+            f"{ms('plan_apply'):>11.1f} {r['peak_heap_mb']:>8.1f} "
+            f"{r['max_rss_mb']:>7.1f} {r['runs_per_sec']:>8.2f}"
+        )
+    print()
+    last = results[-1]
+    print(f"per-node breakdown at {last['steps']} steps:")
+    for name, n in last["profile"]["nodes"].items():
+        print(
+            f"  {name:<14} calls={n['calls']:<6} total={n['total_ms']:>10.1f}ms "
+            f"per_call={n['per_call_ms']:>8.3f}ms llm={n['llm_ms']:>9.1f}ms"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--steps", type=int, nargs="+", default=[3, 10, 50, 100, 200])
+    parser.add_argument("--runs", type=int, default=5, help="每种计划长度的吞吐测试运行数")
+    parser.add_argument("--concurrency", type=int, default=5, help="同时进行的运行数")
+    parser.add_argument("--latency", type=float, default=0.0, help="每次模型调用的固定延迟（秒）")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="每个输出 token 的延迟（秒）")
+    parser.add_argument("--completion-tokens", type=int, default=50)
+    parser.add_argument("--tool-rounds", type=int, default=1, help="每个步骤的工具调用轮数")
+    parser.add_argument("--independent", action="store_true", help="步骤互不依赖，可并行执行")
+    parser.add_argument("--json", default=None, help="结果 JSON 路径")
+    args = parser.parse_args()
+
+    install_probes()
+    from app.agent.tools import workspace_dir
+    from app.core.config import settings
+
+    # 离线运行：只使用内置工具，不从数据库加载动态工具
+    settings.TOOL_REGISTRY_ENABLED = False
+
+    results = []
+    with tempfile.TemporaryDirectory() as workspace:
+        # create_file 写入临时目录
+        workspace_dir.set(workspace)
+        for steps in args.steps:
+            results.append(await measure(args, steps))
+            print(
+                f"steps={steps} done: {results[-1]['runs_per_sec']} runs/s", flush=True
+            )
+
+    print()
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,185 @@
+"""
+大块工具输出压测：脚本化假模型让每个步骤调用一个返回数 MB 文本的工具，
+对比工具结果直接放进消息（inline）与存入 blob 存储、消息只保留预览（blob）两种方式：
+
+- 每次模型调用的提示词字节数（平均与最大），以及整个运行累计发送的提示词字节数
+- 最终状态中消息内容的总字节数
+- 单次运行的 Python 堆峰值（tracemalloc）
+- 单次运行的墙钟时间，以及 blob 目录占用的磁盘空间
+
+用法（在 src/service-python 目录下，不需要数据库和网络）：
+
+    python -m bench.bench_blob_store
+    python -m bench.bench_blob_store --output-mb 5 --steps 5 --tool-rounds 2 --json blob.json
+
+inline 模式通过把 BLOB_INLINE_MAX_BYTES 调到极大来模拟改动前的行为。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tools import tool
+
+from bench.fake_llm import FakeChatModel
+
+
+class PromptMeter(BaseCallbackHandler):
+    """记录每次模型调用的提示词字节数。"""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self.sizes: List[int] = []
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        self.sizes.append(
+            sum(len(str(m.content).encode("utf-8")) for batch in messages for m in batch)
+        )
+
+
+def make_dump_tool(size: int):
+    # 近似日志、查询结果一类的可压缩文本
+    line = "2024-01-01T00:00:00Z INFO worker processed record id={:08d} status=ok\n"
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        text = line.format(i)
+        lines.append(text)
+        total += len(text)
+        i += 1
+    payload = "".join(lines)[:size]
+
+    @tool
+    def dump_output() -> str:
+        """返回一段很长的文本输出。"""
+        return payload
+
+    return dump_output
+
+
+def dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+
+async def run_once(tool_set: Any, callbacks: list) -> Dict[str, Any]:
+    from app.agent.graph import run_agent
+
+    start = time.perf_counter()
+    state = await run_agent(
+        "bench blob store",
+        config={
+            "recursion_limit": 100_000,
+            "callbacks": callbacks,
+            "configurable": {"tool_set": tool_set},
+        },
+    )
+    wall = time.perf_counter() - start
+    messages = state.get("messages", [])
+    return {
+        "wall_ms": round(wall * 1000, 2),
+        "state_message_bytes": sum(len(str(m.content).encode("utf-8")) for m in messages),
+    }
+
+
+async def measure(
+    mode: str, args: argparse.Namespace, tool_set: Any, blob_root: str
+) -> Dict[str, Any]:
+    from app.core.config import settings
+
+    settings.BLOB_INLINE_MAX_BYTES = 1 << 62 if mode == "inline" else args.inline_max
+
+    # 预热
+    await run_once(tool_set, [])
+
+    meter = PromptMeter()
+    tracemalloc.start()
+    try:
+        result = await run_once(tool_set, [meter])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    sizes = meter.sizes or [0]
+    result.update(
+        mode=mode,
+        llm_calls=len(meter.sizes),
+        prompt_kb_mean=round(sum(sizes) / len(sizes) / 1024, 1),
+        prompt_kb_max=round(max(sizes) / 1024, 1),
+        prompt_mb_total=round(sum(sizes) / 1024 / 1024, 2),
+        peak_heap_mb=round(peak / 1024 / 1024, 2),
+        blob_disk_kb=round(dir_size(blob_root) / 1024, 1),
+    )
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--output-mb", type=float, default=5.0, help="工具每次返回的大小（MB）")
+    parser.add_argument("--steps", type=int, default=3, help="计划步骤数")
+    parser.add_argument("--tool-rounds", type=int, default=1, help="每个步骤的工具调用轮数")
+    parser.add_argument(
+        "--inline-max", type=int, default=None, help="blob 模式的阈值，默认沿用配置"
+    )
+    parser.add_argument("--json", default=None, help="结果 JSON 路径")
+    args = parser.parse_args()
+
+    from app.agent import nodes
+    from app.agent.blob_store import blob_store
+    from app.agent.tool_registry import ToolSet
+    from app.agent.tools import all_tools
+    from app.core.config import settings
+
+    # 离线运行：不从数据库加载动态工具，工具集通过运行配置传入
+    settings.TOOL_REGISTRY_ENABLED = False
+    if args.inline_max is None:
+        args.inline_max = settings.BLOB_INLINE_MAX_BYTES
+
+    dump = make_dump_tool(int(args.output_mb * 1024 * 1024))
+    tool_set = ToolSet([*all_tools, dump])
+    nodes.llm = FakeChatModel(
+        plan_steps=args.steps,
+        tool_rounds=args.tool_rounds,
+        tool_name=dump.name,
+        tool_args={},
+    )
+
+    results = []
+    with tempfile.TemporaryDirectory() as blob_root:
+        blob_store.root = blob_root
+        for mode in ("inline", "blob"):
+            results.append(await measure(mode, args, tool_set, blob_root))
+            print(f"{mode} done", flush=True)
+
+    print()
+    print(
+        f"{'mode':<7} {'llm calls':>9} {'prompt KB mean':>15} {'prompt KB max':>14} "
+        f"{'prompt MB total':>16} {'state MB':>9} {'heap MB':>8} {'wall ms':>9} {'disk KB':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['mode']:<7} {r['llm_calls']:>9} {r['prompt_kb_mean']:>15.1f} "
+            f"{r['prompt_kb_max']:>14.1f} {r['prompt_mb_total']:>16.2f} "
+            f"{r['state_message_bytes'] / 1024 / 1024:>9.2f} {r['peak_heap_mb']:>8.1f} "
+            f"{r['wall_ms']:>9.1f} {r['blob_disk_kb']:>8.1f}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
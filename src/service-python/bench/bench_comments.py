@@ -0,0 +1,121 @@
+"""
+评论写入压测：并发调用单条评论接口和批量评论接口，统计 comments/sec，
+并在结束后核对 creations.comments 与实际评论数是否一致。
+
+用法（在 src/service-python 目录下，需要可用的 DATABASE_URL 且已执行 schema.sql）：
+
+    python -m bench.bench_comments --clients 200 --requests 5000 --bulk-size 200
+
+脚本会插入一个 type='bench' 的作品，结束后删除（评论随外键级联删除）。
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import func
+from sqlmodel import delete, select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.main import app
+from app.models import Comment, Creation
+
+
+def report(name: str, total: int, elapsed: float) -> None:
+    print(
+        f"{name:<8} comments={total:<7} elapsed={elapsed:.2f}s "
+        f"comments/sec={total / elapsed:,.0f}"
+    )
+
+
+async def create_creation() -> int:
+    async with AsyncSessionLocal() as session:
+        creation = Creation(type="bench", title="bench comments")
+        session.add(creation)
+        await session.commit()
+        await session.refresh(creation)
+        return creation.id  # type: ignore
+
+
+async def verify(creation_id: int) -> None:
+    async with AsyncSessionLocal() as session:
+        counter = (
+            await session.exec(
+                select(Creation.comments).where(Creation.id == creation_id)
+            )
+        ).one()
+        actual = (
+            await session.exec(
+                select(func.count()).where(Comment.creation_id == creation_id)
+            )
+        ).one()
+    status = "OK" if counter == actual else "MISMATCH"
+    print(f"creations.comments={counter} count(comments)={actual} {status}")
+
+
+async def run_single(
+    c: httpx.AsyncClient, creation_id: int, clients: int, requests: int
+) -> None:
+    per_client = max(1, requests // clients)
+
+    async def client(index: int) -> None:
+        for i in range(per_client):
+            resp = await c.post(
+                f"/api/creations/{creation_id}/comments",
+                json={"content": f"comment {index}-{i}"},
+            )
+            resp.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    total = per_client * clients
+    report("single", total, elapsed)
+
+
+async def run_bulk(
+    c: httpx.AsyncClient, creation_id: int, clients: int, requests: int, bulk_size: int
+) -> None:
+    batches = max(1, requests // bulk_size)
+
+    async def client(index: int) -> None:
+        for b in range(index, batches, clients):
+            comments = [
+                {"content": f"bulk {b}-{i}", "creation_id": creation_id}
+                for i in range(bulk_size)
+            ]
+            resp = await c.post("/api/comments/bulk", json={"comments": comments})
+            resp.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(min(clients, batches))))
+    elapsed = time.perf_counter() - start
+    total = batches * bulk_size
+    report("bulk", total, elapsed)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--bulk-size", type=int, default=200)
+    args = parser.parse_args()
+
+    engine.echo = False
+    creation_id = await create_creation()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            await run_single(c, creation_id, args.clients, args.requests)
+            await run_bulk(c, creation_id, args.clients, args.requests, args.bulk_size)
+        await verify(creation_id)
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.exec(delete(Creation).where(Creation.id == creation_id))  # type: ignore
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+条件请求压测：模拟空闲的轮询客户端反复请求首页用到的接口，对比
+不带 If-None-Match 与带 If-None-Match（ETag / 304）时传输的字节数和执行的 SQL 语句数。
+
+用法（在 src/service-python 目录下，需要可用的 DATABASE_URL 且已执行 schema.sql）：
+
+    python -m bench.bench_conditional --polls 200
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import event
+
+from app.core.database import engine
+from app.main import app
+
+URLS = [
+    "/api/life/status",
+    "/api/thoughts?page_size=20",
+    "/api/creations/?page_size=20",
+    "/api/life/comments?page_size=20",
+]
+
+statements = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    global statements
+    statements += 1
+
+
+async def poll(name: str, conditional: bool, polls: int) -> None:
+    global statements
+    transport = httpx.ASGITransport(app=app)
+    etags: dict = {}
+    body_bytes = 0
+    not_modified = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        statements = 0
+        start = time.perf_counter()
+        for _ in range(polls):
+            for url in URLS:
+                headers = {}
+                if conditional and url in etags:
+                    headers["If-None-Match"] = etags[url]
+                resp = await c.get(url, headers=headers)
+                if resp.status_code == 304:
+                    not_modified += 1
+                else:
+                    resp.raise_for_status()
+                    etags[url] = resp.headers.get("etag")
+                body_bytes += len(resp.content)
+        elapsed = time.perf_counter() - start
+
+    requests = polls * len(URLS)
+    print(
+        f"{name:<12} requests={requests} 304={not_modified} "
+        f"bytes={body_bytes:,} sql_statements={statements} "
+        f"elapsed={elapsed:.2f}s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--polls", type=int, default=200, help="每个接口的轮询次数")
+    args = parser.parse_args()
+
+    engine.echo = False
+    await poll("plain", False, args.polls)
+    await poll("conditional", True, args.polls)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
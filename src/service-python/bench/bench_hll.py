@@ -0,0 +1,82 @@
+"""
+HyperLogLog 访客计数的误差与开销测试：对不同的真实基数多次取样，统计相对误差的
+均值、标准差和最大值，并检查合并多个草图的结果与对并集直接计数一致。
+
+用法（在 src/service-python 目录下，不需要数据库）：
+
+    python -m bench.bench_hll --precision 12 --trials 50
+
+precision=12（默认配置，寄存器 4 KB）时的参考结果：各基数下相对误差标准差约
+1.2%~2.3%，接近理论值 1.04/sqrt(4096)=1.6%；在线性计数切换点（约 2.5 * 4096 ≈ 10000）
+附近有约 +2% 的偏差。
+"""
+
+import argparse
+import statistics
+import time
+
+from app.services.hyperloglog import HyperLogLog
+
+CARDINALITIES = [100, 1_000, 5_000, 10_000, 50_000, 200_000]
+
+
+def relative_errors(precision: int, n: int, trials: int) -> list:
+    errors = []
+    for trial in range(trials):
+        sketch = HyperLogLog(precision)
+        for i in range(n):
+            sketch.add(f"10.0.{trial}.{i}|Mozilla/5.0")
+        errors.append((sketch.estimate() - n) / n)
+    return errors
+
+
+def check_merge(precision: int, workers: int, n: int) -> None:
+    # 每个工作进程看到一部分重叠的访客，合并后应与单个草图看到全部访客时完全一致
+    merged = HyperLogLog(precision)
+    combined = HyperLogLog(precision)
+    for w in range(workers):
+        sketch = HyperLogLog(precision)
+        for i in range(w * n // 2, w * n // 2 + n):
+            sketch.add(f"visitor-{i}")
+            combined.add(f"visitor-{i}")
+        merged.merge(sketch)
+    same = (merged.registers == combined.registers).all()
+    true_count = (workers - 1) * n // 2 + n
+    print(
+        f"merge workers={workers} true={true_count} "
+        f"estimate={merged.estimate()} identical_to_union={bool(same)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--precision", type=int, default=12)
+    parser.add_argument("--trials", type=int, default=50)
+    args = parser.parse_args()
+
+    sketch = HyperLogLog(args.precision)
+    theory = 1.04 / (sketch.m**0.5)
+    print(
+        f"precision={args.precision} memory={sketch.registers.nbytes} bytes "
+        f"theoretical_std={theory:.2%}"
+    )
+    for n in CARDINALITIES:
+        errors = relative_errors(args.precision, n, args.trials)
+        print(
+            f"n={n:<8} mean={statistics.mean(errors):+.2%} "
+            f"std={statistics.pstdev(errors):.2%} "
+            f"max={max(abs(e) for e in errors):.2%}"
+        )
+
+    check_merge(args.precision, workers=4, n=20_000)
+
+    start = time.perf_counter()
+    count = 200_000
+    for i in range(count):
+        sketch.add(f"192.168.0.{i}|Mozilla/5.0")
+    elapsed = time.perf_counter() - start
+    print(f"add: {elapsed / count * 1e9:.0f} ns/op")
+
+
+if __name__ == "__main__":
+    main()
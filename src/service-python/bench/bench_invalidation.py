@@ -0,0 +1,120 @@
+"""
+跨进程缓存失效测试：启动多个子进程，各自持有 LISTEN 连接和一个快照缓存，
+主进程通过 publish_invalidation 发布失效通知，统计通知从提交到各进程失效缓存的延迟。
+
+用法（在 src/service-python 目录下，需要可用的 DATABASE_URL，本地 Postgres 即可）：
+
+    python -m bench.bench_invalidation --workers 4 --messages 200
+
+测试期间可以重启 Postgres 观察重连：重连后每个进程都会整体清空一次缓存。
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import time
+
+from app.core.database import AsyncSessionLocal, engine
+
+CACHE_NAME = "bench_invalidation"
+
+
+def _child(ready, events, duration: float) -> None:
+    from app.services.invalidation import invalidation_listener
+    from app.services.snapshot_cache import SnapshotCache
+
+    async def loader() -> float:
+        return time.time()
+
+    cache = SnapshotCache(CACHE_NAME, loader, ttl=3600)
+    original = cache.invalidate
+
+    def invalidate() -> None:
+        events.put(time.time())
+        original()
+
+    cache.invalidate = invalidate  # type: ignore
+
+    async def main() -> None:
+        invalidation_listener.start()
+        while not invalidation_listener.connected:
+            await asyncio.sleep(0.05)
+        ready.put(True)
+        await asyncio.sleep(duration)
+        await invalidation_listener.stop()
+
+    asyncio.run(main())
+
+
+async def publish(messages: int, interval: float) -> list:
+    from app.services.invalidation import publish_invalidation
+
+    sent = []
+    for _ in range(messages):
+        async with AsyncSessionLocal() as session:
+            await publish_invalidation(session, CACHE_NAME)
+            # 通知在提交时发出，以提交前的时间作为起点
+            sent.append(time.time())
+            await session.commit()
+        await asyncio.sleep(interval)
+    await engine.dispose()
+    return sent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.01)
+    args = parser.parse_args()
+
+    engine.echo = False
+    ctx = multiprocessing.get_context("spawn")
+    ready, events = ctx.Queue(), ctx.Queue()
+    duration = args.messages * args.interval + 10
+    processes = [
+        ctx.Process(target=_child, args=(ready, events, duration))
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+
+    # 每个子进程连上时会清空一次缓存，先把这些事件取走
+    time.sleep(0.5)
+    while not events.empty():
+        events.get()
+
+    sent = asyncio.run(publish(args.messages, args.interval))
+    received = []
+    deadline = time.time() + 5
+    while len(received) < len(sent) * args.workers and time.time() < deadline:
+        try:
+            received.append(events.get(timeout=0.5))
+        except Exception:
+            break
+
+    for process in processes:
+        process.terminate()
+        process.join()
+
+    # 把每次失效匹配到它之前最近发出的一条通知
+    latencies = []
+    for at in received:
+        previous = [s for s in sent if s <= at]
+        if previous:
+            latencies.append(max(0.0, at - previous[-1]))
+    expected = len(sent) * args.workers
+    print(f"workers={args.workers} notifications={len(sent)}")
+    print(f"delivered={len(received)}/{expected}")
+    if latencies:
+        print(
+            f"latency p50={statistics.median(latencies) * 1000:.2f}ms "
+            f"max={max(latencies) * 1000:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+列表接口序列化压测：对比 FastAPI 默认流程（response_model 二次校验 + json）
+与快速响应路径（只校验一次 + orjson）在 /api/thoughts?page_size=100 上的 req/s。
+
+用法（在 src/service-python 目录下）：
+
+    # 使用 DATABASE_URL 中的真实数据（thoughts 表至少需要 101 条记录）
+    python -m bench.bench_json_response --requests 2000
+
+    # 不连接数据库：查询返回内存中预先构造的 101 行，只衡量校验与序列化的开销
+    python -m bench.bench_json_response --requests 2000 --canned-rows
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+from typing import Any, List
+
+import httpx
+from sqlmodel import Session, create_engine, select
+
+from app.api.projection import schema_columns
+from app.core.config import settings
+from app.core.database import engine, get_session
+from app.main import app
+from app.models import Thought
+from app.schemas.thought import ThoughtRead
+
+URL = "/api/thoughts?page_size=100"
+
+
+def build_canned_rows(count: int) -> List[Any]:
+    """
+    借助内存 SQLite 生成与线上查询结构相同的 Row 对象。
+    """
+    sqlite = create_engine("sqlite://")
+    Thought.__table__.create(sqlite)  # type: ignore
+    now = datetime.datetime.now()
+    with Session(sqlite) as session:
+        for i in range(count):
+            session.add(
+                Thought(
+                    cycle_id=i // 10,
+                    agent_name="agent",
+                    content=f"第 {i} 条思考：" + "分析当前步骤并决定下一步行动。" * 8,
+                    created_at=now - datetime.timedelta(seconds=i),
+                )
+            )
+        session.commit()
+        return list(session.exec(select(*schema_columns(Thought, ThoughtRead))).all())
+
+
+class _CannedResult:
+    def __init__(self, rows: List[Any]):
+        self._rows = rows
+
+    def all(self) -> List[Any]:
+        return self._rows
+
+
+class _CannedSession:
+    def __init__(self, rows: List[Any]):
+        self._rows = rows
+
+    async def exec(self, statement: Any) -> _CannedResult:
+        return _CannedResult(self._rows)
+
+
+async def run_case(name: str, fast: bool, requests: int, clients: int) -> None:
+    settings.FAST_JSON_RESPONSE = fast
+    transport = httpx.ASGITransport(app=app)
+    per_client = max(1, requests // clients)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        (await c.get(URL)).raise_for_status()  # 预热
+
+        async def client() -> None:
+            for _ in range(per_client):
+                (await c.get(URL)).raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    total = per_client * clients
+    print(
+        f"{name:<10} requests={total:<6} elapsed={elapsed:.2f}s "
+        f"req/sec={total / elapsed:,.0f} ms/request={elapsed / total * 1000:.2f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--canned-rows", action="store_true", help="不连接数据库")
+    args = parser.parse_args()
+
+    engine.echo = False
+    if args.canned_rows:
+        session = _CannedSession(build_canned_rows(101))
+        app.dependency_overrides[get_session] = lambda: session
+
+    try:
+        await run_case("default", False, args.requests, args.clients)
+        await run_case("fast", True, args.requests, args.clients)
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
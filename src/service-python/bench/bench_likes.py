@@ -0,0 +1,79 @@
+"""
+点赞接口压测：对比「单条原子 UPDATE」与「进程内聚合批量写回」两种模式的 likes/sec。
+
+用法（在 src/service-python 目录下，需要可用的 DATABASE_URL 且 creations 表中已有数据）：
+
+    python -m bench.bench_likes --clients 1000 --requests 20000 --creations 1
+    python -m bench.bench_likes --clients 1000 --requests 20000 --creations 100
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from sqlmodel import select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.main import app
+from app.models import Creation
+from app.services.like_counter import like_aggregator
+
+
+async def load_creation_ids(limit: int) -> list:
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(
+            select(Creation.id).order_by(Creation.id).limit(limit)
+        )
+        return list(result.all())
+
+
+async def run_case(
+    name: str, interval: float, ids: list, clients: int, requests: int
+) -> None:
+    like_aggregator.interval = interval
+    like_aggregator.start()
+
+    per_client = max(1, requests // clients)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        async def client() -> None:
+            for _ in range(per_client):
+                resp = await c.post(f"/api/creations/{random.choice(ids)}/like")
+                resp.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    await like_aggregator.stop()
+    total = per_client * clients
+    print(
+        f"{name:<12} creations={len(ids):<5} clients={clients:<5} "
+        f"likes={total:<7} elapsed={elapsed:.2f}s likes/sec={total / elapsed:,.0f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--creations", type=int, default=1, help="参与压测的作品数")
+    parser.add_argument("--window-ms", type=int, default=50, help="聚合窗口（毫秒）")
+    args = parser.parse_args()
+
+    ids = await load_creation_ids(args.creations)
+    if not ids:
+        raise SystemExit("creations 表为空，请先准备测试数据")
+
+    await run_case("atomic", 0, ids, args.clients, args.requests)
+    await run_case(
+        "coalesced", args.window_ms / 1000, ids, args.clients, args.requests
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
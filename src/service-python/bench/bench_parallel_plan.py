@@ -0,0 +1,48 @@
+"""
+计划并行执行压测：对比顺序依赖的计划与互不依赖的计划的运行耗时。
+互不依赖时，墙钟时间应接近「规划 + 最慢的一批步骤 + 报告」。
+
+用法（在 src/service-python 目录下）：
+
+    python -m bench.bench_parallel_plan --steps 5 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.agent import nodes
+from app.agent.graph import run_agent
+from app.core.config import settings
+from bench.fake_llm import FakeChatModel
+
+
+async def timed_run(independent: bool, steps: int, latency: float) -> float:
+    nodes.llm = FakeChatModel(
+        latency=latency, plan_steps=steps, independent=independent
+    )
+    start = time.perf_counter()
+    await run_agent("bench parallel plan", config={"recursion_limit": 1000})
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5, help="每次模型调用延迟（秒）")
+    parser.add_argument(
+        "--max-parallel", type=int, default=None, help="每轮并行步骤上限，默认等于步骤数"
+    )
+    args = parser.parse_args()
+    settings.PLAN_MAX_PARALLEL_STEPS = args.max_parallel or args.steps
+
+    sequential = await timed_run(False, args.steps, args.latency)
+    parallel = await timed_run(True, args.steps, args.latency)
+
+    print(f"steps={args.steps} llm_latency={args.latency}s")
+    print(f"sequential plan: {sequential:.2f}s")
+    print(f"independent plan: {parallel:.2f}s (speedup {sequential / parallel:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
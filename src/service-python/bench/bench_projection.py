@@ -0,0 +1,143 @@
+"""
+作品列表与作品评论接口的读取量对比：整行查询（旧实现）与按响应 schema 投影查询（当前实现）
+每个请求从数据库取回的字节数与耗时。
+
+用法（在 src/service-python 目录下，需要可用的 DATABASE_URL 且已建表）：
+
+    python -m bench.bench_projection --creations 100 --content-kb 100
+
+脚本会插入 type='bench' 的作品，结束后删除。
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, List, Sequence
+
+from sqlalchemy import func, true
+from sqlmodel import delete, desc, select
+
+from app.api.projection import schema_columns
+from app.core.database import AsyncSessionLocal, engine
+from app.models import Comment, Creation
+from app.schemas.creation import CommentRead, CreationReadList
+
+
+def fetched_bytes(rows: Sequence[Any]) -> int:
+    """
+    估算结果集的大小：按每个值的文本表示计算字节数。
+    """
+    total = 0
+    for row in rows:
+        if hasattr(row, "__table__"):
+            values = [getattr(row, c.name) for c in row.__table__.columns]
+        else:
+            values = list(row)
+        total += sum(len(str(v).encode("utf-8")) for v in values if v is not None)
+    return total
+
+
+async def seed(count: int, content_kb: int) -> None:
+    content = "字" * (content_kb * 1024 // 3)
+    async with AsyncSessionLocal() as session:
+        for i in range(count):
+            session.add(
+                Creation(
+                    type="bench",
+                    title=f"bench creation {i}",
+                    content=content,
+                    asset_url=f"https://example.com/{i}.png",
+                )
+            )
+        await session.commit()
+
+
+async def measure(name: str, statements: List[Any], repeat: int) -> None:
+    """
+    statements 为一次请求中依次执行的查询，每条查询计一次数据库往返。
+    """
+    total_bytes = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as session:
+            for statement in statements:
+                result = await session.exec(statement)
+                total_bytes += fetched_bytes(result.all())
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<30} round_trips={len(statements)} "
+        f"bytes/request={total_bytes // repeat:>10,} "
+        f"ms/request={elapsed / repeat * 1000:.2f}"
+    )
+
+
+def comments_page(creation_id: int, page_size: int) -> Any:
+    page_query = (
+        select(*schema_columns(Comment, CommentRead))
+        .where(Comment.creation_id == Creation.id)
+        .order_by(desc(Comment.id))
+        .limit(page_size + 1)
+        .lateral("comments_page")
+    )
+    return (
+        select(page_query)
+        .select_from(Creation)
+        .outerjoin(page_query, true())
+        .where(Creation.id == creation_id)
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--creations", type=int, default=100)
+    parser.add_argument("--content-kb", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    # 关闭 SQL 回显，避免日志输出影响计时
+    engine.echo = False
+    await seed(args.creations, args.content_kb)
+    try:
+        list_full = select(Creation).order_by(desc(Creation.id))
+        list_projected = select(*schema_columns(Creation, CreationReadList))
+        list_projected = list_projected.order_by(desc(Creation.id))
+        await measure(
+            "creations list (full row)",
+            [list_full.limit(args.page_size + 1)],
+            args.repeat,
+        )
+        await measure(
+            "creations list (projected)",
+            [list_projected.limit(args.page_size + 1)],
+            args.repeat,
+        )
+
+        async with AsyncSessionLocal() as session:
+            result = await session.exec(select(func.max(Creation.id)))
+            creation_id = result.one()
+        await measure(
+            "creation comments (get+list)",
+            [
+                select(Creation).where(Creation.id == creation_id),
+                select(Comment)
+                .where(Comment.creation_id == creation_id)
+                .order_by(desc(Comment.id))
+                .limit(args.page_size + 1),
+            ],
+            args.repeat,
+        )
+        await measure(
+            "creation comments (lateral)",
+            [comments_page(creation_id, args.page_size)],
+            args.repeat,
+        )
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.exec(delete(Creation).where(Creation.type == "bench"))  # type: ignore
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+评论回复工作进程压测：写入一批未回复的评论，用假模型替换 nodes.llm 后运行回复工作进程，
+直到全部回复完毕，统计 replies/min 与模型调用次数。
+
+用法（在 src/service-python 目录下，需要可用的 DATABASE_URL 且已执行 schema.sql）：
+
+    python -m bench.bench_reply_worker --creations 20 --comments 2000 --batch-size 20 --concurrency 4
+    python -m bench.bench_reply_worker --comments 500 --batch-size 1   # 对比每条评论一次模型调用
+
+脚本写入的作品为 type='bench'，结束后删除（评论随外键级联删除）。
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func
+from sqlmodel import delete, select
+
+from app.agent import nodes
+from app.core.database import AsyncSessionLocal, engine
+from app.models import Comment, Creation
+from app.reply_worker import reply_main
+from app.services.comment_replies import ReplyStats
+from bench.fake_llm import FakeChatModel
+
+
+async def seed(creations: int, comments: int) -> list:
+    async with AsyncSessionLocal() as session:
+        rows = [
+            Creation(type="bench", title=f"bench creation {i}", content="作品内容" * 50)
+            for i in range(creations)
+        ]
+        session.add_all(rows)
+        await session.flush()
+        ids = [row.id for row in rows]
+        session.add_all(
+            Comment(content=f"bench comment {i}", creation_id=ids[i % creations])
+            for i in range(comments)
+        )
+        await session.commit()
+        return ids
+
+
+async def unreplied(ids: list) -> int:
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(
+            select(func.count())
+            .where(Comment.creation_id.in_(ids))  # type: ignore
+            .where(Comment.reply_content == None)  # noqa: E711
+        )
+        return result.one()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--creations", type=int, default=20)
+    parser.add_argument("--comments", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-per-minute", type=int, default=0, help="0 表示不限速")
+    parser.add_argument("--latency", type=float, default=1.0, help="每次模型调用延迟（秒）")
+    args = parser.parse_args()
+
+    engine.echo = False
+    nodes.llm = FakeChatModel(latency=args.latency)
+    ids = await seed(args.creations, args.comments)
+
+    stop = asyncio.Event()
+    stats = ReplyStats()
+    worker = asyncio.create_task(
+        reply_main(args.concurrency, args.batch_size, args.max_per_minute, stop, stats)
+    )
+    start = time.perf_counter()
+    try:
+        while await unreplied(ids) > 0:
+            await asyncio.sleep(0.2)
+        elapsed = time.perf_counter() - start
+    finally:
+        stop.set()
+        await worker
+        async with AsyncSessionLocal() as session:
+            await session.exec(delete(Creation).where(Creation.id.in_(ids)))  # type: ignore
+            await session.commit()
+        await engine.dispose()
+
+    print(
+        f"comments={args.comments} batch_size={args.batch_size} "
+        f"concurrency={args.concurrency} llm_latency={args.latency}s"
+    )
+    print(
+        f"elapsed={elapsed:.2f}s llm_calls={stats.batches} "
+        f"replies/min={stats.replied / elapsed * 60:,.0f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""
+后台运行队列吞吐压测：向 agent_runs 写入一批运行，用不同数量的工作进程（假模型）消费，
+统计 runs/sec，验证吞吐随工作进程数扩展，且每个运行都在自己的工作目录中执行。
+
+用法（在 src/service-python 目录下，需要可用的 DATABASE_URL）：
+
+    python -m bench.bench_run_queue --runs 40 --workers 1,2,4 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from sqlmodel import func, select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models import AgentRun
+from app.services.run_queue import FINISHED_STATUSES, enqueue_run
+from app.worker import start_workers
+
+
+def install_fake_llm() -> None:
+    from app.agent import nodes
+    from bench.fake_llm import FakeChatModel
+
+    nodes.llm = FakeChatModel(
+        latency=float(os.environ.get("BENCH_LLM_LATENCY", "0.2")), plan_steps=3
+    )
+
+
+async def wait_until_finished(run_ids: list) -> None:
+    while True:
+        async with AsyncSessionLocal() as session:
+            result = await session.exec(
+                select(func.count())
+                .select_from(AgentRun)
+                .where(AgentRun.id.in_(run_ids))  # type: ignore
+                .where(AgentRun.status.in_(FINISHED_STATUSES))  # type: ignore
+            )
+            if result.one() == len(run_ids):
+                return
+        await asyncio.sleep(0.2)
+
+
+async def run_case(runs: int, workers: int) -> float:
+    async with AsyncSessionLocal() as session:
+        run_ids = [
+            (await enqueue_run(session, f"bench run {i}")).id for i in range(runs)
+        ]
+
+    processes = start_workers(workers, 1, setup=install_fake_llm)
+    start = time.perf_counter()
+    try:
+        await wait_until_finished(run_ids)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=40)
+    parser.add_argument("--workers", default="1,2,4", help="逗号分隔的工作进程数")
+    parser.add_argument("--latency", type=float, default=0.2, help="每次模型调用延迟（秒）")
+    args = parser.parse_args()
+    os.environ["BENCH_LLM_LATENCY"] = str(args.latency)
+
+    for workers in (int(w) for w in args.workers.split(",")):
+        elapsed = await run_case(args.runs, workers)
+        print(
+            f"workers={workers:<3} runs={args.runs} elapsed={elapsed:.2f}s "
+            f"runs/sec={args.runs / elapsed:.2f}"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+思考记录写入压测：对比「每条记录单独 INSERT」与 ThoughtSink 批量写入（多行 INSERT / COPY）的 rows/sec。
+
+用法（在 src/service-python 目录下，需要可用的 DATABASE_URL 且已建好 thoughts 表）：
+
+    python -m bench.bench_thought_sink --producers 50 --rows 20000
+    python -m bench.bench_thought_sink --producers 50 --rows 20000 --batch-size 500
+
+压测写入的记录使用 --cycle-id 标记，结束后会被删除。
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlmodel import delete
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models import Thought
+from app.services.thought_sink import ThoughtSink
+
+
+def report(name: str, rows: int, elapsed: float) -> None:
+    print(f"{name:<12} rows={rows:<7} elapsed={elapsed:.2f}s rows/sec={rows / elapsed:,.0f}")
+
+
+async def run_per_row(producers: int, rows: int, cycle_id: int) -> None:
+    per_producer = rows // producers
+
+    async def producer(index: int) -> None:
+        async with AsyncSessionLocal() as session:
+            for i in range(per_producer):
+                session.add(
+                    Thought(
+                        cycle_id=cycle_id,
+                        agent_name=f"bench-{index}",
+                        content=f"thought {i}",
+                    )
+                )
+                await session.commit()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(producer(i) for i in range(producers)))
+    report("per-row", per_producer * producers, time.perf_counter() - start)
+
+
+async def run_sink(
+    method: str, producers: int, rows: int, cycle_id: int, batch_size: int
+) -> None:
+    sink = ThoughtSink(
+        batch_size=batch_size, flush_interval=0.05, max_pending=10000, method=method
+    )
+    per_producer = rows // producers
+
+    async def producer(index: int) -> None:
+        for i in range(per_producer):
+            await sink.emit(f"bench-{index}", f"thought {i}", cycle_id=cycle_id)
+
+    # 计时包含 stop 中的最后一次写入，保证所有记录都已落库
+    start = time.perf_counter()
+    sink.start()
+    await asyncio.gather(*(producer(i) for i in range(producers)))
+    await sink.stop()
+    report(method, sink.written, time.perf_counter() - start)
+
+
+async def cleanup(cycle_id: int) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.exec(delete(Thought).where(Thought.cycle_id == cycle_id))  # type: ignore
+        await session.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--producers", type=int, default=50, help="并发产生思考的协程数")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--cycle-id", type=int, default=-1)
+    args = parser.parse_args()
+
+    try:
+        await run_per_row(args.producers, args.rows, args.cycle_id)
+        for method in ("insert", "copy"):
+            await run_sink(
+                method, args.producers, args.rows, args.cycle_id, args.batch_size
+            )
+    finally:
+        await cleanup(args.cycle_id)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
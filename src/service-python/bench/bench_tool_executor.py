@@ -0,0 +1,70 @@
+"""
+工具执行节点微基准：一条 AIMessage 中包含 N 个基于 sleep 的假工具调用，
+对比逐个执行与并发执行的耗时，并行时应接近 max(latency) 而不是 sum(latency)。
+
+用法（在 src/service-python 目录下）：
+
+    python -m bench.bench_tool_executor --calls 8 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from app.agent.executor import execute_tool_calls
+
+
+@tool
+def sync_sleep(seconds: float) -> str:
+    """同步 sleep 的假工具。"""
+    time.sleep(seconds)
+    return f"slept {seconds}s"
+
+
+@tool
+async def async_sleep(seconds: float) -> str:
+    """异步 sleep 的假工具。"""
+    await asyncio.sleep(seconds)
+    return f"slept {seconds}s"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="最慢调用的耗时（秒）")
+    args = parser.parse_args()
+
+    tools = [sync_sleep, async_sleep]
+    # 延迟从 latency/calls 递增到 latency，同步/异步工具交替
+    calls = [
+        {
+            "name": tools[i % 2].name,
+            "args": {"seconds": args.latency * (i + 1) / args.calls},
+            "id": f"call_{i}",
+        }
+        for i in range(args.calls)
+    ]
+    message = AIMessage(content="", tool_calls=calls)
+    total = sum(call["args"]["seconds"] for call in calls)
+
+    start = time.perf_counter()
+    for call in calls:
+        await execute_tool_calls(tools, AIMessage(content="", tool_calls=[call]))
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await execute_tool_calls(tools, message)
+    concurrent = time.perf_counter() - start
+
+    assert [r.tool_call_id for r in results] == [c["id"] for c in calls]
+    print(f"calls={args.calls} sum(latency)={total:.2f}s max(latency)={args.latency:.2f}s")
+    print(f"sequential={sequential:.2f}s concurrent={concurrent:.2f}s")
+    for r in results:
+        print(f"  {r.tool_call_id:<8} {r.name:<12} {r.response_metadata}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
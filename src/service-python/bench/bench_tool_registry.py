@@ -0,0 +1,139 @@
+"""
+动态工具注册表压测：生成 N 个合成的工具行，不经过数据库直接交给注册表，统计：
+
+- 冷启动：进程内没有任何编译缓存时，构建包含 N 个工具的工具集的耗时
+- 增量：新增一行后重新构建的耗时（只编译新行，其余命中代码哈希缓存）
+- 每次运行开始时解析工具集的耗时（版本号未变，命中快照缓存）
+- 每次模型调用绑定工具的耗时：直接传预先转换好的 schema，对比每次传入工具对象重新转换
+
+用法（在 src/service-python 目录下，不需要数据库和网络）：
+
+    python -m bench.bench_tool_registry --tools 10 100 500
+    python -m bench.bench_tool_registry --tools 1000 --json registry.json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from langchain_openai import ChatOpenAI
+
+TOOL_CODE = '''
+def {name}(text: str, repeat: int = 1) -> str:
+    """把 text 重复 repeat 次后返回（合成工具 {index}）。"""
+    return text * repeat
+'''
+
+
+def make_rows(count: int, offset: int = 0) -> List[Any]:
+    from app.models import Tool
+
+    return [
+        Tool(
+            id=i,
+            name=f"tool_{i:05d}",
+            description=f"合成工具 {i}，用于压测注册表",
+            code=TOOL_CODE.format(name=f"tool_{i:05d}", index=i),
+            dependencies=[],
+        )
+        for i in range(offset, offset + count)
+    ]
+
+
+def timeit(fn, repeat: int) -> float:
+    """返回单次调用的平均耗时（微秒）。"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+async def measure(count: int, args: argparse.Namespace) -> Dict[str, Any]:
+    from app.agent.tool_registry import DependencyEnv, ToolRegistry, with_tool_set
+
+    registry = ToolRegistry(DependencyEnv(".cache/bench_tool_env", timeout=60), ttl=3600)
+    rows = make_rows(count)
+    version = 1
+
+    async def fetch_version() -> int:
+        return version
+
+    async def fetch_rows() -> List[Any]:
+        return rows
+
+    # 用内存中的行代替数据库查询
+    registry._fetch_version = fetch_version  # type: ignore
+    registry._fetch_rows = fetch_rows  # type: ignore
+
+    start = time.perf_counter()
+    tool_set = await registry.get()
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    # 新增一行并使版本号失效，只应编译这一行
+    rows = rows + make_rows(1, offset=count)
+    version += 1
+    registry._cache.invalidate()
+    start = time.perf_counter()
+    tool_set = await registry.get()
+    incremental_ms = (time.perf_counter() - start) * 1000
+
+    # 运行开始：版本号命中缓存，直接复用已构建的工具集
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        await registry.get()
+    resolve_us = (time.perf_counter() - start) / args.repeat * 1e6
+
+    from app.agent import tool_registry as module
+
+    module.tool_registry = registry
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        await with_tool_set({"recursion_limit": 100})
+    with_config_us = (time.perf_counter() - start) / args.repeat * 1e6
+
+    llm = ChatOpenAI(model="bench", api_key="bench", base_url="http://127.0.0.1:9")
+    bind_repeat = max(1, args.repeat // max(1, count // 10))
+    bind_schemas_us = timeit(lambda: llm.bind_tools(tool_set.schemas), bind_repeat)
+    bind_tools_us = timeit(lambda: llm.bind_tools(tool_set.tools), bind_repeat)
+
+    return {
+        "tools": len(tool_set.tools),
+        "cold_build_ms": round(cold_ms, 2),
+        "incremental_build_ms": round(incremental_ms, 3),
+        "resolve_us": round(resolve_us, 2),
+        "with_tool_set_us": round(with_config_us, 2),
+        "bind_schemas_us": round(bind_schemas_us, 1),
+        "bind_tools_us": round(bind_tools_us, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--tools", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=1000, help="计时循环的重复次数")
+    parser.add_argument("--json", default=None, help="结果 JSON 路径")
+    args = parser.parse_args()
+
+    results = [await measure(count, args) for count in args.tools]
+
+    print(
+        f"{'tools':>6} {'cold ms':>9} {'incr ms':>8} {'resolve us':>11} "
+        f"{'config us':>10} {'bind schema us':>15} {'bind tools us':>14}"
+    )
+    for r in results:
+        print(
+            f"{r['tools']:>6} {r['cold_build_ms']:>9.1f} {r['incremental_build_ms']:>8.2f} "
+            f"{r['resolve_us']:>11.2f} {r['with_tool_set_us']:>10.2f} "
+            f"{r['bind_schemas_us']:>15.1f} {r['bind_tools_us']:>14.1f}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,214 @@
+"""
+用于压测的假聊天模型：不访问网络，按调用阶段（规划/执行/报告/评论回复）返回固定内容，
+并通过 sleep 模拟模型延迟。
+
+执行步骤时可以按脚本先发起 tool_rounds 轮工具调用再给出结论；每次调用在 usage_metadata 中
+报告 token 数，completion_tokens 同时决定执行结果与报告的内容长度。
+"""
+
+import asyncio
+import json
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from app.agent.prompts import (
+    EXECUTE_SYSTEM_PROMPT,
+    PLAN_SYSTEM_PROMPT,
+    REPLY_SYSTEM_PROMPT,
+    REPORT_SYSTEM_PROMPT,
+)
+
+
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.05
+    plan_steps: int = 3
+    # 为 True 时生成的步骤互不依赖，可以并行执行
+    independent: bool = False
+    # 流式输出时每个响应拆分成的块数
+    stream_chunks: int = 8
+    # 执行每个步骤时，给出结论前先发起的工具调用轮数
+    tool_rounds: int = 0
+    tool_name: str = "create_file"
+    # 工具参数；为 None 时使用 create_file 的参数
+    tool_args: Optional[dict] = None
+    # 每次调用报告的输出 token 数；大于 0 时执行结果与报告的内容也按此长度填充
+    completion_tokens: int = 0
+    # 每次调用报告的输入 token 数；为 None 时按输入字符数估算
+    prompt_tokens: Optional[int] = None
+    # 每个输出 token 额外的延迟（秒），模拟生成速度
+    token_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self.bind(tools=tools, **kwargs)
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        # 对应 planner 中 method="json_mode" 的用法：模型输出 JSON，再解析为 schema
+        return self | PydanticOutputParser(pydantic_object=schema)
+
+    @staticmethod
+    def _tool_rounds_done(messages: List[BaseMessage]) -> int:
+        """
+        当前步骤已经完成的工具调用轮数：末尾的提示（系统提示与任务）之前，
+        连续的「带工具调用的 AIMessage + ToolMessage」的轮数。
+        """
+        end = len(messages)
+        while end and isinstance(messages[end - 1], (SystemMessage, HumanMessage)):
+            end -= 1
+        rounds = 0
+        for message in reversed(messages[:end]):
+            if isinstance(message, ToolMessage):
+                continue
+            if isinstance(message, AIMessage) and message.tool_calls:
+                rounds += 1
+                continue
+            break
+        return rounds
+
+    def _filler(self, text: str) -> str:
+        if self.completion_tokens <= 0:
+            return text
+        return text + " " + " ".join(["tok"] * self.completion_tokens)
+
+    def _usage(self, messages: List[BaseMessage]) -> dict:
+        prompt = self.prompt_tokens
+        if prompt is None:
+            prompt = sum(len(str(m.content)) for m in messages) // 3 + 1
+        return {
+            "input_tokens": prompt,
+            "output_tokens": self.completion_tokens,
+            "total_tokens": prompt + self.completion_tokens,
+        }
+
+    def _call_latency(self) -> float:
+        return self.latency + self.completion_tokens * self.token_latency
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        message = self._script(messages)
+        message.usage_metadata = self._usage(messages)  # type: ignore
+        return message
+
+    def _script(self, messages: List[BaseMessage]) -> AIMessage:
+        system = next(
+            (m.content for m in reversed(messages) if isinstance(m, SystemMessage)),
+            "",
+        )
+        if system == PLAN_SYSTEM_PROMPT:
+            plan = {
+                "goal": "fake goal",
+                "thought": "fake thought",
+                "steps": [
+                    {
+                        "id": f"s{i}",
+                        "title": f"step {i}",
+                        "description": f"do step {i}",
+                        **({"depends_on": []} if self.independent else {}),
+                    }
+                    for i in range(self.plan_steps)
+                ],
+            }
+            return AIMessage(content=json.dumps(plan))
+        if system == REPORT_SYSTEM_PROMPT:
+            return AIMessage(content=self._filler("fake report"))
+        if system == REPLY_SYSTEM_PROMPT:
+            # 为提示中列出的每条评论 "[id]" 生成一条回复
+            ids = re.findall(r"^- \[(\d+)\]", str(messages[-1].content), re.M)
+            replies = [{"comment_id": int(i), "reply": f"谢谢你的评论 {i}"} for i in ids]
+            return AIMessage(content=json.dumps({"replies": replies}))
+        if system == EXECUTE_SYSTEM_PROMPT:
+            rounds = self._tool_rounds_done(messages)
+            if rounds < self.tool_rounds:
+                args = self.tool_args or {
+                    "file_name": f"fake-{rounds}.txt",
+                    "content": "fake content",
+                }
+                return AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": self.tool_name,
+                            "args": args,
+                            "id": f"call_{uuid.uuid4().hex[:12]}",
+                        }
+                    ],
+                )
+            return AIMessage(content=self._filler("这个步骤完成了。"))
+        return AIMessage(content="这个步骤完成了。")
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._call_latency())
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._call_latency())
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._respond(messages)
+        if message.tool_calls:
+            await asyncio.sleep(self._call_latency())
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"], ensure_ascii=False),
+                            "id": call["id"],
+                            "index": index,
+                        }
+                        for index, call in enumerate(message.tool_calls)
+                    ],
+                    usage_metadata=message.usage_metadata,
+                )
+            )
+            return
+
+        content = str(message.content)
+        size = max(1, -(-len(content) // self.stream_chunks))
+        pieces = [content[i : i + size] for i in range(0, len(content), size)] or [""]
+        for index, piece in enumerate(pieces):
+            await asyncio.sleep(self._call_latency() / len(pieces))
+            # token 数只在最后一块报告，合并后与非流式调用一致
+            usage = message.usage_metadata if index == len(pieces) - 1 else None
+            chunk = ChatGenerationChunk(
+                message=AIMessageChunk(content=piece, usage_metadata=usage)
+            )
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
@@ -0,0 +1,443 @@
+"""
+HTTP 接口压测驱动：用 httpx 异步客户端按配置的读写比例访问 app/api/routes 下的所有接口，
+输出各接口的 req/s 与 p50/p95/p99 延迟（JSON），可与基线结果对比。
+
+用法（在 src/service-python 目录下，先用 bench.seed 生成数据）：
+
+    # 进程内运行（ASGITransport，不需要启动服务）
+    python -m bench.load --mix read-heavy --duration 30 --concurrency 50 --output result.json
+
+    # 对已启动的服务压测（压测端与服务端不争用同一个事件循环，数据更准确）
+    python -m bench.load --base-url http://127.0.0.1:8000 --mix read-heavy --output result.json
+
+    # 与基线对比
+    python -m bench.load --mix read-heavy --baseline baseline.json --output result.json
+
+--mix all 会包含 /api/agent/stream 与 /api/runs：进程内运行时加 --fake-llm 使用假模型，
+完全离线；对外部服务压测时需要服务端自行配置假模型或 LLM_CACHE_REPLAY。
+
+作品 id 按与 bench.seed 相同的幂律分布选取（--skew），少数热门作品承担大部分访问。
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+
+from app.core.database import engine
+from bench.report import build_report, compare, load
+from bench.seed import hot_index
+
+
+class Driver:
+    """
+    记录每个接口（以路由模板命名）的延迟、错误数与状态码分布。
+    warmup 结束前的请求照常发送但不计入结果。
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        rng: random.Random,
+        creation_ids: Tuple[int, int],
+        skew: float,
+        etag: bool,
+    ):
+        self.client = client
+        self.rng = rng
+        self.creation_ids = creation_ids
+        self.skew = skew
+        self.etag = etag
+        self.recording = False
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self._etags: Dict[str, str] = {}
+
+    def creation_id(self) -> int:
+        low, high = self.creation_ids
+        return low + hot_index(self.rng, high - low + 1, self.skew)
+
+    async def request(
+        self, name: str, method: str, url: str, **kwargs: Any
+    ) -> Optional[httpx.Response]:
+        headers = kwargs.pop("headers", {})
+        if self.etag and method == "GET" and url in self._etags:
+            headers["If-None-Match"] = self._etags[url]
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            if self.recording:
+                self.errors[name] += 1
+                self.statuses[name][0] += 1
+            return None
+        elapsed = time.perf_counter() - start
+
+        if self.etag and "etag" in response.headers:
+            self._etags[url] = response.headers["etag"]
+        if self.recording:
+            self.latencies[name].append(elapsed)
+            self.statuses[name][response.status_code] += 1
+            if response.status_code >= 400:
+                self.errors[name] += 1
+        return response
+
+    async def stream(self, name: str, url: str, **kwargs: Any) -> None:
+        """
+        SSE 接口：延迟为读完整个事件流的时间。
+        """
+        start = time.perf_counter()
+        status = 0
+        try:
+            async with self.client.stream("GET", url, **kwargs) as response:
+                status = response.status_code
+                async for _ in response.aiter_bytes():
+                    pass
+        except httpx.HTTPError:
+            status = 0
+        if self.recording:
+            if status:
+                self.latencies[name].append(time.perf_counter() - start)
+            self.statuses[name][status] += 1
+            if status == 0 or status >= 400:
+                self.errors[name] += 1
+
+
+# ---------------------------------------------------------------------------
+# 操作：每个操作发送一个或多个请求
+# ---------------------------------------------------------------------------
+
+Op = Callable[[Driver], Awaitable[None]]
+
+
+async def life_status(d: Driver) -> None:
+    await d.request("GET /api/life/status", "GET", "/api/life/status")
+
+
+async def life_comments(d: Driver) -> None:
+    await d.request("GET /api/life/comments", "GET", "/api/life/comments?page_size=20")
+
+
+async def creations_list(d: Driver) -> None:
+    # 大多数访问停留在前几页
+    page = 1 + hot_index(d.rng, 10, 2.0)
+    await d.request(
+        "GET /api/creations/", "GET", f"/api/creations/?page={page}&page_size=20"
+    )
+
+
+async def creation_detail(d: Driver) -> None:
+    await d.request(
+        "GET /api/creations/{id}", "GET", f"/api/creations/{d.creation_id()}"
+    )
+
+
+async def creation_comments(d: Driver) -> None:
+    await d.request(
+        "GET /api/creations/{id}/comments",
+        "GET",
+        f"/api/creations/{d.creation_id()}/comments?page_size=20",
+    )
+
+
+async def thoughts(d: Driver) -> None:
+    await d.request("GET /api/thoughts", "GET", "/api/thoughts?page_size=20")
+
+
+async def thoughts_scroll(d: Driver) -> None:
+    # 模拟向下滚动：沿 next_cursor 连续翻页
+    url = "/api/thoughts?page_size=20"
+    for _ in range(d.rng.randint(2, 5)):
+        response = await d.request("GET /api/thoughts?cursor", "GET", url)
+        if response is None or response.status_code != 200:
+            return
+        cursor = response.json().get("next_cursor")
+        if not cursor:
+            return
+        url = f"/api/thoughts?page_size=20&cursor={cursor}"
+
+
+async def cache_stats(d: Driver) -> None:
+    await d.request("GET /api/cache/stats", "GET", "/api/cache/stats")
+
+
+async def metrics(d: Driver) -> None:
+    await d.request("GET /metrics", "GET", "/metrics")
+
+
+async def like_creation(d: Driver) -> None:
+    await d.request(
+        "POST /api/creations/{id}/like", "POST", f"/api/creations/{d.creation_id()}/like"
+    )
+
+
+async def comment_creation(d: Driver) -> None:
+    await d.request(
+        "POST /api/creations/{id}/comments",
+        "POST",
+        f"/api/creations/{d.creation_id()}/comments",
+        json={"content": f"bench comment {d.rng.random():.6f}"},
+    )
+
+
+async def comment_life(d: Driver) -> None:
+    await d.request(
+        "POST /api/life/comments",
+        "POST",
+        "/api/life/comments",
+        json={"content": f"bench life comment {d.rng.random():.6f}"},
+    )
+
+
+async def comments_bulk(d: Driver) -> None:
+    items = [
+        {"content": f"bench bulk comment {i}", "creation_id": d.creation_id()}
+        for i in range(20)
+    ]
+    await d.request(
+        "POST /api/comments/bulk", "POST", "/api/comments/bulk", json={"comments": items}
+    )
+
+
+async def run_lifecycle(d: Driver) -> None:
+    # 提交后立即查询并取消，避免在压测库中堆积待执行的运行
+    response = await d.request(
+        "POST /api/runs/", "POST", "/api/runs/", json={"user_message": "bench run"}
+    )
+    if response is None or response.status_code != 201:
+        return
+    run_id = response.json()["data"]["id"]
+    await d.request("GET /api/runs/{id}", "GET", f"/api/runs/{run_id}")
+    await d.request("POST /api/runs/{id}/cancel", "POST", f"/api/runs/{run_id}/cancel")
+
+
+async def agent_stream(d: Driver) -> None:
+    await d.stream(
+        "GET /api/agent/stream",
+        "/api/agent/stream",
+        params={"user_message": "bench"},
+        timeout=None,
+    )
+
+
+READS: Dict[str, Op] = {
+    "life_status": life_status,
+    "life_comments": life_comments,
+    "creations_list": creations_list,
+    "creation_detail": creation_detail,
+    "creation_comments": creation_comments,
+    "thoughts": thoughts,
+    "thoughts_scroll": thoughts_scroll,
+    "cache_stats": cache_stats,
+    "metrics": metrics,
+}
+WRITES: Dict[str, Op] = {
+    "like_creation": like_creation,
+    "comment_creation": comment_creation,
+    "comment_life": comment_life,
+    "comments_bulk": comments_bulk,
+}
+# 依赖智能体（模型）的操作，只在 --mix all 中出现
+AGENT: Dict[str, Op] = {
+    "run_lifecycle": run_lifecycle,
+    "agent_stream": agent_stream,
+}
+OPS: Dict[str, Op] = {**READS, **WRITES, **AGENT}
+
+# 各操作的相对权重；读写比例由每组权重之和决定
+MIXES: Dict[str, Dict[str, float]] = {
+    # 90% 读：首页轮询与作品浏览为主
+    "read-heavy": {
+        "life_status": 20,
+        "life_comments": 8,
+        "creations_list": 15,
+        "creation_detail": 15,
+        "creation_comments": 15,
+        "thoughts": 10,
+        "thoughts_scroll": 5,
+        "cache_stats": 1,
+        "metrics": 1,
+        "like_creation": 6,
+        "comment_creation": 2,
+        "comment_life": 1,
+        "comments_bulk": 1,
+    },
+    "read-only": {
+        "life_status": 25,
+        "life_comments": 10,
+        "creations_list": 15,
+        "creation_detail": 15,
+        "creation_comments": 15,
+        "thoughts": 12,
+        "thoughts_scroll": 6,
+        "cache_stats": 1,
+        "metrics": 1,
+    },
+    # 50% 写：点赞与评论高峰
+    "write-heavy": {
+        "life_status": 15,
+        "creations_list": 10,
+        "creation_detail": 10,
+        "creation_comments": 10,
+        "thoughts": 5,
+        "like_creation": 30,
+        "comment_creation": 12,
+        "comment_life": 5,
+        "comments_bulk": 3,
+    },
+    # 覆盖所有接口
+    "all": {
+        **{name: 8 for name in READS},
+        **{name: 4 for name in WRITES},
+        "run_lifecycle": 1,
+        "agent_stream": 0.2,
+    },
+}
+
+
+async def creation_id_range() -> Tuple[int, int]:
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT min(id), max(id) FROM creations"))
+        low, high = result.one()
+    await engine.dispose()
+    if low is None:
+        raise SystemExit("creations 表为空，请先运行 python -m bench.seed")
+    return low, high
+
+
+async def user(
+    driver: Driver,
+    names: List[str],
+    weights: List[float],
+    deadline: float,
+    think: float,
+) -> None:
+    while time.perf_counter() < deadline:
+        op = OPS[driver.rng.choices(names, weights)[0]]
+        await op(driver)
+        if think > 0:
+            await asyncio.sleep(driver.rng.expovariate(1 / think))
+
+
+@contextlib.asynccontextmanager
+async def make_client(args: argparse.Namespace):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.base_url:
+        async with httpx.AsyncClient(
+            base_url=args.base_url, limits=limits, timeout=args.timeout
+        ) as client:
+            yield client
+        return
+
+    if args.fake_llm:
+        from app.agent import nodes
+        from bench.fake_llm import FakeChatModel
+
+        nodes.llm = FakeChatModel(latency=args.fake_llm_latency)
+
+    from app.main import app
+
+    # ASGITransport 不触发 lifespan，这里手动启动后台任务
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            # 接口内未处理的异常按 500 计入错误，而不是中断压测
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://bench",
+            limits=limits,
+            timeout=args.timeout,
+        ) as client:
+            yield client
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = MIXES[args.mix]
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    creation_ids = await creation_id_range()
+
+    async with make_client(args) as client:
+        drivers = [
+            Driver(client, random.Random(args.seed + i), creation_ids, args.skew, args.etag)
+            for i in range(args.concurrency)
+        ]
+        start = time.perf_counter()
+        deadline = start + args.warmup + args.duration
+        users = [
+            asyncio.create_task(user(d, names, weights, deadline, args.think_ms / 1000))
+            for d in drivers
+        ]
+        await asyncio.sleep(args.warmup)
+        for d in drivers:
+            d.recording = True
+        measured_start = time.perf_counter()
+        await asyncio.gather(*users)
+        elapsed = time.perf_counter() - measured_start
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for d in drivers:
+        for name, values in d.latencies.items():
+            latencies[name].extend(values)
+        for name, count in d.errors.items():
+            errors[name] += count
+        for name, counts in d.statuses.items():
+            for code, count in counts.items():
+                statuses[name][code] += count
+
+    config = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("output", "baseline")
+    }
+    config["mix_weights"] = mix
+    config["creation_ids"] = list(creation_ids)
+    return build_report(config, latencies, errors, statuses, elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--mix", choices=sorted(MIXES), default="read-heavy")
+    parser.add_argument("--duration", type=float, default=30.0, help="计入结果的压测时长（秒）")
+    parser.add_argument("--warmup", type=float, default=5.0, help="预热时长（秒），不计入结果")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发虚拟用户数")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="每个用户两次操作之间的平均间隔")
+    parser.add_argument("--skew", type=float, default=3.0, help="热门作品的集中程度，与 bench.seed 一致")
+    parser.add_argument("--etag", action="store_true", help="客户端缓存 ETag 并发送 If-None-Match")
+    parser.add_argument("--base-url", default=None, help="对已启动的服务压测；不指定则进程内运行")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--fake-llm", action="store_true", help="进程内运行时使用假模型")
+    parser.add_argument("--fake-llm-latency", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="结果 JSON 路径；不指定则打印到标准输出")
+    parser.add_argument("--baseline", default=None, help="基线结果 JSON，用于对比")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    # 未指定 --output 时标准输出只有 JSON，便于重定向到文件；对比表格改写到标准错误
+    table_out = sys.stdout if args.output else sys.stderr
+    if args.baseline:
+        print(compare(load(args.baseline), report), file=table_out)
+    else:
+        print(compare({}, report), file=table_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+压测结果汇总：按接口统计 req/s 与 p50/p95/p99 延迟，输出为 JSON，并与基线结果对比。
+
+对比两次结果：
+
+    python -m bench.report baseline.json result.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """
+    latencies 为单个请求耗时（秒）；延迟统计以毫秒输出。
+    """
+    count = len(latencies)
+    summary: Dict[str, Any] = {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+    if count:
+        ms = np.asarray(latencies) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        summary.update(
+            mean_ms=round(float(ms.mean()), 3),
+            p50_ms=round(float(p50), 3),
+            p95_ms=round(float(p95), 3),
+            p99_ms=round(float(p99), 3),
+            max_ms=round(float(ms.max()), 3),
+        )
+    return summary
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(
+    config: Dict[str, Any],
+    routes: Dict[str, List[float]],
+    errors: Dict[str, int],
+    statuses: Dict[str, Dict[int, int]],
+    elapsed: float,
+) -> Dict[str, Any]:
+    all_latencies = [value for values in routes.values() for value in values]
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "elapsed_s": round(elapsed, 3),
+            "config": config,
+        },
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "routes": {
+            name: {
+                **summarize(values, errors.get(name, 0), elapsed),
+                "status": {str(k): v for k, v in sorted(statuses.get(name, {}).items())},
+            }
+            for name, values in sorted(routes.items())
+        },
+    }
+
+
+def _delta(base: Optional[float], new: Optional[float]) -> str:
+    if not base or new is None:
+        return "    n/a"
+    return f"{(new - base) / base * 100:+6.1f}%"
+
+
+def compare(baseline: Dict[str, Any], result: Dict[str, Any]) -> str:
+    """
+    逐接口对比 req/s 与 p95/p99，返回可直接打印的表格。
+    延迟的正百分比表示变慢，req/s 的正百分比表示变快。
+    """
+    lines = [
+        f"{'route':<34} {'rps':>10} {'Δrps':>8} {'p95 ms':>9} {'Δp95':>8} "
+        f"{'p99 ms':>9} {'Δp99':>8}"
+    ]
+    rows = [("TOTAL", baseline.get("total", {}), result.get("total", {}))]
+    for name, stats in result.get("routes", {}).items():
+        rows.append((name, baseline.get("routes", {}).get(name, {}), stats))
+    for name, base, new in rows:
+        lines.append(
+            f"{name:<34} {new.get('rps', 0):>10,.1f} {_delta(base.get('rps'), new.get('rps')):>8} "
+            f"{new.get('p95_ms', 0):>9.2f} {_delta(base.get('p95_ms'), new.get('p95_ms')):>8} "
+            f"{new.get('p99_ms', 0):>9.2f} {_delta(base.get('p99_ms'), new.get('p99_ms')):>8}"
+        )
+    return "\n".join(lines)
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="对比两次压测结果")
+    parser.add_argument("baseline")
+    parser.add_argument("result")
+    args = parser.parse_args()
+    print(compare(load(args.baseline), load(args.result)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
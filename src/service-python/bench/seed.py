@@ -0,0 +1,301 @@
+"""
+压测数据生成器：用 COPY 向 digital_life / creations / comments / thoughts 批量写入合成数据。
+
+用法（在 src/service-python 目录下，需要可用的本地 DATABASE_URL 且已执行 schema.sql）：
+
+    DATABASE_URL=postgresql+asyncpg://postgres@localhost/digitallife_bench \\
+        python -m bench.seed --creations 100000 --comments 1000000 --thoughts 10000000 --truncate
+
+- 评论按幂律分布落在作品上（少数热门作品拥有大部分评论），与 bench.load 的热门作品访问一致；
+  --life-comment-ratio 比例的评论 creation_id 为空，即对数字生命本人的评论。
+- created_at 在 --days 天内随 id 递增，列表接口的游标分页与线上数据形态一致。
+- 写入完成后修正 creations.comments / digital_life.comments 计数、序列值，并执行 ANALYZE。
+- 写入连接设置 session_replication_role = replica，不触发 trg_*_cache_version（需要超级用户），
+  最后在 finalize 中统一递增一次 cache_versions。
+- --truncate 会清空上述四张表（RESTART IDENTITY），只应对压测库使用。
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+from app.core.database import engine
+
+WORDS = (
+    "生命 思考 记忆 作品 光 影 声音 梦 城市 海 风 代码 时间 语言 世界 "
+    "观察 学习 尝试 失败 成功 计划 步骤 工具 报告 问题 回答 灵感 季节 夜晚"
+).split()
+
+AGENT_NAMES = ["planner", "agent", "marker", "tool_executor", "reporter"]
+CREATION_TYPES = ["article", "image", "poem", "code", "video"]
+
+
+def dsn() -> str:
+    # 直接使用 asyncpg 执行 COPY，不经过 SQLAlchemy 连接池
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def text_pool(rng: random.Random, size: int, min_words: int, max_words: int) -> List[str]:
+    """
+    预先生成一批文本循环使用；逐行随机拼接会让生成器而不是数据库成为瓶颈。
+    """
+    return [
+        "".join(rng.choices(WORDS, k=rng.randint(min_words, max_words)))
+        for _ in range(size)
+    ]
+
+
+def hot_index(rng: random.Random, n: int, skew: float) -> int:
+    """
+    幂律分布的下标：skew 越大，越集中在靠前（id 较小）的元素上。
+    """
+    return min(int(n * rng.random() ** skew), n - 1)
+
+
+def timestamps(start: datetime, span: timedelta, count: int, index: int) -> datetime:
+    # 第 index 行的创建时间，随 id 单调递增
+    return start + span * (index / max(count, 1))
+
+
+def life_rows(count: int, now: datetime) -> Iterator[Tuple]:
+    for i in range(count):
+        yield (i + 1, f"bench life {i}", 0, 0, 0, now + timedelta(days=365), now)
+
+
+def creation_rows(
+    rng: random.Random, count: int, start: datetime, span: timedelta
+) -> Iterator[Tuple]:
+    titles = text_pool(rng, 1000, 2, 6)
+    contents = text_pool(rng, 1000, 50, 400)
+    for i in range(count):
+        yield (
+            i + 1,
+            CREATION_TYPES[i % len(CREATION_TYPES)],
+            titles[i % len(titles)],
+            contents[i % len(contents)],
+            rng.randint(0, 1000),
+            0,
+            f"https://example.invalid/assets/{i + 1}.png" if i % 3 == 0 else None,
+            timestamps(start, span, count, i),
+        )
+
+
+def comment_rows(
+    rng: random.Random,
+    count: int,
+    creations: int,
+    life_ratio: float,
+    reply_ratio: float,
+    skew: float,
+    start: datetime,
+    span: timedelta,
+) -> Iterator[Tuple]:
+    contents = text_pool(rng, 5000, 3, 40)
+    replies = text_pool(rng, 1000, 3, 30)
+    for i in range(count):
+        if creations == 0 or rng.random() < life_ratio:
+            creation_id = None
+        else:
+            creation_id = hot_index(rng, creations, skew) + 1
+        yield (
+            i + 1,
+            contents[i % len(contents)],
+            creation_id,
+            replies[i % len(replies)] if rng.random() < reply_ratio else None,
+            timestamps(start, span, count, i),
+        )
+
+
+def thought_rows(
+    rng: random.Random, count: int, start: datetime, span: timedelta
+) -> Iterator[Tuple]:
+    contents = text_pool(rng, 5000, 10, 120)
+    for i in range(count):
+        yield (
+            i + 1,
+            # 每个运行约产生 50 条思考记录
+            i // 50 + 1,
+            AGENT_NAMES[i % len(AGENT_NAMES)],
+            contents[i % len(contents)],
+            timestamps(start, span, count, i),
+        )
+
+
+def chunked(rows: Iterator[Tuple], size: int) -> Iterator[List[Tuple]]:
+    chunk: List[Tuple] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def copy_table(
+    conn: asyncpg.Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterator[Tuple],
+    total: int,
+    chunk_size: int,
+) -> None:
+    """
+    分块 COPY，每块一个事务：中途中断时已写入的数据保持可用，并能输出进度。
+    """
+    if total <= 0:
+        return
+    start = time.perf_counter()
+    written = 0
+    for chunk in chunked(rows, chunk_size):
+        await conn.copy_records_to_table(table, records=chunk, columns=list(columns))
+        written += len(chunk)
+        elapsed = time.perf_counter() - start
+        print(
+            f"\r{table:<13} {written:>12,}/{total:,} "
+            f"{written / max(elapsed, 1e-9):>10,.0f} rows/s",
+            end="",
+            flush=True,
+        )
+    print()
+
+
+async def finalize(conn: asyncpg.Connection) -> None:
+    """
+    COPY 写入了显式 id：把序列推进到当前最大 id，并重算评论计数。
+    写入期间缓存版本触发器被跳过，这里为各表统一递增一次版本号并通知各进程。
+    """
+    for table in ("digital_life", "creations", "comments", "thoughts"):
+        await conn.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT max(id) FROM {table}), 0) + 1, false)"
+        )
+    await conn.execute(
+        """
+        UPDATE creations AS c SET comments = s.n
+        FROM (
+            SELECT creation_id, count(*) AS n FROM comments
+            WHERE creation_id IS NOT NULL GROUP BY creation_id
+        ) AS s
+        WHERE c.id = s.creation_id
+        """
+    )
+    await conn.execute(
+        """
+        UPDATE digital_life SET comments = (
+            SELECT count(*) FROM comments WHERE creation_id IS NULL
+        )
+        """
+    )
+    await conn.execute(
+        """
+        UPDATE cache_versions SET version = version + 1
+        WHERE name IN ('creations', 'comments', 'thoughts')
+        """
+    )
+    for table in ("creations", "comments", "thoughts"):
+        await conn.execute("SELECT pg_notify('cache_invalidation', $1)", f"table_version:{table}")
+    await conn.execute("ANALYZE digital_life, creations, comments, thoughts")
+
+
+async def seed(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    span = timedelta(days=args.days)
+    start = now - span
+
+    conn: Optional[asyncpg.Connection] = None
+    try:
+        conn = await asyncpg.connect(dsn())
+        # 逐行执行的延迟触发器会让 COPY 慢约 20%，且每块都会递增一次版本号；finalize 中统一递增
+        await conn.execute("SET session_replication_role = replica")
+        if args.truncate:
+            await conn.execute(
+                "TRUNCATE thoughts, comments, creations, digital_life RESTART IDENTITY CASCADE"
+            )
+        else:
+            existing = await conn.fetchval(
+                "SELECT EXISTS (SELECT 1 FROM digital_life) OR EXISTS (SELECT 1 FROM creations)"
+                " OR EXISTS (SELECT 1 FROM comments) OR EXISTS (SELECT 1 FROM thoughts)"
+            )
+            if existing:
+                raise SystemExit("目标库中已有数据；压测库请加 --truncate 后重新生成")
+
+        await copy_table(
+            conn,
+            "digital_life",
+            ("id", "name", "likes", "visitors", "comments", "lifespan", "created_at"),
+            life_rows(args.life, now),
+            args.life,
+            args.chunk_size,
+        )
+        await copy_table(
+            conn,
+            "creations",
+            ("id", "type", "title", "content", "likes", "comments", "asset_url", "created_at"),
+            creation_rows(rng, args.creations, start, span),
+            args.creations,
+            args.chunk_size,
+        )
+        await copy_table(
+            conn,
+            "comments",
+            ("id", "content", "creation_id", "reply_content", "created_at"),
+            comment_rows(
+                rng,
+                args.comments,
+                args.creations,
+                args.life_comment_ratio,
+                args.reply_ratio,
+                args.skew,
+                start,
+                span,
+            ),
+            args.comments,
+            args.chunk_size,
+        )
+        await copy_table(
+            conn,
+            "thoughts",
+            ("id", "cycle_id", "agent_name", "content", "created_at"),
+            thought_rows(rng, args.thoughts, start, span),
+            args.thoughts,
+            args.chunk_size,
+        )
+        print("finalizing (sequences, counters, ANALYZE)...")
+        await finalize(conn)
+    finally:
+        if conn is not None:
+            await conn.close()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--life", type=int, default=1)
+    parser.add_argument("--creations", type=int, default=10_000)
+    parser.add_argument("--comments", type=int, default=100_000)
+    parser.add_argument("--thoughts", type=int, default=1_000_000)
+    parser.add_argument("--life-comment-ratio", type=float, default=0.1)
+    parser.add_argument("--reply-ratio", type=float, default=0.8, help="已回复评论的比例")
+    parser.add_argument("--skew", type=float, default=3.0, help="评论在作品间分布的偏斜程度")
+    parser.add_argument("--days", type=int, default=365, help="created_at 覆盖的天数")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="每次 COPY 的行数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="写入前清空四张表")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    asyncio.run(seed(args))
+    print(f"done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
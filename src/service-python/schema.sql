@@ -10,6 +10,9 @@ CREATE TABLE IF NOT EXISTS digital_life (
     created_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+-- 独立访客的 HyperLogLog 草图，visitors 为其估计值
+ALTER TABLE digital_life ADD COLUMN IF NOT EXISTS visitor_sketch BYTEA;
+
 -- 表: tools
 -- 存储可供智能体使用的工具信息
 CREATE TABLE IF NOT EXISTS tools (
@@ -60,15 +63,129 @@ CREATE TABLE IF NOT EXISTS comments (
         ON DELETE CASCADE -- 如果作品被删除，其下的所有评论也一并删除
 );
 
+-- 回复工作进程的认领状态：认领时 reply_attempts 加一并设置租约到期时间，
+-- 租约内其它工作进程不会重复认领；尝试次数达到上限的评论不再认领
+ALTER TABLE comments ADD COLUMN IF NOT EXISTS reply_attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE comments ADD COLUMN IF NOT EXISTS reply_claimed_until TIMESTAMPTZ;
+
+-- 表: agent_runs
+-- 智能体运行任务队列，工作进程通过 FOR UPDATE SKIP LOCKED 认领
+CREATE TABLE IF NOT EXISTS agent_runs (
+    id BIGSERIAL PRIMARY KEY,
+    user_message TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued', -- queued / running / succeeded / failed / cancelled
+    priority INTEGER NOT NULL DEFAULT 0, -- 数值越大越先执行
+    cancel_requested BOOLEAN NOT NULL DEFAULT false,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    final_report TEXT,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    started_at TIMESTAMPTZ,
+    heartbeat_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ
+);
+
+-- 表: cache_versions
+-- 各表内容的版本号，由触发器在写入语句后递增，用于计算 HTTP ETag。
+-- 版本号与数据在同一事务中提交，读到新版本号时一定也能读到新数据
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name TEXT PRIMARY KEY, -- 表名
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO cache_versions (name) VALUES ('thoughts'), ('creations'), ('comments'), ('tools')
+ON CONFLICT (name) DO NOTHING;
+
+-- 同时通过缓存失效通道通知各工作进程丢弃缓存的版本号（通道名需与 CACHE_INVALIDATION_CHANNEL 一致）。
+-- 行级调用来自提交时才执行的延迟约束触发器（thoughts 除外，见下）：版本行只在提交的瞬间被锁住，
+-- 而不是从写入语句一直锁到事务结束，并发写入同一张表的事务不会在这一行上排队；
+-- 同一事务内用事务级配置项记录已递增过，只更新一次
+CREATE OR REPLACE FUNCTION bump_cache_version() RETURNS trigger AS $$
+DECLARE
+    flag TEXT := 'cache_versions.bumped_' || TG_TABLE_NAME;
+BEGIN
+    IF current_setting(flag, true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    PERFORM set_config(flag, 'on', true);
+    UPDATE cache_versions SET version = version + 1 WHERE name = TG_TABLE_NAME;
+    PERFORM pg_notify('cache_invalidation', 'table_version:' || TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- thoughts 只由 ThoughtSink 以「一次 COPY 后立即提交」的短事务写入，语句级触发器锁住版本行的时间
+-- 与提交时触发相同，却不必为每一行调用一次函数（逐行触发会使 COPY 吞吐下降约 20%）
+DROP TRIGGER IF EXISTS trg_thoughts_cache_version ON thoughts;
+CREATE TRIGGER trg_thoughts_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON thoughts
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_cache_version();
+DROP TRIGGER IF EXISTS trg_thoughts_cache_version_truncate ON thoughts;
+
+-- 其余表可能在较长的事务中写入，用提交时才执行的行级约束触发器；
+-- 约束触发器不支持 TRUNCATE，TRUNCATE 单独用语句级触发器立即递增
+
+-- 回复工作进程认领评论只修改认领状态列，不改变评论列表的内容，不更新版本号
+DROP TRIGGER IF EXISTS trg_comments_cache_version ON comments;
+CREATE CONSTRAINT TRIGGER trg_comments_cache_version
+    AFTER INSERT OR DELETE OR UPDATE OF content, reply_content, creation_id ON comments
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_cache_version();
+DROP TRIGGER IF EXISTS trg_comments_cache_version_truncate ON comments;
+CREATE TRIGGER trg_comments_cache_version_truncate
+    AFTER TRUNCATE ON comments
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_cache_version();
+
+-- 作品列表只展示 id / title / asset_url：点赞数、评论数的更新不改变版本号，
+-- 避免高频点赞争用版本行
+DROP TRIGGER IF EXISTS trg_creations_cache_version ON creations;
+CREATE CONSTRAINT TRIGGER trg_creations_cache_version
+    AFTER INSERT OR DELETE OR UPDATE OF title, asset_url ON creations
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_cache_version();
+DROP TRIGGER IF EXISTS trg_creations_cache_version_truncate ON creations;
+CREATE TRIGGER trg_creations_cache_version_truncate
+    AFTER TRUNCATE ON creations
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_cache_version();
+
+-- 工具注册表按版本号判断是否需要重新加载 tools 表，新增或修改的工具无需重启即可使用
+DROP TRIGGER IF EXISTS trg_tools_cache_version ON tools;
+CREATE CONSTRAINT TRIGGER trg_tools_cache_version
+    AFTER INSERT OR UPDATE OR DELETE ON tools
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_cache_version();
+DROP TRIGGER IF EXISTS trg_tools_cache_version_truncate ON tools;
+CREATE TRIGGER trg_tools_cache_version_truncate
+    AFTER TRUNCATE ON tools
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_cache_version();
+
+-- 认领队列时按优先级取最早的排队任务
+CREATE INDEX IF NOT EXISTS idx_agent_runs_queued ON agent_runs(priority DESC, id) WHERE status = 'queued';
+-- 回收心跳超时的运行中任务
+CREATE INDEX IF NOT EXISTS idx_agent_runs_running ON agent_runs(heartbeat_at) WHERE status = 'running';
+
 -- 为外键创建索引以提高查询性能
-CREATE INDEX IF NOT EXISTS idx_comments_creation_id ON comments(creation_id);
+-- (creation_id, id DESC) 同时服务于外键查找和作品评论列表的游标分页
+CREATE INDEX IF NOT EXISTS idx_comments_creation_id_id ON comments(creation_id, id DESC);
+DROP INDEX IF EXISTS idx_comments_creation_id;
+
+-- 回复工作进程按作品分组认领尚未回复的评论
+CREATE INDEX IF NOT EXISTS idx_comments_unreplied ON comments(creation_id, id) WHERE reply_content IS NULL;
+
+-- 列表接口的排序/游标分页索引，保证深分页与第一页的延迟一致
+CREATE INDEX IF NOT EXISTS idx_thoughts_created_at_id ON thoughts(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_comments_created_at_id ON comments(created_at DESC, id DESC);
 
 -- 添加一些注释说明
 COMMENT ON TABLE digital_life IS '存储关于每个数字生命实体的信息';
 COMMENT ON COLUMN digital_life.lifespan IS '生命的截止日期';
+COMMENT ON COLUMN digital_life.visitor_sketch IS '独立访客的 HyperLogLog 寄存器，用于跨进程合并计数';
 COMMENT ON TABLE thoughts IS '记录智能体的思考过程';
 COMMENT ON TABLE tools IS '存储可供智能体使用的工具信息';
 COMMENT ON TABLE creations IS '存储智能体或用户创造的作品，如文章、图片等';
+COMMENT ON TABLE agent_runs IS '智能体运行任务队列';
+COMMENT ON TABLE cache_versions IS '各表内容的版本号，用于 HTTP 条件请求与工具注册表的增量加载';
 COMMENT ON TABLE comments IS '存储对作品或对AI本身的评论，支持嵌套';
 COMMENT ON COLUMN comments.creation_id IS '关联的作品ID。如果为NULL，则表示对AI整体的评论。';
 COMMENT ON COLUMN comments.reply_content IS 'AI回复的内容。如果为NULL，则表示AI尚未评论。';
\ No newline at end of file